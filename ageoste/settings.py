@@ -1,3 +1,5 @@
+import os
+
 import my_settings
 
 from pathlib import Path
@@ -28,6 +30,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'corsheaders',
+    'core',
     'user',
     'product',
     'order',
@@ -35,6 +38,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.AdmissionMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,7 +75,31 @@ WSGI_APPLICATION = 'ageoste.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
-DATABASES = my_settings.DATABASES
+DATABASE_POOL_ENABLED = os.environ.get('DATABASE_POOL_ENABLED', '').lower() in ('1', 'true')
+DATABASE_POOL         = {
+    'MIN_SIZE'              : int(os.environ.get('DATABASE_POOL_MIN_SIZE', 0)),
+    'MAX_SIZE'              : 32,
+    'TIMEOUT'               : 5,
+    'MAX_LIFETIME'          : 60 * 30,
+    'IDLE_TIMEOUT'          : 60 * 5,
+    'HEALTH_CHECK_INTERVAL' : 5,
+}
+
+DATABASES = {
+    alias : {**database, 'ENGINE' : 'core.backends.pooled', 'POOL' : {'ENGINE' : database['ENGINE'], **DATABASE_POOL}}
+    for alias, database in my_settings.DATABASES.items()
+} if DATABASE_POOL_ENABLED else my_settings.DATABASES
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.1/ref/settings/#caches
+
+CACHES = getattr(my_settings, 'CACHES', {
+    'default' : {
+        'BACKEND'  : 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION' : 'cache_entries',
+    },
+})
 
 
 # Password validation
@@ -137,6 +167,90 @@ CORS_ALLOW_HEADERS = (
     'x-requested-with',
 )
 
+##PRODUCT
+CATALOG_VERSION_CHECK_INTERVAL = 1
+PRODUCT_COUNT_CACHE_TIMEOUT    = 60
+PRODUCT_FACET_INDEX            = True
+PRODUCT_PAGE_COUNT             = 16
+PRODUCT_MAX_PAGE_COUNT         = 100
+PRODUCT_CATEGORY_TOP_N         = 4
+PRODUCT_CATEGORY_MAX_TOP_N     = 50
+PRODUCT_CATEGORY_ORDER         = 'id'
+PRODUCT_DETAIL_CACHE_TIMEOUT   = 60 * 60
+PRODUCT_EXPORT_CHUNK_SIZE      = 1000
+REVIEW_PAGE_COUNT              = 10
+REVIEW_MAX_PAGE_COUNT          = 50
+REPLY_PAGE_COUNT               = 20
+REPLY_MAX_PAGE_COUNT           = 100
+REPLY_PREVIEW_COUNT            = 3
+REPLY_BATCH_MAX_REVIEWS        = 50
+
+##ORDER
+CART_BULK_MAX_LINES   = 100
+ORDER_CHECKOUT_STATUS = '결제완료'
+
+##ASYNC
+ASYNC_CATALOG_VIEWS = False
+ASYNC_DB_POOL_SIZE  = 16
+
+##RENDERERS
+JSON_RENDERER_BACKEND = 'json'
+
+##RESPONSE_CACHE
+RESPONSE_CACHE_TIMEOUT       = 60 * 10
+RESPONSE_CACHE_LOCK_TIMEOUT  = 5
+RESPONSE_CACHE_WAIT_INTERVAL = 0.05
+
+##COMPRESSION
+COMPRESSION_MIN_SIZE       = 1024
+COMPRESSION_LEVEL          = 6
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSION_CONTENT_TYPES  = ('application/json', 'text/')
+
+##ADMISSION
+ADMISSION_ENABLED          = True
+ADMISSION_MAX_IN_FLIGHT    = 32
+ADMISSION_QUEUE_SIZE       = 32
+ADMISSION_QUEUE_TIMEOUT    = 0.5
+ADMISSION_RETRY_AFTER      = 1
+ADMISSION_EXEMPT_ROUTES    = ('metrics',)
+ADMISSION_DEFAULT_PRIORITY = 'browse'
+ADMISSION_PRIORITY_SHARES  = {
+    'checkout' : 1.0,
+    'browse'   : 0.75,
+    'signin'   : 0.25,
+}
+ADMISSION_ROUTE_PRIORITIES = {
+    'order/cart'    : 'checkout',
+    'order/payment' : 'checkout',
+    'user/signin'   : 'signin',
+    'user/signup'   : 'signin',
+}
+ADMISSION_ROUTE_LIMITS     = {
+    'user/signin'                 : 8,
+    'user/signup'                 : 4,
+    'product'                     : 4,
+    'product/category/<str:menu>' : 4,
+    'product/export'              : 2,
+}
+
+##METRICS
+METRICS_N_PLUS_ONE_THRESHOLD = 10
+METRICS_LATENCY_BUCKETS      = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+##AUTH
+AUTH_TOKEN_CACHE_SIZE               = 10000
+AUTH_TOKEN_CACHE_TIMEOUT            = 60 * 5
+AUTH_USER_CACHE_SIZE                = 10000
+AUTH_USER_CACHE_TIMEOUT             = 60 * 5
+AUTH_USER_GENERATION_CHECK_INTERVAL = 1
+
+PASSWORD_HASHER_ROUNDS       = 12
+PASSWORD_HASHER_WORKERS      = os.cpu_count() or 1
+PASSWORD_HASHER_MAX_QUEUE    = 32
+PASSWORD_HASHER_TIMEOUT      = 5
+PASSWORD_HASHER_START_METHOD = 'spawn'
+
 LOGGING = my_settings.LOGGING
 
 EMAIL_BACKEND       = my_settings.EMAIL['EMAIL_BACKEND']
@@ -145,4 +259,9 @@ EMAIL_PORT          = my_settings.EMAIL['EMAIL_PORT']
 EMAIL_HOST          = my_settings.EMAIL['EMAIL_HOST']
 EMAIL_HOST_USER     = my_settings.EMAIL['EMAIL_HOST_USER']
 EMAIL_HOST_PASSWORD = my_settings.EMAIL['EMAIL_HOST_PASSWORD']
-SERVER_EMAIL        = my_settings.EMAIL['SERVER_EMAIL']
\ No newline at end of file
+SERVER_EMAIL        = my_settings.EMAIL['SERVER_EMAIL']
+
+EMAIL_OUTBOX_BATCH_SIZE   = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF      = 60
+EMAIL_OUTBOX_LEASE        = 60 * 5
\ No newline at end of file
@@ -1,7 +1,10 @@
 from django.urls import path, include
 
+from core.views import MetricsView
+
 urlpatterns = [
     path('user', include('user.urls')),
     path('product', include('product.urls')),
     path('order', include('order.urls')),
+    path('metrics', MetricsView.as_view()),
 ]
@@ -0,0 +1,180 @@
+import asyncio
+import bisect
+import itertools
+import threading
+import time
+
+from collections import Counter
+
+from django.conf import settings
+
+from .metrics import registry
+
+ADMISSION_REQUESTS = registry.counter(
+    'http_admission_requests_total', 'Admission decisions by URL pattern, priority and outcome'
+)
+ADMISSION_WAIT_SECONDS = registry.histogram(
+    'http_admission_wait_seconds', 'Time requests spent queued for admission', settings.METRICS_LATENCY_BUCKETS
+)
+ADMISSION_IN_FLIGHT    = registry.gauge('http_admission_in_flight', 'Admitted requests by priority')
+ADMISSION_QUEUED       = registry.gauge('http_admission_queued', 'Requests waiting for admission by priority')
+ADMISSION_ROUTE_LIMIT  = registry.gauge('http_admission_route_limit', 'Configured in-flight limit by URL pattern')
+ADMISSION_CAPACITY     = registry.gauge('http_admission_capacity', 'In-flight requests each priority may fill')
+
+
+def priority_rank(priority):
+    return list(settings.ADMISSION_PRIORITY_SHARES).index(priority)
+
+
+def priority_capacity(priority):
+    return max(int(settings.ADMISSION_MAX_IN_FLIGHT * settings.ADMISSION_PRIORITY_SHARES[priority]), 1)
+
+
+class Waiter:
+    def __init__(self, route, priority, key, loop=None):
+        self.route    = route
+        self.priority = priority
+        self.key      = key
+        self.admitted = None
+        self.loop     = loop
+        self.event    = None if loop else threading.Event()
+        self.future   = loop.create_future() if loop else None
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def wake(self, admitted):
+        self.admitted = admitted
+
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(admitted))
+
+
+class AdmissionController:
+    def __init__(self):
+        self.lock      = threading.Lock()
+        self.sequence  = itertools.count()
+        self.in_flight = Counter()
+        self.routes    = Counter()
+        self.queued    = Counter()
+        self.waiters   = []
+
+    def publish_limits(self):
+        for route, limit in settings.ADMISSION_ROUTE_LIMITS.items():
+            ADMISSION_ROUTE_LIMIT.set(limit, route=route)
+
+        for priority in settings.ADMISSION_PRIORITY_SHARES:
+            ADMISSION_CAPACITY.set(priority_capacity(priority), priority=priority)
+
+    def admissible(self, route, priority):
+        limit = settings.ADMISSION_ROUTE_LIMITS.get(route)
+
+        return (
+            (limit is None or self.routes[route] < limit)
+            and sum(self.in_flight.values()) < priority_capacity(priority)
+        )
+
+    def take(self, route, priority):
+        self.in_flight[priority] += 1
+        self.routes[route]       += 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight[priority], priority=priority)
+
+    def enqueue(self, waiter):
+        bisect.insort(self.waiters, waiter)
+        self.queued[waiter.priority] += 1
+        ADMISSION_QUEUED.set(self.queued[waiter.priority], priority=waiter.priority)
+
+    def dequeue(self, waiter):
+        self.waiters.remove(waiter)
+        self.queued[waiter.priority] -= 1
+        ADMISSION_QUEUED.set(self.queued[waiter.priority], priority=waiter.priority)
+
+    def enter(self, route, priority, loop=None):
+        with self.lock:
+            if self.admissible(route, priority):
+                self.take(route, priority)
+                return True
+
+            waiter = Waiter(route, priority, (priority_rank(priority), next(self.sequence)), loop)
+
+            if len(self.waiters) >= settings.ADMISSION_QUEUE_SIZE:
+                if not self.waiters or self.waiters[-1].key[0] <= waiter.key[0]:
+                    return False
+
+                evicted = self.waiters[-1]
+                self.dequeue(evicted)
+                evicted.wake(False)
+
+            self.enqueue(waiter)
+            return waiter
+
+    def settle(self, waiter):
+        with self.lock:
+            if waiter.admitted is None:
+                self.dequeue(waiter)
+                return 'timeout'
+
+        return 'queued' if waiter.admitted else 'rejected'
+
+    def acquire(self, route, priority):
+        waiter = self.enter(route, priority)
+
+        if isinstance(waiter, bool):
+            return 'admitted' if waiter else 'rejected'
+
+        waiter.event.wait(settings.ADMISSION_QUEUE_TIMEOUT)
+        return self.settle(waiter)
+
+    async def async_acquire(self, route, priority):
+        waiter = self.enter(route, priority, asyncio.get_running_loop())
+
+        if isinstance(waiter, bool):
+            return 'admitted' if waiter else 'rejected'
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), settings.ADMISSION_QUEUE_TIMEOUT)
+
+        except asyncio.TimeoutError:
+            pass
+
+        return self.settle(waiter)
+
+    def release(self, route, priority):
+        with self.lock:
+            self.in_flight[priority] -= 1
+            self.routes[route]       -= 1
+            ADMISSION_IN_FLIGHT.set(self.in_flight[priority], priority=priority)
+
+            for waiter in list(self.waiters):
+                if self.admissible(waiter.route, waiter.priority):
+                    self.dequeue(waiter)
+                    self.take(waiter.route, waiter.priority)
+                    waiter.wake(True)
+
+
+admission = AdmissionController()
+
+
+class Ticket:
+    def __init__(self, route, priority):
+        self.route    = route
+        self.priority = priority
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            admission.release(self.route, self.priority)
+
+
+def route_priority(route):
+    return settings.ADMISSION_ROUTE_PRIORITIES.get(route, settings.ADMISSION_DEFAULT_PRIORITY)
+
+
+def record_decision(route, priority, outcome, started):
+    ADMISSION_REQUESTS.inc(route=route, priority=priority, outcome=outcome)
+
+    if outcome != 'admitted':
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, priority=priority)
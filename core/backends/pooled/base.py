@@ -0,0 +1,91 @@
+import functools
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.utils        import load_backend
+
+from .pool import ConnectionPool
+
+pools      = {}
+pools_lock = threading.Lock()
+
+
+def ping(connection):
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute('SELECT 1')
+
+    finally:
+        cursor.close()
+
+
+def connection_pool(alias, settings_dict):
+    key = (alias, *(settings_dict.get(name) for name in ('NAME', 'HOST', 'PORT', 'USER')))
+
+    with pools_lock:
+        if key not in pools:
+            pools[key] = ConnectionPool(alias, settings_dict['POOL'])
+
+        return pools[key]
+
+
+@functools.lru_cache(maxsize=None)
+def pooled_wrapper(engine):
+    backend = load_backend(engine)
+
+    class PooledDatabaseWrapper(backend.DatabaseWrapper):
+        pooled = True
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool_entry = None
+
+        def poolable(self):
+            return not getattr(self, 'is_in_memory_db', lambda: False)()
+
+        def get_new_connection(self, conn_params):
+            if not self.poolable():
+                return super().get_new_connection(conn_params)
+
+            self.pool_entry = connection_pool(self.alias, self.settings_dict).acquire(
+                lambda: super(PooledDatabaseWrapper, self).get_new_connection(conn_params), ping
+            )
+            return self.pool_entry.connection
+
+        def _close(self):
+            entry, self.pool_entry = self.pool_entry, None
+
+            if entry is None or self.connection is None:
+                return super()._close()
+
+            pool = connection_pool(self.alias, self.settings_dict)
+
+            if self.in_atomic_block:
+                return pool.discard(entry, 'closed_in_transaction')
+
+            healthy = True
+
+            try:
+                if not self.autocommit:
+                    self.connection.rollback()
+
+                if self.errors_occurred:
+                    healthy = self.is_usable()
+
+            except self.Database.Error:
+                healthy = False
+
+            pool.release(entry, healthy)
+
+    return PooledDatabaseWrapper
+
+
+class DatabaseWrapper:
+    def __new__(cls, settings_dict, *args, **kwargs):
+        engine = settings_dict.get('POOL', {}).get('ENGINE')
+
+        if not engine:
+            raise ImproperlyConfigured("The pooled backend needs the wrapped engine in DATABASES[...]['POOL']['ENGINE']")
+
+        return pooled_wrapper(engine)(settings_dict, *args, **kwargs)
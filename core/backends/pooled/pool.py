@@ -0,0 +1,180 @@
+import threading
+import time
+
+from collections import deque
+
+from django.conf     import settings
+from django.db.utils import OperationalError
+
+from core.metrics import registry
+
+POOL_WAIT_SECONDS = registry.histogram(
+    'db_pool_wait_seconds', 'Time spent waiting to check out a pooled connection', settings.METRICS_LATENCY_BUCKETS
+)
+POOL_CONNECTIONS = registry.gauge('db_pool_connections', 'Pooled connections by database alias and state')
+POOL_CHECKOUTS   = registry.counter('db_pool_checkouts_total', 'Connection checkouts by source')
+POOL_DISCARDS    = registry.counter('db_pool_discards_total', 'Connections closed by the pool by reason')
+POOL_TIMEOUTS    = registry.counter('db_pool_timeouts_total', 'Checkouts that gave up waiting for a connection')
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.used_at    = self.created_at
+
+
+class ConnectionPool:
+    def __init__(self, alias, options):
+        self.alias                 = alias
+        self.min_size              = options.get('MIN_SIZE', 0)
+        self.max_size              = options.get('MAX_SIZE', 10)
+        self.timeout               = options.get('TIMEOUT', 5)
+        self.max_lifetime          = options.get('MAX_LIFETIME')
+        self.idle_timeout          = options.get('IDLE_TIMEOUT')
+        self.health_check_interval = options.get('HEALTH_CHECK_INTERVAL', 0)
+        self.condition             = threading.Condition()
+        self.idle                  = deque()
+        self.size                  = 0
+
+    def publish(self):
+        POOL_CONNECTIONS.set(len(self.idle), alias=self.alias, state='idle')
+        POOL_CONNECTIONS.set(self.size - len(self.idle), alias=self.alias, state='in_use')
+
+    def expired(self, entry, now):
+        return self.max_lifetime is not None and now - entry.created_at >= self.max_lifetime
+
+    def close(self, entry, reason):
+        POOL_DISCARDS.inc(alias=self.alias, reason=reason)
+
+        try:
+            entry.connection.close()
+
+        except Exception:
+            pass
+
+    def discard(self, entry, reason):
+        self.close(entry, reason)
+
+        with self.condition:
+            self.size -= 1
+            self.publish()
+            self.condition.notify()
+
+    def take(self, deadline):
+        expired = []
+
+        try:
+            with self.condition:
+                while True:
+                    now = time.monotonic()
+
+                    while self.idle:
+                        entry = self.idle.pop()
+
+                        if not self.expired(entry, now):
+                            self.publish()
+                            return entry
+
+                        self.size -= 1
+                        expired.append(entry)
+
+                    if self.size < self.max_size:
+                        self.size += 1
+                        self.publish()
+                        return None
+
+                    if now >= deadline:
+                        POOL_TIMEOUTS.inc(alias=self.alias)
+                        raise PoolTimeout(f'No {self.alias} database connection available within {self.timeout}s')
+
+                    self.condition.wait(deadline - now)
+
+        finally:
+            for entry in expired:
+                self.close(entry, 'expired')
+
+    def open(self, connect):
+        try:
+            return PooledConnection(connect())
+
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.publish()
+                self.condition.notify()
+            raise
+
+    def fill(self, connect):
+        while True:
+            with self.condition:
+                if self.size >= self.min_size:
+                    return
+
+                self.size += 1
+
+            entry = self.open(connect)
+
+            with self.condition:
+                self.idle.appendleft(entry)
+                self.publish()
+                self.condition.notify()
+
+    def acquire(self, connect, check):
+        started  = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+
+        if self.size < self.min_size:
+            self.fill(connect)
+
+        while True:
+            entry = self.take(deadline)
+
+            if entry is None:
+                POOL_WAIT_SECONDS.observe(time.perf_counter() - started, alias=self.alias)
+                POOL_CHECKOUTS.inc(alias=self.alias, source='new')
+                return self.open(connect)
+
+            if time.monotonic() - entry.used_at >= self.health_check_interval:
+                try:
+                    check(entry.connection)
+
+                except Exception:
+                    self.discard(entry, 'unhealthy')
+                    continue
+
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started, alias=self.alias)
+            POOL_CHECKOUTS.inc(alias=self.alias, source='idle')
+            return entry
+
+    def release(self, entry, healthy=True):
+        now = time.monotonic()
+
+        if not healthy:
+            return self.discard(entry, 'broken')
+
+        if self.expired(entry, now):
+            return self.discard(entry, 'expired')
+
+        entry.used_at = now
+        stale         = []
+
+        with self.condition:
+            self.idle.append(entry)
+
+            while (
+                self.idle_timeout is not None and self.size > self.min_size
+                and now - self.idle[0].used_at >= self.idle_timeout
+            ):
+                stale.append(self.idle.popleft())
+                self.size -= 1
+
+            self.publish()
+            self.condition.notify()
+
+        for entry in stale:
+            self.close(entry, 'idle')
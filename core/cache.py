@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import hashlib
+import time
+
+from django.conf                      import settings
+from django.core.cache                 import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http                       import HttpResponse
+from django.utils.cache                import get_conditional_response, patch_vary_headers
+
+from .compression import compress_variants, encode_response, negotiate
+from .db          import database_pool
+from .metrics     import registry, request_route
+
+response_cache_requests = registry.counter(
+    'response_cache_requests_total', 'Anonymous GETs served by the response cache, by namespace and result'
+)
+
+
+def tag_key(tag):
+    return f'response-tag:{tag}'
+
+
+def new_version():
+    return time.time_ns()
+
+
+class ResponseCache:
+    def key(self, namespace, request):
+        query = sorted((name, sorted(values)) for name, values in request.GET.lists())
+        raw   = repr((request.path, query)).encode('utf-8')
+        return f'response:{namespace}:{hashlib.sha1(raw).hexdigest()}'
+
+    def tag_versions(self, tags):
+        keys     = {tag_key(tag) : tag for tag in tags}
+        versions = cache.get_many(keys)
+
+        for key in keys.keys() - versions.keys():
+            cache.add(key, new_version(), None)
+            versions[key] = cache.get(key)
+
+        return {keys[key] : version for key, version in versions.items()}
+
+    def invalidate(self, tags):
+        for tag in tags:
+            try:
+                cache.incr(tag_key(tag))
+
+            except ValueError:
+                cache.add(tag_key(tag), new_version(), None)
+
+    def get(self, key):
+        entry = cache.get(key)
+
+        if entry is None or self.tag_versions(entry['tags']) != entry['tags']:
+            return None
+
+        return entry
+
+    def set(self, key, request, response, versions):
+        if response.status_code != 200 or response.streaming:
+            return response
+
+        entry = {
+            'content'      : response.content,
+            'content_type' : response['Content-Type'],
+            'etag'         : response.get('ETag'),
+            'encodings'    : compress_variants(response.content, request_route(request)),
+            'tags'         : versions,
+        }
+        cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+
+        return self.response(request, entry)
+
+    def acquire(self, key):
+        return cache.add(f'{key}:lock', 1, settings.RESPONSE_CACHE_LOCK_TIMEOUT)
+
+    def release(self, key):
+        cache.delete(f'{key}:lock')
+
+    def response(self, request, entry):
+        not_modified = get_conditional_response(request, etag=entry['etag']) if entry['etag'] else None
+
+        if not_modified:
+            return not_modified
+
+        response  = HttpResponse(entry['content'], content_type=entry['content_type'])
+        encodings = entry.get('encodings')
+
+        if entry['etag']:
+            response['ETag'] = entry['etag']
+
+        if not encodings:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+        if encoding in encodings:
+            return encode_response(request, response, encoding, encodings[encoding], cached=True)
+
+        return response
+
+    def lookup(self, request, namespace, tags):
+        key      = self.key(namespace, request)
+        entry    = self.get(key)
+        deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_TIMEOUT
+
+        while entry is None:
+            if self.acquire(key):
+                return key, self.tag_versions(tags), None
+
+            if time.monotonic() >= deadline:
+                return key, None, None
+
+            time.sleep(settings.RESPONSE_CACHE_WAIT_INTERVAL)
+            entry = self.get(key)
+
+        return key, None, entry
+
+    async def async_lookup(self, request, namespace, tags):
+        key      = self.key(namespace, request)
+        entry    = await database_pool.run(self.get, key)
+        deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_TIMEOUT
+
+        while entry is None:
+            if await database_pool.run(self.acquire, key):
+                return key, await database_pool.run(self.tag_versions, tags), None
+
+            if time.monotonic() >= deadline:
+                return key, None, None
+
+            await asyncio.sleep(settings.RESPONSE_CACHE_WAIT_INTERVAL)
+            entry = await database_pool.run(self.get, key)
+
+        return key, None, entry
+
+
+response_cache = ResponseCache()
+
+
+def shared_cache():
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def cacheable(request):
+    return settings.RESPONSE_CACHE_TIMEOUT and 'Authorization' not in request.headers
+
+
+def cache_anonymous_response(namespace):
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if not cacheable(request):
+                    return await func(self, request, *args, **kwargs)
+
+                tags                 = await database_pool.run(self.response_tags, request, *args, **kwargs)
+                key, versions, entry = await response_cache.async_lookup(request, namespace, tags)
+                response_cache_requests.inc(namespace=namespace, result='hit' if entry else 'miss')
+
+                if entry is not None:
+                    return response_cache.response(request, entry)
+
+                if versions is None:
+                    return await func(self, request, *args, **kwargs)
+
+                try:
+                    response = await func(self, request, *args, **kwargs)
+                    response = await database_pool.run(response_cache.set, key, request, response, versions)
+
+                finally:
+                    await database_pool.run(response_cache.release, key)
+
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            if not cacheable(request):
+                return func(self, request, *args, **kwargs)
+
+            tags                 = self.response_tags(request, *args, **kwargs)
+            key, versions, entry = response_cache.lookup(request, namespace, tags)
+            response_cache_requests.inc(namespace=namespace, result='hit' if entry else 'miss')
+
+            if entry is not None:
+                return response_cache.response(request, entry)
+
+            if versions is None:
+                return func(self, request, *args, **kwargs)
+
+            try:
+                response = func(self, request, *args, **kwargs)
+                response = response_cache.set(key, request, response, versions)
+
+            finally:
+                response_cache.release(key)
+
+            return response
+
+        return wrapper
+
+    return decorator
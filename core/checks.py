@@ -0,0 +1,16 @@
+from django.conf        import settings
+from django.core.checks import Warning, register
+
+from .cache import shared_cache
+
+
+@register()
+def check_response_cache_backend(app_configs, **kwargs):
+    if not settings.RESPONSE_CACHE_TIMEOUT or shared_cache():
+        return []
+
+    return [Warning(
+        'The response cache keeps its tag versions in LocMemCache, so invalidations stay in one process',
+        hint = 'Configure a shared backend in CACHES, such as the default DatabaseCache or memcached.',
+        id   = 'core.W001',
+    )]
@@ -0,0 +1,109 @@
+import functools
+import gzip
+import time
+
+from django.conf import settings
+
+from .metrics import registry, request_route
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSED_RESPONSES = registry.counter(
+    'http_compressed_responses_total', 'Compressed responses by URL pattern, encoding and source'
+)
+COMPRESSION_BYTES_IN  = registry.counter('http_compression_input_bytes_total', 'Body bytes before compression')
+COMPRESSION_BYTES_OUT = registry.counter('http_compression_output_bytes_total', 'Body bytes after compression')
+COMPRESSION_SECONDS   = registry.counter('http_compression_cpu_seconds_total', 'CPU time spent compressing bodies')
+
+
+def compress_gzip(content):
+    return gzip.compress(content, settings.COMPRESSION_LEVEL, mtime=0)
+
+
+def compress_brotli(content):
+    return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+COMPRESSORS = {'gzip' : compress_gzip}
+
+if brotli is not None:
+    COMPRESSORS = {'br' : compress_brotli, **COMPRESSORS}
+
+
+@functools.lru_cache(maxsize=256)
+def negotiate(accept_encoding):
+    weights = {}
+
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.partition(';')
+        weight            = 1.0
+
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+
+            if name.strip() == 'q':
+                try:
+                    weight = float(value)
+
+                except ValueError:
+                    weight = 0.0
+
+        weights[coding.strip()] = weight
+
+    best, best_weight = None, 0.0
+
+    for encoding in COMPRESSORS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+
+    return best
+
+
+def compressible(response):
+    return (
+        not response.streaming
+        and not response.has_header('Content-Encoding')
+        and response.get('Content-Type', '').startswith(settings.COMPRESSION_CONTENT_TYPES)
+        and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+    )
+
+
+def compress(content, encoding, route):
+    started = time.thread_time()
+    body    = COMPRESSORS[encoding](content)
+
+    COMPRESSION_SECONDS.inc(time.thread_time() - started, route=route, encoding=encoding)
+    return body
+
+
+def compress_variants(content, route):
+    if len(content) < settings.COMPRESSION_MIN_SIZE:
+        return {}
+
+    variants = {encoding : compress(content, encoding, route) for encoding in COMPRESSORS}
+    return {encoding : body for encoding, body in variants.items() if len(body) < len(content)}
+
+
+def encode_response(request, response, encoding, body, cached=False):
+    route = request_route(request)
+    size  = len(response.content)
+
+    COMPRESSED_RESPONSES.inc(route=route, encoding=encoding, source='cache' if cached else 'live')
+    COMPRESSION_BYTES_IN.inc(size, route=route, encoding=encoding)
+    COMPRESSION_BYTES_OUT.inc(len(body), route=route, encoding=encoding)
+
+    response.content             = body
+    response['Content-Encoding'] = encoding
+    response['Content-Length']   = str(len(body))
+
+    etag = response.get('ETag')
+
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+    return response
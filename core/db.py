@@ -0,0 +1,59 @@
+import asyncio
+import contextvars
+import functools
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db   import connections
+
+
+def release_connections():
+    for connection in connections.all():
+        if connection.connection is None:
+            continue
+
+        if connection.in_atomic_block:
+            continue
+
+        if getattr(connection, 'pooled', False):
+            connection.close()
+
+        else:
+            connection.close_if_unusable_or_obsolete()
+
+
+def call_db(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+
+    finally:
+        release_connections()
+
+
+class DatabasePool:
+    def __init__(self):
+        self.lock     = threading.Lock()
+        self.executor = None
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers        = settings.ASYNC_DB_POOL_SIZE,
+                    thread_name_prefix = 'async-db',
+                )
+
+            return self.executor
+
+    async def run(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.get_executor(), functools.partial(contextvars.copy_context().run, call_db, func, *args, **kwargs)
+        )
+
+    async def gather(self, *calls):
+        return await asyncio.gather(*(self.run(*call) for call in calls))
+
+
+database_pool = DatabasePool()
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from collections import Counter, defaultdict
+
+import jwt
+
+from django.conf                 import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test                 import Client
+from django.test.utils           import override_settings
+
+from core.synthetic import SEED_PASSWORD
+from user.models    import User
+
+
+class Command(BaseCommand):
+    help = 'Flood browsing and sign-in while probing the cart, with and without admission control'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=10.0, help='seconds per run')
+        parser.add_argument('--browse-clients', type=int, default=48)
+        parser.add_argument('--signin-clients', type=int, default=16)
+        parser.add_argument('--cart-clients', type=int, default=4)
+        parser.add_argument('--warmup', type=float, default=3.0, help='seconds of unmeasured load before the runs')
+        parser.add_argument('--retry-delay', type=float, default=0.1, help='client back-off after a 503')
+        parser.add_argument('--modes', nargs='+', choices=['off', 'on'], default=['off', 'on'])
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(carts__is_open=True).order_by('id').first()
+
+        if user is None:
+            raise CommandError('Seed a dataset first, for example with seed_dataset')
+
+        token   = jwt.encode({'user_id' : user.id}, settings.SECRET_KEY, algorithm='HS256')
+        signin  = {'email' : user.email, 'password' : SEED_PASSWORD}
+        targets = {
+            'browse' : lambda client, index: client.get('/product', {'word' : '폴로', 'page' : index % 10 + 1}),
+            'signin' : lambda client, index: client.post('/user/signin', signin, content_type='application/json'),
+            'cart'   : lambda client, index: client.get('/order/cart', HTTP_AUTHORIZATION=token),
+        }
+
+        with override_settings(RESPONSE_CACHE_TIMEOUT=0, PRODUCT_DETAIL_CACHE_TIMEOUT=0):
+            self.run(targets, {**options, 'duration' : options['warmup']})
+
+        for mode in options['modes']:
+            with override_settings(
+                ADMISSION_ENABLED=mode == 'on', RESPONSE_CACHE_TIMEOUT=0, PRODUCT_DETAIL_CACHE_TIMEOUT=0
+            ):
+                latencies, statuses = self.run(targets, options)
+
+            for name in targets:
+                values = sorted(latencies[name])
+
+                if not values:
+                    continue
+
+                self.stdout.write(
+                    f'admission {mode:<3} {name:<6} {len(values) / options["duration"]:7.1f} req/s  '
+                    f'p50 {values[len(values) // 2] * 1000:8.1f} ms  '
+                    f'p99 {values[max(int(len(values) * 0.99) - 1, 0)] * 1000:8.1f} ms  '
+                    f'statuses {dict(sorted(statuses[name].items()))}'
+                )
+
+    def run(self, targets, options):
+        latencies = defaultdict(list)
+        statuses  = defaultdict(Counter)
+        lock      = threading.Lock()
+        deadline  = []
+        clients   = sum(options[f'{name}_clients'] for name in targets)
+        start     = threading.Barrier(clients, action=lambda: deadline.append(time.perf_counter() + options['duration']))
+
+        def client(name):
+            browser = Client(raise_request_exception=False)
+            index   = 0
+
+            start.wait()
+
+            while time.perf_counter() < deadline[0]:
+                started  = time.perf_counter()
+                response = targets[name](browser, index)
+                elapsed  = time.perf_counter() - started
+                index   += 1
+
+                with lock:
+                    latencies[name].append(elapsed)
+                    statuses[name][response.status_code] += 1
+
+                if response.status_code == 503:
+                    time.sleep(options['retry_delay'])
+
+        threads = [
+            threading.Thread(target=client, args=(name,))
+            for name in targets for _ in range(options[f'{name}_clients'])
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return latencies, statuses
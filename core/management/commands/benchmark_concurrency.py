@@ -0,0 +1,107 @@
+import asyncio
+import itertools
+import statistics
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+
+from django.conf                 import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test                 import RequestFactory
+from django.test.utils           import override_settings
+
+from core.db        import call_db
+from order.views    import CartView, AsyncCartView
+from product.models import Product
+from product.views  import ProductListView, AsyncProductListView, ProductDetailView, AsyncProductDetailView
+from user.models    import User
+
+VIEWS = {
+    'list'   : (ProductListView, AsyncProductListView),
+    'detail' : (ProductDetailView, AsyncProductDetailView),
+    'cart'   : (CartView, AsyncCartView),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare sync and async catalog views in requests per second under concurrent clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, nargs='+', default=[50, 200, 1000])
+        parser.add_argument('--requests', type=int, default=2000, help='requests per view and concurrency level')
+        parser.add_argument('--views', nargs='+', choices=VIEWS, default=list(VIEWS))
+        parser.add_argument(
+            '--sync-workers', type=int, default=settings.ASYNC_DB_POOL_SIZE,
+            help='threads serving the sync views, defaults to the async DB pool size',
+        )
+
+    def handle(self, *args, **options):
+        product_ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:100])
+        user        = User.objects.order_by('id').first()
+
+        if not product_ids or user is None:
+            raise CommandError('Seed products and at least one user first')
+
+        factory = RequestFactory()
+        token   = jwt.encode({'user_id' : user.id}, settings.SECRET_KEY, algorithm='HS256')
+        targets = {
+            'list'   : lambda index: (factory.get('', {'page' : index % 10 + 1}), {}),
+            'detail' : lambda index: (
+                factory.get(''), {'product_id' : product_ids[index % len(product_ids)]}
+            ),
+            'cart'   : lambda index: (factory.get('', HTTP_AUTHORIZATION=token), {}),
+        }
+
+        with override_settings(PRODUCT_DETAIL_CACHE_TIMEOUT=0, RESPONSE_CACHE_TIMEOUT=0):
+            for name in options['views']:
+                sync_view, async_view = (view.as_view() for view in VIEWS[name])
+
+                for clients in options['clients']:
+                    with ThreadPoolExecutor(max_workers=options['sync_workers']) as workers:
+                        sync_result = asyncio.run(self.drive(
+                            lambda request, **kwargs: asyncio.get_running_loop().run_in_executor(
+                                workers, lambda: call_db(sync_view, request, **kwargs)
+                            ),
+                            targets[name], clients, options['requests'],
+                        ))
+
+                    async_result = asyncio.run(self.drive(async_view, targets[name], clients, options['requests']))
+
+                    self.stdout.write(f'{name:>6} clients={clients:<5} ' + ' | '.join(
+                        f'{label} {rps:8.1f} req/s p50 {p50:7.1f} ms p99 {p99:7.1f} ms errors {errors}'
+                        for label, (rps, p50, p99, errors) in (('sync', sync_result), ('async', async_result))
+                    ))
+
+    async def drive(self, view, target, clients, total):
+        counter   = itertools.count()
+        latencies = []
+        errors    = 0
+
+        async def client():
+            nonlocal errors
+
+            for index in counter:
+                if index >= total:
+                    return
+
+                request, kwargs = target(index)
+                started         = time.perf_counter()
+                response        = await view(request, **kwargs)
+                latencies.append(time.perf_counter() - started)
+
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return (
+            total / elapsed,
+            statistics.median(latencies) * 1000,
+            latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+            errors,
+        )
@@ -0,0 +1,121 @@
+import itertools
+import threading
+import time
+
+import jwt
+
+from django.conf                 import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db                   import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.db.utils             import load_backend
+from django.test                 import Client
+from django.test.utils           import override_settings
+
+from product.models import Product
+from user.models    import User
+
+
+class Command(BaseCommand):
+    help = 'Compare request latency with a connection per request and with the pooled database backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--modes', nargs='+', choices=['plain', 'pooled'], default=['plain', 'pooled'])
+        parser.add_argument(
+            '--connect-delay-ms', type=float, default=0.0,
+            help='extra latency per new connection, to stand in for a network handshake on SQLite',
+        )
+
+    def handle(self, *args, **options):
+        database = connections.databases[DEFAULT_DB_ALIAS]
+        engine   = database.get('POOL', {}).get('ENGINE', database['ENGINE'])
+        user     = User.objects.order_by('id').first()
+        products = list(Product.objects.order_by('id').values_list('id', flat=True)[:100])
+
+        if user is None or not products:
+            raise CommandError('Seed a dataset first, for example with seed_dataset')
+
+        token   = jwt.encode({'user_id' : user.id}, settings.SECRET_KEY, algorithm='HS256')
+        targets = [
+            lambda client, index: client.get(f'/product/{products[index % len(products)]}'),
+            lambda client, index: client.get('/order/cart', HTTP_AUTHORIZATION=token),
+        ]
+
+        wrapper = load_backend(engine).DatabaseWrapper
+        connect = wrapper.get_new_connection
+        opened  = itertools.count()
+
+        def delayed_connect(self, conn_params):
+            next(opened)
+            time.sleep(options['connect_delay_ms'] / 1000)
+            return connect(self, conn_params)
+
+        original = dict(database)
+        connections[DEFAULT_DB_ALIAS].close()
+        wrapper.get_new_connection = delayed_connect
+
+        try:
+            for mode in options['modes']:
+                database.clear()
+                database.update(original, ENGINE=engine, CONN_MAX_AGE=0)
+
+                if mode == 'pooled':
+                    database.update(ENGINE='core.backends.pooled', POOL={
+                        **settings.DATABASE_POOL, **original.get('POOL', {}), 'ENGINE' : engine,
+                    })
+
+                before = next(opened)
+
+                with override_settings(RESPONSE_CACHE_TIMEOUT=0, PRODUCT_DETAIL_CACHE_TIMEOUT=0, ADMISSION_ENABLED=False):
+                    latencies, errors, seconds = self.run(targets, options)
+
+                latencies.sort()
+                self.stdout.write(
+                    f'{mode:<6} {len(latencies) / seconds:8.1f} req/s  '
+                    f'p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms  '
+                    f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:6.2f} ms  '
+                    f'p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:6.2f} ms  '
+                    f'{next(opened) - before - 1} connects  {errors} errors'
+                )
+
+        finally:
+            wrapper.get_new_connection = connect
+            database.clear()
+            database.update(original)
+
+    def run(self, targets, options):
+        counter   = itertools.count()
+        latencies = []
+        errors    = 0
+        lock      = threading.Lock()
+
+        def client():
+            nonlocal errors
+            browser = Client(raise_request_exception=False)
+
+            for index in counter:
+                if index >= options['requests']:
+                    break
+
+                started  = time.perf_counter()
+                response = targets[index % len(targets)](browser, index)
+                close_old_connections()
+                elapsed  = time.perf_counter() - started
+
+                with lock:
+                    latencies.append(elapsed)
+                    errors += response.status_code >= 400
+
+            connections.close_all()
+
+        threads = [threading.Thread(target=client) for _ in range(options['threads'])]
+        started = time.perf_counter()
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return latencies, errors, time.perf_counter() - started
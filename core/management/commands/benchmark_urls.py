@@ -0,0 +1,319 @@
+import json
+import random
+import statistics
+import time
+
+from collections import namedtuple
+from pathlib     import Path
+
+import jwt
+
+from django.conf                 import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db                   import connection
+from django.test                 import Client
+from django.test.utils           import CaptureQueriesContext, override_settings
+from django.urls                 import URLPattern, URLResolver, get_resolver
+
+from core.synthetic import SEED_PASSWORD
+from order.models   import Cart
+from product.models import Color, Menu, Product, Review
+from user.models    import User
+
+Scenario = namedtuple('Scenario', 'name method build auth writes')
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+def scenario(name, method, build, auth=False, writes=False):
+    return Scenario(name, method, build, auth, writes)
+
+
+def review_path(context, index, suffix=''):
+    product_id, review_id = context['reviews'][index % len(context['reviews'])]
+    return f'/product/{product_id}/review/{review_id}{suffix}'
+
+
+SCENARIOS = {
+    'user/signup' : [
+        scenario('signup', 'post', lambda context, index: ('/user/signup', {
+            'name'         : 'benchmark',
+            'email'        : f'signup-{context["run"]}-{index}@benchmark.example.com',
+            'password'     : 'benchmark1234!',
+            'phone_number' : f'0109{context["run"] % 1000:03d}{index:04d}',
+        }), writes=True),
+    ],
+    'user/signin' : [
+        scenario('signin', 'post', lambda context, index: ('/user/signin', {
+            'email'    : context['users'][index % len(context['users'])].email,
+            'password' : context['password'],
+        })),
+    ],
+    'user/account' : [
+        scenario('account', 'get', lambda context, index: ('/user/account', None), auth=True),
+    ],
+    'user/account/coupon' : [
+        scenario('coupons', 'get', lambda context, index: ('/user/account/coupon', None), auth=True),
+    ],
+    'user/emailauth' : [
+        scenario('send activation mail', 'post', lambda context, index: ('/user/emailauth', {
+            'email' : context['users'][index % len(context['users'])].email,
+        }), writes=True),
+    ],
+    'user/emailauth/activate/<str:uidb64>/<str:token>' : [
+        scenario('stale token', 'get', lambda context, index: ('/user/emailauth/activate/MQ/stale-token', None)),
+    ],
+    'product' : [
+        scenario('list', 'get', lambda context, index: ('/product', {'page' : index % 20 + 1})),
+        scenario('list filtered', 'get', lambda context, index: ('/product', {
+            'menu'   : context['menus'][index % len(context['menus'])],
+            'colors' : context['colors'][index % len(context['colors']):][:2],
+            'order'  : 'price',
+        })),
+        scenario('list search', 'get', lambda context, index: ('/product', {'word' : context['words'][index % 2]})),
+        scenario('list price range cursor', 'get', lambda context, index: ('/product', {
+            'order'     : '-price',
+            'min_price' : 50000,
+            'max_price' : 150000,
+            'cursor'    : '',
+        })),
+    ],
+    'product/category/<str:menu>' : [
+        scenario('category', 'get', lambda context, index: (
+            f'/product/category/{context["menus"][index % len(context["menus"])]}', None
+        )),
+    ],
+    'product/<int:product_id>' : [
+        scenario('detail', 'get', lambda context, index: (
+            f'/product/{context["products"][index % len(context["products"])]}', None
+        )),
+    ],
+    'product/<int:product_id>/review' : [
+        scenario('reviews', 'get', lambda context, index: (
+            f'/product/{context["reviews"][index % len(context["reviews"])][0]}/review', {'sort' : 'score_high'}
+        )),
+        scenario('write review', 'post', lambda context, index: (
+            f'/product/{context["products"][index % len(context["products"])]}/review',
+            {'score' : 5, 'description' : 'benchmark'},
+        ), auth=True, writes=True),
+    ],
+    'product/<int:product_id>/review/replies' : [
+        scenario('first replies of a review page', 'get', lambda context, index: (
+            f'/product/{context["reviews"][index % len(context["reviews"])][0]}/review/replies',
+            {'review_ids' : context['threads'][context['reviews'][index % len(context['reviews'])][0]]},
+        )),
+    ],
+    'product/<int:product_id>/review/<int:review_id>' : [
+        scenario('edit foreign review', 'put', lambda context, index: (
+            review_path(context, index), {'description' : 'benchmark'}
+        ), auth=True),
+    ],
+    'product/<int:product_id>/review/<int:review_id>/reply' : [
+        scenario('replies', 'get', lambda context, index: (review_path(context, index, '/reply'), None)),
+    ],
+    'product/<int:product_id>/review/<int:review_id>/reply/<int:reply_id>' : [
+        scenario('replies by reply url', 'get', lambda context, index: (review_path(context, index, '/reply/1'), None)),
+    ],
+    'order/cart' : [
+        scenario('cart', 'get', lambda context, index: ('/order/cart', None), auth=True),
+        scenario('bulk cart update', 'patch', lambda context, index: ('/order/cart', {
+            'update' : [{'cart_id' : cart_id, 'quantity' : 2} for cart_id in context['carts'].get(
+                context['users'][index % len(context['users'])].id, []
+            )],
+        }), auth=True, writes=True),
+    ],
+    'order/payment' : [
+        scenario('payment summary', 'get', lambda context, index: ('/order/payment', None), auth=True),
+    ],
+    'metrics' : [
+        scenario('metrics', 'get', lambda context, index: ('/metrics', None)),
+    ],
+}
+
+
+def url_routes(patterns=None, prefix=''):
+    routes = []
+
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            routes += url_routes(pattern.url_patterns, prefix + str(pattern.pattern))
+
+        elif isinstance(pattern, URLPattern):
+            routes.append(prefix + str(pattern.pattern))
+
+    return routes
+
+
+def percentile(values, fraction):
+    return values[max(int(len(values) * fraction + 0.5) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = 'Drive every URL through the test client, report latency and query counts, and compare with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--only', nargs='*', help='run only scenarios whose route or name contains one of these')
+        parser.add_argument('--writes', action='store_true', help='include scenarios that modify data')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument(
+            '--write-baseline', action='store_true', help='add scenarios missing from the baseline, keep existing entries',
+        )
+        parser.add_argument(
+            '--replace-baseline', action='store_true', help='overwrite every entry, for changes to the benchmark itself',
+        )
+        parser.add_argument('--threshold', type=float, default=0.2, help='allowed regression ratio')
+        parser.add_argument('--slack-ms', type=float, default=2.0, help='latency change always tolerated')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        context = self.build_context(random.Random(options['seed']))
+        routes  = url_routes()
+        results = {}
+
+        for route in routes:
+            if route not in SCENARIOS:
+                self.stdout.write(self.style.WARNING(f'{route}: no scenario'))
+
+        for route in routes:
+            for item in SCENARIOS.get(route, []):
+                if item.writes and not options['writes']:
+                    continue
+
+                if options['only'] and not any(word in route or word in item.name for word in options['only']):
+                    continue
+
+                with override_settings(RESPONSE_CACHE_TIMEOUT=0, PRODUCT_DETAIL_CACHE_TIMEOUT=0):
+                    results[f'{route} [{item.name}]'] = self.measure(
+                        item, context, options['iterations'], options['warmup']
+                    )
+
+        self.stdout.write(f'{"scenario":<88} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>8} {"errors":>6}')
+        for key, result in results.items():
+            self.stdout.write(
+                f'{key:<88} {result["p50_ms"]:8.1f} {result["p95_ms"]:8.1f} {result["p99_ms"]:8.1f} '
+                f'{result["queries"]:8.1f} {result["errors"]:6d}'
+            )
+
+        baseline_path = Path(options['baseline'])
+        baseline      = json.loads(baseline_path.read_text())['scenarios'] if baseline_path.exists() else {}
+
+        if options['write_baseline'] or options['replace_baseline']:
+            added = results if options['replace_baseline'] else {
+                key : result for key, result in results.items() if key not in baseline
+            }
+
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps({
+                'dataset'   : context['dataset'],
+                'scenarios' : {**baseline, **added},
+            }, indent=2, ensure_ascii=False, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Wrote {len(added)} scenarios to {baseline_path}'))
+            return
+
+        regressions = []
+
+        for key, result in results.items():
+            expected = baseline.get(key)
+
+            if expected is None:
+                continue
+
+            if result['p95_ms'] > expected['p95_ms'] * (1 + options['threshold']) + options['slack_ms']:
+                regressions.append(f'{key}: p95 {expected["p95_ms"]:.1f} -> {result["p95_ms"]:.1f} ms')
+
+            if result['queries'] > expected['queries'] * (1 + options['threshold']) + 0.5:
+                regressions.append(f'{key}: queries {expected["queries"]:.1f} -> {result["queries"]:.1f}')
+
+            if result['errors'] > expected['errors']:
+                regressions.append(f'{key}: errors {expected["errors"]} -> {result["errors"]}')
+
+        if regressions:
+            raise CommandError('Regressed against baseline:\n' + '\n'.join(regressions))
+
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path}'))
+
+    def build_context(self, generator):
+        product_count = Product.objects.count()
+        users         = list(User.objects.filter(carts__is_open=True).distinct().order_by('id')[:200])
+
+        if not product_count or not users:
+            raise CommandError('Seed a dataset first, for example with seed_dataset')
+
+        product_ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:5000])
+        carts       = {}
+
+        for cart_id, user_id in Cart.objects.filter(user__in=users, is_open=True).values_list('id', 'user_id'):
+            carts.setdefault(user_id, []).append(cart_id)
+
+        reviews = list(Review.objects.order_by('-id').values_list('product_id', 'id')[:500])
+        threads = {}
+
+        for product_id, review_id in Review.objects.filter(
+            product_id__in={product_id for product_id, _ in reviews}
+        ).order_by('-created_at', '-id').values_list('product_id', 'id'):
+            page = threads.setdefault(product_id, [])
+
+            if len(page) < settings.REVIEW_PAGE_COUNT:
+                page.append(review_id)
+
+        return {
+            'run'      : int(time.time()),
+            'password' : SEED_PASSWORD,
+            'users'    : users,
+            'tokens'   : {user.id : jwt.encode({'user_id' : user.id}, settings.SECRET_KEY, algorithm='HS256') for user in users},
+            'carts'    : carts,
+            'products' : generator.sample(product_ids, min(len(product_ids), 500)),
+            'reviews'  : reviews,
+            'threads'  : threads,
+            'menus'    : list(Menu.objects.order_by('id').values_list('name', flat=True)),
+            'colors'   : list(Color.objects.order_by('id').values_list('name', flat=True)),
+            'words'    : ['폴로', '클래식 니트'],
+            'dataset'  : {
+                'products' : product_count,
+                'reviews'  : Review.objects.count(),
+                'users'    : User.objects.count(),
+            },
+        }
+
+    def measure(self, item, context, iterations, warmup):
+        client    = Client(raise_request_exception=False)
+        latencies = []
+        queries   = []
+        errors    = 0
+
+        for index in range(warmup + iterations):
+            path, data = item.build(context, index)
+            user       = context['users'][index % len(context['users'])]
+            extra      = {'HTTP_AUTHORIZATION' : context['tokens'][user.id]} if item.auth else {}
+
+            if item.method == 'get':
+                call = lambda: client.get(path, data, **extra)
+            else:
+                call = lambda: getattr(client, item.method)(
+                    path, json.dumps(data or {}), content_type='application/json', **extra
+                )
+
+            with CaptureQueriesContext(connection) as captured:
+                started  = time.perf_counter()
+                response = call()
+                elapsed  = time.perf_counter() - started
+
+            if index < warmup:
+                continue
+
+            latencies.append(elapsed * 1000)
+            queries.append(len(captured))
+
+            if response.status_code >= 500:
+                errors += 1
+
+        latencies.sort()
+        return {
+            'p50_ms'  : round(statistics.median(latencies), 3),
+            'p95_ms'  : round(percentile(latencies, 0.95), 3),
+            'p99_ms'  : round(percentile(latencies, 0.99), 3),
+            'queries' : round(statistics.mean(queries), 2),
+            'errors'  : errors,
+        }
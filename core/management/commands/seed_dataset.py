@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.synthetic import SEED_PASSWORD, seed_dataset
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic catalog with reviews, users, carts and coupons for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100000)
+        parser.add_argument('--reviews', type=int, default=1000000)
+        parser.add_argument('--users', type=int, default=50000)
+        parser.add_argument('--coupons', type=int, default=20)
+        parser.add_argument('--carts-per-user', type=int, default=3, help='average open cart lines per user')
+        parser.add_argument('--colors', type=int, default=40)
+        parser.add_argument('--sizes', type=int, default=12)
+        parser.add_argument('--hashtags', type=int, default=200)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        seed_dataset(
+            products       = options['products'],
+            reviews        = options['reviews'],
+            users          = options['users'],
+            coupons        = options['coupons'],
+            carts_per_user = options['carts_per_user'],
+            colors         = options['colors'],
+            sizes          = options['sizes'],
+            hashtags       = options['hashtags'],
+            chunk_size     = options['chunk_size'],
+            seed           = options['seed'],
+            log            = lambda message: self.stdout.write(f'{message} ({time.perf_counter() - started:.1f}s)'),
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Done. Every synthetic user signs in with "{SEED_PASSWORD}"'))
@@ -0,0 +1,165 @@
+import bisect
+import contextvars
+import re
+import threading
+import time
+
+from collections import Counter
+
+current_queries = contextvars.ContextVar('current_queries', default=None)
+
+IN_LIST_PATTERN = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+NUMBER_PATTERN  = re.compile(r'\b\d+\b')
+
+
+def sql_shape(sql):
+    return NUMBER_PATTERN.sub('?', IN_LIST_PATTERN.sub('(%s, ...)', sql))
+
+
+class QueryLog:
+    def __init__(self):
+        self.lock     = threading.Lock()
+        self.count    = 0
+        self.duration = 0.0
+        self.shapes   = Counter()
+
+    def add(self, sql, duration):
+        shape = sql_shape(sql)
+
+        with self.lock:
+            self.count         += 1
+            self.duration      += duration
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold):
+        with self.lock:
+            return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+def record_query(execute, sql, params, many, context):
+    queries = current_queries.get()
+
+    if queries is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+
+    finally:
+        queries.add(sql, time.perf_counter() - started)
+
+
+def request_route(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match else 'unmatched'
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+
+    return '{' + ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    ) + '}'
+
+
+class CounterMetric:
+    kind = 'counter'
+
+    def __init__(self, name, help):
+        self.name   = name
+        self.help   = help
+        self.lock   = threading.Lock()
+        self.values = {}
+
+    def inc(self, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, labels, value) for labels, value in sorted(self.values.items())]
+
+
+class GaugeMetric(CounterMetric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[tuple(sorted(labels.items()))] = value
+
+
+class HistogramMetric:
+    kind = 'histogram'
+
+    def __init__(self, name, help, buckets):
+        self.name    = name
+        self.help    = help
+        self.buckets = tuple(sorted(buckets))
+        self.lock    = threading.Lock()
+        self.values  = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+
+        with self.lock:
+            counts = self.values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-1]                                      += value
+
+    def samples(self):
+        samples = []
+
+        with self.lock:
+            for labels, counts in sorted(self.values.items()):
+                observed = 0
+                for bucket, count in zip(self.buckets + ('+Inf',), counts):
+                    observed += count
+                    samples.append((f'{self.name}_bucket', labels + (('le', bucket),), observed))
+
+                samples.append((f'{self.name}_sum', labels, counts[-1]))
+                samples.append((f'{self.name}_count', labels, observed))
+
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock    = threading.Lock()
+        self.metrics = {}
+
+    def register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help):
+        return self.register(CounterMetric(name, help))
+
+    def gauge(self, name, help):
+        return self.register(GaugeMetric(name, help))
+
+    def histogram(self, name, help, buckets):
+        return self.register(HistogramMetric(name, help, buckets))
+
+    def render(self):
+        lines = []
+
+        with self.lock:
+            metrics = list(self.metrics.values())
+
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{format_labels(labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import time
+
+from django.conf              import settings
+from django.http              import JsonResponse
+from django.utils.cache       import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .admission   import Ticket, admission, record_decision, route_priority
+from .compression import compress, compressible, encode_response, negotiate
+from .metrics     import QueryLog, current_queries, registry, request_route
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by URL pattern', settings.METRICS_LATENCY_BUCKETS
+)
+REQUESTS       = registry.counter('http_requests_total', 'Requests by URL pattern, method and status')
+DB_QUERIES     = registry.counter('http_request_db_queries_total', 'Database queries run by requests')
+DB_SECONDS     = registry.counter('http_request_db_seconds_total', 'Time spent in database queries')
+RESPONSE_BYTES = registry.counter('http_response_bytes_total', 'Response body bytes')
+N_PLUS_ONE     = registry.counter('http_request_n_plus_one_total', 'Requests that repeated one SQL shape too often')
+
+
+class MetricsMiddleware:
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        queries = QueryLog()
+        token   = current_queries.set(queries)
+        started = time.perf_counter()
+
+        try:
+            response = self.get_response(request)
+
+        finally:
+            current_queries.reset(token)
+
+        return self.record(request, response, queries, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        queries = QueryLog()
+        token   = current_queries.set(queries)
+        started = time.perf_counter()
+
+        try:
+            response = await self.get_response(request)
+
+        finally:
+            current_queries.reset(token)
+
+        return self.record(request, response, queries, time.perf_counter() - started)
+
+    def record(self, request, response, queries, duration):
+        route = request_route(request)
+        size  = None if response.streaming else len(response.content)
+
+        REQUEST_SECONDS.observe(duration, route=route, method=request.method)
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        DB_QUERIES.inc(queries.count, route=route)
+        DB_SECONDS.inc(queries.duration, route=route)
+
+        if size is not None:
+            RESPONSE_BYTES.inc(size, route=route)
+
+        repeated = queries.repeated(settings.METRICS_N_PLUS_ONE_THRESHOLD)
+
+        if repeated:
+            N_PLUS_ONE.inc(route=route)
+            shape, count = repeated[0]
+            logger.warning('Possible N+1 in %s %s: %d queries shaped like %s', request.method, route, count, shape)
+
+        response['Server-Timing'] = (
+            f'db;dur={queries.duration * 1000:.1f};desc="{queries.count} queries", '
+            f'total;dur={duration * 1000:.1f}'
+        )
+        return response
+
+
+class ReleasingIterator:
+    def __init__(self, content, ticket):
+        self.content = iter(content)
+        self.ticket  = ticket
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.content)
+
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        self.ticket.release()
+
+        if hasattr(self.content, 'close'):
+            self.content.close()
+
+
+class AdmissionMiddleware:
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        admission.publish_limits()
+
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view  = self.async_process_view
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        try:
+            response = self.get_response(request)
+
+        except BaseException:
+            self.release(request, None)
+            raise
+
+        return self.release(request, response)
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+
+        except BaseException:
+            self.release(request, None)
+            raise
+
+        return self.release(request, response)
+
+    def admission_route(self, request):
+        route = request_route(request)
+
+        if not settings.ADMISSION_ENABLED or route in settings.ADMISSION_EXEMPT_ROUTES:
+            return None
+
+        return route
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route = self.admission_route(request)
+
+        if route is None:
+            return None
+
+        priority = route_priority(route)
+        started  = time.perf_counter()
+
+        return self.decide(request, route, priority, admission.acquire(route, priority), started)
+
+    async def async_process_view(self, request, view_func, view_args, view_kwargs):
+        route = self.admission_route(request)
+
+        if route is None:
+            return None
+
+        priority = route_priority(route)
+        started  = time.perf_counter()
+
+        return self.decide(request, route, priority, await admission.async_acquire(route, priority), started)
+
+    def decide(self, request, route, priority, outcome, started):
+        record_decision(route, priority, outcome, started)
+
+        if outcome in ('admitted', 'queued'):
+            request.admission_ticket = Ticket(route, priority)
+            return None
+
+        response                = JsonResponse({"error": "SERVER_BUSY"}, status=503)
+        response['Retry-After'] = settings.ADMISSION_RETRY_AFTER
+        return response
+
+    def release(self, request, response):
+        ticket = request.__dict__.pop('admission_ticket', None)
+
+        if ticket is None:
+            return response
+
+        if response is not None and response.streaming:
+            response.streaming_content = ReleasingIterator(response.streaming_content, ticket)
+        else:
+            ticket.release()
+
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if not compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+        if encoding is None:
+            return response
+
+        body = compress(response.content, encoding, request_route(request))
+
+        if len(body) >= len(response.content):
+            return response
+
+        return encode_response(request, response, encoding, body)
@@ -0,0 +1,15 @@
+# Generated by Django 3.1.5 on 2026-10-18 09:12
+
+from django.core.management import call_command
+from django.db              import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,135 @@
+import json
+
+from collections import namedtuple
+
+from django.conf                  import settings
+from django.core.exceptions       import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http                  import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Encoder = namedtuple('Encoder', 'text value format', defaults=(None,))
+
+INFINITY       = float('inf')
+django_default = DjangoJSONEncoder().default
+encode_string  = json.encoder.encode_basestring_ascii
+
+
+def identity(value):
+    return value
+
+
+def number_text(value):
+    if value != value:
+        return 'NaN'
+
+    if value == INFINITY:
+        return 'Infinity'
+
+    if value == -INFINITY:
+        return '-Infinity'
+
+    return repr(value)
+
+
+def nullable(encoder):
+    return Encoder(
+        lambda value: 'null' if value is None else encoder.text(value),
+        lambda value: None if value is None else encoder.value(value),
+    )
+
+
+def array(encoder):
+    return Encoder(
+        lambda values: '[' + ', '.join([encoder.text(value) for value in values]) + ']',
+        lambda values: [encoder.value(value) for value in values],
+    )
+
+
+integer  = Encoder(int.__repr__, identity, '%s')
+number   = Encoder(number_text, identity)
+string   = Encoder(encode_string, identity)
+boolean  = Encoder(lambda value: 'true' if value else 'false', identity)
+decimal  = Encoder(lambda value: f'"{value}"', str, '"%s"')
+datetime = Encoder(lambda value: '"' + django_default(value) + '"', django_default)
+generic  = Encoder(lambda value: json.dumps(value, cls=DjangoJSONEncoder), identity)
+
+
+class Schema:
+    def __init__(self, fields, mapping=False):
+        namespace = {}
+        parents   = {}
+        template  = []
+        texts     = []
+        values    = []
+
+        for index, (name, field) in enumerate(fields.items()):
+            source, encoder = (name, field) if hasattr(field, 'text') else field
+
+            parent, _, attribute = source.rpartition('.')
+
+            if mapping:
+                access = f'item[{source!r}]'
+            elif parent:
+                access = parents.setdefault(parent, f'parent_{len(parents)}') + '.' + attribute
+            else:
+                access = 'item.' + attribute
+
+            namespace[f'text_{index}']  = encoder.text
+            namespace[f'value_{index}'] = encoder.value
+            template.append(('{' if index == 0 else ', ') + encode_string(name).replace('%', '%%') + ': ')
+            template.append(encoder.format or '%s')
+            texts.append(f'{access}, ' if encoder.format else f'text_{index}({access}), ')
+            values.append(f'{name!r} : value_{index}({access}), ')
+
+        namespace['template'] = ''.join(template) + '}' if template else '{}'
+        lookups               = ''.join(f'    {local} = item.{parent}\n' for parent, local in parents.items())
+
+        exec(
+            f"def text(item):\n{lookups}    return template % ({''.join(texts)})\n"
+            f"def value(item):\n{lookups}    return {{{''.join(values)}}}\n",
+            namespace,
+        )
+
+        self.text  = namespace['text']
+        self.value = namespace['value']
+
+
+class Document:
+    def __init__(self, fields):
+        self.fields = {name : (encode_string(name) + ': ', encoder) for name, encoder in fields.items()}
+
+    def field(self, name):
+        return self.fields.get(name) or (encode_string(name) + ': ', generic)
+
+    def text(self, data):
+        parts = []
+
+        for name, value in data.items():
+            prefix, encoder = self.field(name)
+            parts.append(prefix + encoder.text(value))
+
+        return '{' + ', '.join(parts) + '}'
+
+    def value(self, data):
+        return {name : self.field(name)[1].value(value) for name, value in data.items()}
+
+
+def render(document, data, backend=None):
+    if (backend or settings.JSON_RENDERER_BACKEND) == 'orjson':
+        if orjson is None:
+            raise ImproperlyConfigured('JSON_RENDERER_BACKEND is orjson but orjson is not installed')
+
+        return orjson.dumps(document.value(data), default=django_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+    return document.text(data).encode('utf-8')
+
+
+class SchemaJsonResponse(HttpResponse):
+    def __init__(self, document, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=render(document, data), **kwargs)
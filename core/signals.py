@@ -0,0 +1,10 @@
+from django.db.backends.signals import connection_created
+from django.dispatch            import receiver
+
+from .metrics import record_query
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
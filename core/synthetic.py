@@ -0,0 +1,139 @@
+import datetime
+import random
+
+from django.conf  import settings
+from django.db    import transaction
+from django.utils import timezone
+
+from order.models      import Cart
+from product.facets    import facet_index
+from product.models    import Product, ProductColorImage, ProductSize, Review
+from product.synthetic import WORDS, bulk_insert, next_id, seed_products
+from product.utils     import rebuild_product_cards
+from user.hashers      import hash_password
+from user.models       import Coupon, Membership, User, UserCoupon
+
+SEED_PASSWORD = 'benchmark1234!'
+MEMBERSHIPS   = [('WELCOME', 0), ('FRIENDS', 3), ('FAMILY', 5), ('VIP', 10)]
+
+
+def seed_users(users, coupons, carts_per_user, product_ids, generator, chunk_size):
+    memberships = list(Membership.objects.order_by('id'))
+
+    if not memberships:
+        memberships = [Membership.objects.create(grade=grade, discount_rate=rate) for grade, rate in MEMBERSHIPS]
+
+    password   = hash_password(SEED_PASSWORD, settings.PASSWORD_HASHER_ROUNDS)
+    coupon_ids = [Coupon.objects.create(
+        name          = f'{generator.choice(WORDS)} 쿠폰 {index}',
+        discount_rate = generator.choice([5, 10, 15, 20]),
+        description   = ' '.join(generator.choices(WORDS, k=6)),
+    ).id for index in range(coupons)]
+
+    colors = {}
+    sizes  = {}
+
+    for product_id, color_id, image_id in ProductColorImage.objects.filter(
+        product_id__gte=product_ids[0], image__isnull=False
+    ).values_list('product_id', 'color_id', 'image_id').iterator():
+        colors.setdefault(product_id, []).append((color_id, image_id))
+
+    for product_id, size_id in ProductSize.objects.filter(product_id__gte=product_ids[0]).values_list(
+        'product_id', 'size_id'
+    ).iterator():
+        sizes.setdefault(product_id, []).append(size_id)
+
+    first_id = next_id(User)
+
+    for start in range(0, users, chunk_size):
+        user_ids = range(first_id + start, first_id + min(start + chunk_size, users))
+
+        with transaction.atomic():
+            User.objects.bulk_create([User(
+                id           = user_id,
+                name         = f'user{user_id}',
+                email        = f'user{user_id}@synthetic.example.com',
+                phone_number = f'010{user_id:08d}',
+                password     = password,
+                address      = f'서울시 {generator.choice(WORDS)}로 {user_id}',
+                membership   = generator.choice(memberships),
+                is_active    = True,
+            ) for user_id in user_ids])
+
+            bulk_insert(UserCoupon, [
+                UserCoupon(user_id=user_id, coupon_id=coupon_id)
+                for user_id in user_ids
+                for coupon_id in generator.sample(coupon_ids, min(generator.randint(0, 3), len(coupon_ids)))
+            ], chunk_size)
+
+            cart_products = {
+                user_id : generator.sample(product_ids, min(generator.randint(0, carts_per_user * 2), len(product_ids)))
+                for user_id in user_ids
+            }
+
+            bulk_insert(Cart, [
+                Cart(
+                    user_id      = user_id,
+                    product_id   = product_id,
+                    size_id      = generator.choice(sizes[product_id]),
+                    color_id     = color_id,
+                    thumbnail_id = image_id,
+                    quantity     = generator.randint(1, 3),
+                )
+                for user_id, picks in cart_products.items()
+                for product_id in picks if product_id in colors and product_id in sizes
+                for color_id, image_id in [generator.choice(colors[product_id])]
+            ], chunk_size)
+
+    return list(range(first_id, first_id + users))
+
+
+def seed_reviews(reviews, product_ids, user_ids, generator, chunk_size):
+    first_id = next_id(Review)
+    chunks   = (reviews + chunk_size - 1) // chunk_size
+    now      = timezone.now()
+
+    for chunk, start in enumerate(range(0, reviews, chunk_size)):
+        count = min(chunk_size, reviews - start)
+        rows  = []
+
+        for review_id in range(first_id + start, first_id + start + count):
+            product_id = product_ids[int(len(product_ids) * generator.random() ** 2)]
+            image_url  = f'https://images.example.com/reviews/{review_id}.jpg' if generator.random() < 0.2 else None
+            rows.append(Review(
+                id          = review_id,
+                user_id     = generator.choice(user_ids),
+                product_id  = product_id,
+                score       = generator.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 6, 9])[0],
+                description = ' '.join(generator.choices(WORDS, k=generator.randint(3, 15))),
+                image_url   = image_url,
+                has_photo   = image_url is not None,
+            ))
+
+        with transaction.atomic():
+            Review.objects.bulk_create(rows)
+            Review.objects.filter(id__gte=first_id + start, id__lt=first_id + start + count).update(
+                created_at = now - datetime.timedelta(hours=chunks - chunk)
+            )
+
+
+def seed_dataset(
+    products=100000, reviews=1000000, users=50000, coupons=20, carts_per_user=3,
+    colors=40, sizes=12, hashtags=200, chunk_size=5000, seed=0, log=None,
+):
+    generator = random.Random(seed)
+    log       = log or (lambda message: None)
+
+    first_product_id = next_id(Product)
+    seed_products(products, colors=colors, sizes=sizes, hashtags=hashtags, chunk_size=chunk_size, seed=seed)
+    product_ids = list(Product.objects.filter(id__gte=first_product_id).order_by('id').values_list('id', flat=True))
+    log(f'Seeded {len(product_ids)} products')
+
+    user_ids = seed_users(users, coupons, carts_per_user, product_ids, generator, chunk_size)
+    log(f'Seeded {len(user_ids)} users with carts and coupons')
+
+    seed_reviews(reviews, product_ids, user_ids, generator, chunk_size)
+    rebuild_product_cards(chunk_size=chunk_size)
+    log(f'Seeded {reviews} reviews')
+
+    facet_index.invalidate()
@@ -0,0 +1,549 @@
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from datetime      import date, datetime, timezone
+from decimal       import Decimal
+from types         import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache            import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db                    import transaction
+from django.db.utils              import ConnectionHandler
+from django.http                  import HttpResponse
+from django.test                  import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from .admission             import AdmissionController, admission
+from .backends.pooled.base  import connection_pool, ping
+from .backends.pooled.pool  import ConnectionPool, PoolTimeout
+from .cache                 import cache_anonymous_response, cacheable, response_cache
+from .checks                import check_response_cache_backend
+from .compression           import compress_gzip, negotiate
+from .db                    import release_connections
+from .middleware            import CompressionMiddleware
+from .renderers             import Document, Schema, render
+from .                      import renderers
+
+LOCMEM_CACHES = {'default' : {'BACKEND' : 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class ResponseCacheBackendTest(SimpleTestCase):
+    def test_anonymous_gets_are_cacheable(self):
+        self.assertTrue(cacheable(RequestFactory().get('/product')))
+        self.assertFalse(cacheable(RequestFactory().get('/product', HTTP_AUTHORIZATION='token')))
+        self.assertEqual(check_response_cache_backend(None), [])
+
+        with self.settings(RESPONSE_CACHE_TIMEOUT=0):
+            self.assertFalse(cacheable(RequestFactory().get('/product')))
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_locmem_backend_is_reported(self):
+        self.assertEqual([warning.id for warning in check_response_cache_backend(None)], ['core.W001'])
+
+        with self.settings(RESPONSE_CACHE_TIMEOUT=0):
+            self.assertEqual(check_response_cache_backend(None), [])
+
+
+class CountingView:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = 0
+        self.lock  = threading.Lock()
+
+    def response_tags(self, request):
+        return ['catalog', 'products']
+
+    @cache_anonymous_response('counting')
+    def get(self, request):
+        with self.lock:
+            self.calls += 1
+            calls       = self.calls
+
+        time.sleep(self.delay)
+        return HttpResponse(f'call {calls}')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESPONSE_CACHE_WAIT_INTERVAL=0.01)
+class ResponseCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get(self, view, path='/product'):
+        return view.get(RequestFactory().get(path)).content
+
+    def test_tag_invalidation_refills_only_tagged_entries(self):
+        view = CountingView()
+
+        self.assertEqual(self.get(view), b'call 1')
+        self.assertEqual(self.get(view), b'call 1')
+
+        response_cache.invalidate(['menu:1'])
+        self.assertEqual(self.get(view), b'call 1')
+
+        response_cache.invalidate(['products'])
+        self.assertEqual(self.get(view), b'call 2')
+        self.assertEqual(self.get(view, '/product?page=2'), b'call 3')
+
+    def test_concurrent_misses_fill_once(self):
+        view      = CountingView(delay=0.2)
+        responses = []
+        threads   = [threading.Thread(target=lambda: responses.append(self.get(view))) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(view.calls, 1)
+        self.assertEqual(responses, [b'call 1'] * 8)
+
+    @override_settings(RESPONSE_CACHE_LOCK_TIMEOUT=0.05)
+    def test_waiters_fall_through_when_the_fill_outlives_the_lock_timeout(self):
+        view      = CountingView(delay=0.3)
+        responses = []
+        threads   = [threading.Thread(target=lambda: responses.append(self.get(view))) for _ in range(3)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(responses), [b'call 1', b'call 2', b'call 3'])
+
+
+@override_settings(ADMISSION_ENABLED=True, ADMISSION_MAX_IN_FLIGHT=4, ADMISSION_QUEUE_SIZE=0, ADMISSION_RETRY_AFTER=7)
+class AdmissionMiddlewareTest(TestCase):
+    def saturate(self, priority, count):
+        for _ in range(count):
+            self.assertEqual(admission.acquire('held', priority), 'admitted')
+            self.addCleanup(admission.release, 'held', priority)
+
+    def test_saturated_class_is_shed_fast_with_retry_after(self):
+        self.saturate('browse', 3)
+
+        started  = time.perf_counter()
+        response = self.client.get('/product')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertEqual(response.json(), {'error' : 'SERVER_BUSY'})
+        self.assertLess(time.perf_counter() - started, 0.1)
+
+    @override_settings(ADMISSION_QUEUE_SIZE=4, ADMISSION_QUEUE_TIMEOUT=0.05)
+    def test_queued_request_gives_up_after_the_queue_timeout(self):
+        self.saturate('browse', 3)
+
+        started  = time.perf_counter()
+        response = self.client.get('/product')
+        elapsed  = time.perf_counter() - started
+
+        self.assertEqual(response.status_code, 503)
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(admission.waiters, [])
+
+    def test_exempt_and_higher_priority_routes_pass_while_saturated(self):
+        self.saturate('browse', 3)
+
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+        self.assertEqual(self.client.get('/order/cart').status_code, 401)
+
+        self.saturate('checkout', 1)
+
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+        self.assertEqual(self.client.get('/order/cart').status_code, 503)
+
+    def test_slots_are_released_after_the_response(self):
+        self.saturate('browse', 2)
+
+        for _ in range(3):
+            self.assertEqual(self.client.get('/product').status_code, 200)
+
+        self.assertEqual(sum(admission.in_flight.values()), 2)
+
+
+@override_settings(ADMISSION_MAX_IN_FLIGHT=2, ADMISSION_QUEUE_SIZE=1, ADMISSION_QUEUE_TIMEOUT=2)
+class AdmissionControllerTest(SimpleTestCase):
+    def test_release_admits_a_queued_waiter(self):
+        controller = AdmissionController()
+        outcomes   = []
+
+        self.assertEqual(controller.acquire('product', 'checkout'), 'admitted')
+        self.assertEqual(controller.acquire('product', 'checkout'), 'admitted')
+
+        waiter = threading.Thread(target=lambda: outcomes.append(controller.acquire('product', 'checkout')))
+        waiter.start()
+
+        while not controller.waiters:
+            time.sleep(0.001)
+
+        controller.release('product', 'checkout')
+        waiter.join()
+
+        self.assertEqual(outcomes, ['queued'])
+        self.assertEqual(controller.in_flight['checkout'], 2)
+
+    def test_higher_priority_evicts_a_queued_lower_priority_waiter(self):
+        controller = AdmissionController()
+
+        controller.acquire('product', 'checkout')
+        controller.acquire('product', 'checkout')
+
+        browse = controller.enter('product', 'browse')
+
+        self.assertEqual(controller.enter('user/signin', 'signin'), False)
+
+        checkout = controller.enter('order/cart', 'checkout')
+
+        self.assertEqual(browse.admitted, False)
+        self.assertEqual(controller.settle(browse), 'rejected')
+        self.assertEqual(controller.waiters, [checkout])
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'pool.sqlite3')
+
+    def connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def test_checkout_and_return_reuse_the_connection(self):
+        pool  = ConnectionPool('test', {'MAX_SIZE' : 2})
+        entry = pool.acquire(self.connect, ping)
+
+        pool.release(entry)
+
+        self.assertIs(pool.acquire(self.connect, ping), entry)
+        self.assertEqual((pool.size, len(pool.idle)), (1, 0))
+
+        pool.release(entry)
+        self.assertEqual((pool.size, len(pool.idle)), (1, 1))
+
+    def test_failed_health_check_replaces_the_connection(self):
+        pool  = ConnectionPool('test', {'MAX_SIZE' : 1, 'HEALTH_CHECK_INTERVAL' : 0})
+        entry = pool.acquire(self.connect, ping)
+
+        entry.connection.close()
+        pool.release(entry)
+
+        replacement = pool.acquire(self.connect, ping)
+
+        self.assertIsNot(replacement, entry)
+        ping(replacement.connection)
+        self.assertEqual(pool.size, 1)
+
+    def test_broken_and_expired_connections_free_their_slot(self):
+        pool  = ConnectionPool('test', {'MAX_SIZE' : 1, 'MAX_LIFETIME' : 0})
+        entry = pool.acquire(self.connect, ping)
+
+        pool.release(entry, healthy=False)
+        self.assertEqual(pool.size, 0)
+
+        pool.release(pool.acquire(self.connect, ping))
+        self.assertEqual((pool.size, len(pool.idle)), (0, 0))
+
+    def test_exhausted_pool_times_out_and_recovers(self):
+        pool  = ConnectionPool('test', {'MAX_SIZE' : 1, 'TIMEOUT' : 0.05})
+        entry = pool.acquire(self.connect, ping)
+
+        started = time.perf_counter()
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(self.connect, ping)
+
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+
+        pool.timeout = 2
+        threading.Timer(0.01, pool.release, (entry,)).start()
+
+        self.assertIs(pool.acquire(self.connect, ping), entry)
+
+    def test_pooled_backend_returns_connections_on_close(self):
+        handler    = ConnectionHandler({'default' : {
+            'ENGINE' : 'core.backends.pooled',
+            'NAME'   : self.path,
+            'POOL'   : {'ENGINE' : 'django.db.backends.sqlite3', 'MAX_SIZE' : 1, 'TIMEOUT' : 0.05},
+        }})
+        connection = handler['default']
+        pool       = connection_pool('default', connection.settings_dict)
+
+        for _ in range(3):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+            raw = connection.connection
+            connection.close()
+
+            self.assertEqual((pool.size, len(pool.idle)), (1, 1))
+            self.assertIs(pool.idle[0].connection, raw)
+
+        connection.connect()
+        other = ConnectionHandler({'default' : connection.settings_dict})['default']
+
+        with self.assertRaises(PoolTimeout):
+            other.connect()
+
+        connection.close()
+
+
+class ReleaseConnectionsTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'release.sqlite3')
+
+    def connection(self, **options):
+        handler    = ConnectionHandler({'default' : {
+            'ENGINE' : 'django.db.backends.sqlite3', 'NAME' : self.path, **options,
+        }})
+        connection = handler['default']
+        self.addCleanup(connection.close)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        return handler, connection
+
+    def test_closes_connections_without_a_max_age(self):
+        handler, connection = self.connection(CONN_MAX_AGE=0)
+
+        with patch('core.db.connections', handler):
+            release_connections()
+
+        self.assertIsNone(connection.connection)
+
+    def test_keeps_persistent_connections(self):
+        handler, connection = self.connection(CONN_MAX_AGE=60)
+        raw                 = connection.connection
+
+        with patch('core.db.connections', handler):
+            release_connections()
+
+        self.assertIs(connection.connection, raw)
+
+    def test_keeps_connections_inside_a_transaction(self):
+        handler, connection = self.connection(CONN_MAX_AGE=0)
+
+        with patch('core.db.connections', handler), patch('django.db.transaction.connections', handler):
+            with transaction.atomic():
+                raw = connection.connection
+                release_connections()
+
+                self.assertIs(connection.connection, raw)
+
+            release_connections()
+
+        self.assertIsNone(connection.connection)
+
+
+class SchemaRendererTest(SimpleTestCase):
+    item = Schema({
+        'id'        : renderers.integer,
+        'name'      : renderers.string,
+        'price'     : renderers.decimal,
+        'score'     : ('card.score_avg', renderers.number),
+        'thumbnail' : ('card.thumbnail_url', renderers.nullable(renderers.string)),
+        'updated'   : ('card.updated_at', renderers.datetime),
+    })
+    document = Document({
+        'COUNT'   : renderers.nullable(renderers.integer),
+        'ITEMS'   : renderers.array(item),
+        'TAGS'    : renderers.array(Schema({'tag_id' : renderers.integer, '100%' : renderers.string}, mapping=True)),
+        'CURSOR'  : renderers.nullable(renderers.string),
+        'FACETS'  : renderers.generic,
+        'CREATED' : renderers.datetime,
+    })
+
+    def items(self):
+        values = [
+            (1, '린넨 셔츠 "오버핏"', Decimal('39000.00'), 4.5, 'https://images.example/1.jpg', datetime(2021, 1, 2, 3, 4, 5)),
+            (2, 'back\\slash\n%s', Decimal('1E+3'), 0, None, datetime(2021, 1, 2, 3, 4, 5, 678901, timezone.utc)),
+            (3, '', Decimal('-0.10'), 1 / 3, '', date(2021, 1, 2)),
+            (4, 'nan', Decimal('12'), float('nan'), '\u2028', datetime(2021, 1, 2, 3, 4, 5, 6000)),
+        ]
+
+        return [SimpleNamespace(id=id, name=name, price=price, card=SimpleNamespace(
+            score_avg=score, thumbnail_url=thumbnail, updated_at=updated
+        )) for id, name, price, score, thumbnail, updated in values]
+
+    def data(self, **overrides):
+        return {
+            'COUNT'   : 4,
+            'ITEMS'   : self.items(),
+            'TAGS'    : [{'tag_id' : 7, '100%' : '여름'}, {'tag_id' : 8, '100%' : '%d'}],
+            'CURSOR'  : None,
+            'FACETS'  : {'colors' : {'navy' : 2, '네이비' : 1}, 'price' : Decimal('1.5')},
+            'CREATED' : datetime(2021, 5, 6, 7, 8, 9, 123456),
+            **overrides,
+        }
+
+    def plain(self, data):
+        return {**data, 'ITEMS' : [{
+            'id'        : item.id,
+            'name'      : item.name,
+            'price'     : item.price,
+            'score'     : item.card.score_avg,
+            'thumbnail' : item.card.thumbnail_url,
+            'updated'   : item.card.updated_at,
+        } for item in data['ITEMS']]}
+
+    def test_matches_django_json_encoder_byte_for_byte(self):
+        cases = [
+            self.data(),
+            self.data(COUNT=None, ITEMS=[], TAGS=[], CURSOR='eyJvcmRlciI6ICJpZCJ9'),
+            {'CURSOR' : 'only', 'EXTRA' : [Decimal('2.50'), date(2020, 2, 29)]},
+            {},
+        ]
+
+        for data in cases:
+            with self.subTest(fields=list(data)):
+                self.assertEqual(
+                    render(self.document, data, backend='json'),
+                    json.dumps(self.plain(data) if 'ITEMS' in data else data, cls=DjangoJSONEncoder).encode('utf-8'),
+                )
+
+    def test_orjson_backend_decodes_to_the_same_payload(self):
+        if renderers.orjson is None:
+            self.skipTest('orjson is not installed')
+
+        data = self.data(ITEMS=self.items()[:3])
+
+        self.assertEqual(
+            json.loads(render(self.document, data, backend='orjson')),
+            json.loads(render(self.document, data, backend='json')),
+        )
+
+
+PAYLOAD = json.dumps([{'image_url' : f'https://images.example/{index}.jpg'} for index in range(100)]).encode()
+
+
+def fake_brotli(content):
+    return b'br:' + gzip.compress(content, mtime=0)
+
+
+class PayloadView:
+    def __init__(self):
+        self.calls = 0
+
+    def response_tags(self, request):
+        return ['products']
+
+    @cache_anonymous_response('payload')
+    def get(self, request):
+        self.calls      += 1
+        response         = HttpResponse(PAYLOAD, content_type='application/json')
+        response['ETag'] = '"7-3"'
+        return response
+
+
+@override_settings(CACHES=LOCMEM_CACHES, COMPRESSION_MIN_SIZE=1024)
+class CompressionTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        negotiate.cache_clear()
+        self.addCleanup(negotiate.cache_clear)
+
+        compressors = patch('core.compression.COMPRESSORS', {'br' : fake_brotli, 'gzip' : compress_gzip})
+        compressors.start()
+        self.addCleanup(compressors.stop)
+
+    def request(self, accept_encoding=None, **headers):
+        if accept_encoding is not None:
+            headers['HTTP_ACCEPT_ENCODING'] = accept_encoding
+
+        return RequestFactory().get('/product', **headers)
+
+    def test_negotiation_honours_quality_values(self):
+        cases = {
+            ''                   : None,
+            'identity'           : None,
+            'gzip'               : 'gzip',
+            'GZIP, deflate'      : 'gzip',
+            'gzip;q=0'           : None,
+            'gzip;q=x'           : None,
+            'gzip, br'           : 'br',
+            'gzip, br;q=0.5'     : 'gzip',
+            'br;q=0, gzip;q=0.1' : 'gzip',
+            '*'                  : 'br',
+            '*;q=0.5, br;q=0'    : 'gzip',
+        }
+
+        for accept_encoding, encoding in cases.items():
+            with self.subTest(accept_encoding=accept_encoding):
+                self.assertEqual(negotiate(accept_encoding), encoding)
+
+    def test_middleware_compresses_large_bodies_with_a_weak_etag(self):
+        middleware = CompressionMiddleware(lambda request: None)
+
+        for accept_encoding, encoding, decompress in (
+            ('gzip', 'gzip', gzip.decompress),
+            ('br, gzip', 'br', lambda body: gzip.decompress(body[3:])),
+        ):
+            with self.subTest(encoding=encoding):
+                response         = HttpResponse(PAYLOAD, content_type='application/json')
+                response['ETag'] = '"7-3"'
+                response         = middleware.process_response(self.request(accept_encoding), response)
+
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(response['Content-Length'], str(len(response.content)))
+                self.assertEqual(response['ETag'], 'W/"7-3"')
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+                self.assertEqual(decompress(response.content), PAYLOAD)
+
+    def test_middleware_skips_small_and_unaccepted_bodies(self):
+        middleware = CompressionMiddleware(lambda request: None)
+        cases      = (
+            ('gzip', HttpResponse(b'{}', content_type='application/json')),
+            ('gzip', HttpResponse(PAYLOAD, content_type='image/png')),
+            ('identity', HttpResponse(PAYLOAD, content_type='application/json')),
+        )
+
+        for accept_encoding, response in cases:
+            with self.subTest(accept_encoding=accept_encoding, content_type=response['Content-Type']):
+                response['ETag'] = '"7-3"'
+                response         = middleware.process_response(self.request(accept_encoding), response)
+
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response['ETag'], '"7-3"')
+
+    def test_cached_responses_reuse_their_compressed_variants(self):
+        view = PayloadView()
+
+        with patch('core.compression.compress_gzip', wraps=compress_gzip) as compressor:
+            with patch.dict('core.compression.COMPRESSORS', gzip=compressor):
+                responses = [view.get(self.request('gzip')) for _ in range(3)]
+
+        self.assertEqual((view.calls, compressor.call_count), (1, 1))
+
+        for response in responses:
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['ETag'], 'W/"7-3"')
+            self.assertEqual(gzip.decompress(response.content), PAYLOAD)
+
+        plain = view.get(self.request())
+
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual((plain.content, plain['ETag']), (PAYLOAD, '"7-3"'))
+
+    def test_cached_responses_answer_weak_and_strong_validators(self):
+        view = PayloadView()
+        view.get(self.request('gzip'))
+
+        for etag in ('"7-3"', 'W/"7-3"', '"1-1", W/"7-3"'):
+            with self.subTest(etag=etag):
+                response = view.get(self.request('gzip', HTTP_IF_NONE_MATCH=etag))
+
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+        self.assertEqual(view.get(self.request('gzip', HTTP_IF_NONE_MATCH='W/"7-2"')).status_code, 200)
+        self.assertEqual(view.calls, 1)
@@ -0,0 +1,36 @@
+import asyncio
+import functools
+
+from django.http  import HttpResponse
+from django.views import View
+
+from .db      import database_pool
+from .metrics import registry
+
+
+class AsyncView(View):
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        functools.update_wrapper(async_view, view)
+        return async_view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() in self.http_method_names:
+            handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+        else:
+            handler = self.http_method_not_allowed
+
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(request, *args, **kwargs)
+
+        return await database_pool.run(handler, request, *args, **kwargs)
+
+
+class MetricsView(View):
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,118 @@
+import random
+import statistics
+import time
+
+from collections        import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models            import Count
+
+from core.db        import call_db
+from order.models   import Cart, Order, OrderItem
+from order.utils    import EmptyCart, checkout
+from product.models import ProductColorImage, Size
+from user.models    import Coupon, Membership, User, UserCoupon
+
+
+class Command(BaseCommand):
+    help = 'Run many concurrent checkouts against the configured database and verify every cart is ordered once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--lines', type=int, default=5, help='cart lines per user, all on the same hot products')
+        parser.add_argument('--attempts', type=int, default=2, help='concurrent checkouts fired per user')
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--keep', action='store_true', help='keep the synthetic users and their orders')
+
+    def handle(self, *args, **options):
+        color_images = list(ProductColorImage.objects.filter(image__isnull=False).order_by('id')[:options['lines']])
+        size         = Size.objects.order_by('id').first()
+        membership   = Membership.objects.order_by('id').first()
+
+        if len(color_images) < options['lines'] or size is None or membership is None:
+            raise CommandError('Seed products, sizes and memberships first')
+
+        prefix = f'checkout-contention-{int(time.time())}'
+        coupon = Coupon.objects.create(name=prefix, discount_rate=10)
+        User.objects.bulk_create([User(
+            name         = f'contention {index}',
+            email        = f'{prefix}-{index}@example.com',
+            phone_number = '010-0000-0000',
+            password     = '',
+            membership   = membership,
+        ) for index in range(options['users'])])
+
+        users = list(User.objects.filter(email__startswith=prefix))
+        UserCoupon.objects.bulk_create([UserCoupon(user=user, coupon=coupon) for user in users])
+        Cart.objects.bulk_create([Cart(
+            user         = user,
+            product_id   = color_image.product_id,
+            size         = size,
+            color_id     = color_image.color_id,
+            thumbnail_id = color_image.image_id,
+            quantity     = 1,
+        ) for user in users for color_image in color_images], ignore_conflicts=True)
+
+        coupons = dict(UserCoupon.objects.filter(coupon=coupon).values_list('user_id', 'id'))
+        tasks   = [user for user in users for _ in range(options['attempts'])]
+        random.shuffle(tasks)
+
+        def run(user):
+            started = time.perf_counter()
+
+            try:
+                call_db(checkout, user, coupons[user.id])
+                outcome = 'ordered'
+
+            except (EmptyCart, UserCoupon.DoesNotExist):
+                outcome = 'rejected'
+
+            except Exception as error:
+                outcome = type(error).__name__
+
+            return outcome, time.perf_counter() - started
+
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            results = list(executor.map(run, tasks))
+
+        elapsed   = time.perf_counter() - started
+        outcomes  = Counter(outcome for outcome, _ in results)
+        latencies = sorted(latency for _, latency in results)
+
+        orders_per_user = Counter(dict(
+            Order.objects.filter(user__in=users).values('user_id').annotate(orders=Count('id')).values_list('user_id', 'orders')
+        ))
+        open_carts = Cart.objects.filter(user__in=users, is_open=True).count()
+        items      = OrderItem.objects.filter(order__user__in=users).count()
+        ordered    = outcomes['ordered']
+
+        self.stdout.write(
+            f'{len(tasks)} checkouts by {options["threads"]} threads in {elapsed:.2f}s '
+            f'({len(tasks) / elapsed:.1f}/s), p50 {statistics.median(latencies) * 1000:.1f} ms, '
+            f'p99 {latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000:.1f} ms'
+        )
+        self.stdout.write(', '.join(f'{outcome}={count}' for outcome, count in sorted(outcomes.items())))
+
+        problems = []
+
+        if any(count > 1 for count in orders_per_user.values()):
+            problems.append('a user was charged twice')
+
+        if open_carts != (len(users) - len(orders_per_user)) * options['lines']:
+            problems.append(f'{open_carts} carts left open')
+
+        if items != ordered * options['lines']:
+            problems.append(f'{items} order items for {ordered} orders')
+
+        if not options['keep']:
+            Order.objects.filter(user__in=users).delete()
+            User.objects.filter(email__startswith=prefix).delete()
+            coupon.delete()
+
+        if problems:
+            raise CommandError('; '.join(problems))
+
+        self.stdout.write(self.style.SUCCESS('Every cart was ordered at most once'))
@@ -0,0 +1,46 @@
+# Generated by Django 3.1.5 on 2026-10-17 22:48
+
+from django.db        import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_open_lines(apps, schema_editor):
+    Cart = apps.get_model('order', 'Cart')
+    Cart.objects.filter(order__isnull=False).update(is_open=None)
+
+    duplicates = Cart.objects.filter(is_open=True).values('user_id', 'product_id', 'size_id', 'color_id').annotate(
+        keep_id  = Min('id'),
+        quantity = Sum('quantity'),
+        lines    = Count('id'),
+    ).filter(lines__gt=1)
+
+    for line in duplicates:
+        carts = Cart.objects.filter(
+            is_open    = True,
+            user_id    = line['user_id'],
+            product_id = line['product_id'],
+            size_id    = line['size_id'],
+            color_id   = line['color_id'],
+        )
+        carts.filter(id=line['keep_id']).update(quantity=line['quantity'])
+        carts.exclude(id=line['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='is_open',
+            field=models.BooleanField(default=True, null=True),
+        ),
+        migrations.RunPython(merge_open_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(fields=('user', 'product', 'size', 'color', 'is_open'), name='carts_open_line_unique'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 3.1.5 on 2026-10-17 22:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_checkout_status(apps, schema_editor):
+    OrderStatus = apps.get_model('order', 'OrderStatus')
+    OrderStatus.objects.get_or_create(status='결제완료')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0006_review_feed_indexes'),
+        ('user', '0002_outboxemail'),
+        ('order', '0002_cart_open_line_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='address',
+            field=models.CharField(blank=True, max_length=1000, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='coupon_discount_rate',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='coupon_name',
+            field=models.CharField(blank=True, max_length=800, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='membership_discount_rate',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='user_coupon',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order', to='user.usercoupon'),
+        ),
+        migrations.CreateModel(
+            name='OrderItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_name', models.CharField(max_length=45)),
+                ('size_name', models.CharField(max_length=45)),
+                ('color_name', models.CharField(max_length=45)),
+                ('quantity', models.IntegerField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('discount_rate', models.IntegerField(default=0)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='order.order')),
+                ('product', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='product.product')),
+            ],
+            options={
+                'db_table': 'order_items',
+            },
+        ),
+        migrations.RunPython(create_checkout_status, migrations.RunPython.noop),
+    ]
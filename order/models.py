@@ -2,14 +2,38 @@ from django.db import models
 
 
 class Order(models.Model):
-    user         = models.ForeignKey('user.User', on_delete=models.CASCADE)
-    created_at   = models.DateTimeField(auto_now_add=True)
-    order_status = models.ForeignKey('OrderStatus', on_delete=models.CASCADE)
+    user                     = models.ForeignKey('user.User', on_delete=models.CASCADE)
+    created_at               = models.DateTimeField(auto_now_add=True)
+    order_status             = models.ForeignKey('OrderStatus', on_delete=models.CASCADE)
+    address                  = models.CharField(max_length=1000, null=True, blank=True)
+    user_coupon              = models.OneToOneField(
+        'user.UserCoupon', related_name='order', on_delete=models.SET_NULL, null=True, blank=True
+    )
+    coupon_name              = models.CharField(max_length=800, null=True, blank=True)
+    coupon_discount_rate     = models.IntegerField(default=0)
+    membership_discount_rate = models.IntegerField(default=0)
+    subtotal                 = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    total_price              = models.DecimalField(max_digits=20, decimal_places=2, default=0)
 
     class Meta:
         db_table = 'orders'
 
 
+class OrderItem(models.Model):
+    order         = models.ForeignKey('Order', related_name='items', on_delete=models.CASCADE)
+    product       = models.ForeignKey('product.Product', on_delete=models.SET_NULL, null=True)
+    product_name  = models.CharField(max_length=45)
+    size_name     = models.CharField(max_length=45)
+    color_name    = models.CharField(max_length=45)
+    quantity      = models.IntegerField()
+    price         = models.DecimalField(max_digits=20, decimal_places=2)
+    discount_rate = models.IntegerField(default=0)
+    unit_price    = models.DecimalField(max_digits=20, decimal_places=2)
+
+    class Meta:
+        db_table = 'order_items'
+
+
 class OrderStatus(models.Model):
     status = models.CharField(max_length=800)
 
@@ -25,6 +49,10 @@ class Cart(models.Model):
     order     = models.ForeignKey('Order', on_delete=models.CASCADE, null=True, blank=True)
     thumbnail = models.ForeignKey('product.Image', on_delete=models.CASCADE)
     quantity  = models.IntegerField(default=0)
+    is_open   = models.BooleanField(null=True, default=True)
 
     class Meta:
-        db_table = 'carts'
+        db_table    = 'carts'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product', 'size', 'color', 'is_open'], name='carts_open_line_unique'),
+        ]
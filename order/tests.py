@@ -1,3 +1,262 @@
+from unittest import mock
+
+import jwt
+
+from django.conf import settings
 from django.test import TestCase
 
-# Create your tests here.
+from .models         import Cart, Order, OrderItem
+from .utils          import TooManyLines, EmptyCart, apply_cart_lines, checkout
+from product.models  import Menu, MainCategory, SubCategory, Product, Size, Color, Image
+from product.pricing import discounted
+from user.models     import User, Membership, Coupon, UserCoupon
+
+
+class CartFixtureMixin:
+    @classmethod
+    def setUpTestData(cls):
+        menu          = Menu.objects.create(name='men')
+        main_category = MainCategory.objects.create(name='tops', menu=menu)
+        sub_category  = SubCategory.objects.create(name='shirts', main_category=main_category, menu=menu)
+        membership    = Membership.objects.create(id=1, grade='basic', discount_rate=10)
+
+        cls.products = [Product.objects.create(
+            name          = f'product {index}',
+            sub_category  = sub_category,
+            menu          = menu,
+            code          = f'P{index}',
+            price         = 10000 + index * 1000,
+            discount_rate = 10,
+        ) for index in range(12)]
+        cls.size  = Size.objects.create(name='M')
+        cls.color = Color.objects.create(name='navy')
+        cls.image = Image.objects.create(image_url='https://example.com/navy.jpg')
+        cls.user  = User.objects.create(
+            name         = 'buyer',
+            email        = 'buyer@example.com',
+            phone_number = '01011112222',
+            password     = '',
+            membership   = membership,
+            address      = 'Seoul',
+        )
+        cls.other = User.objects.create(
+            name         = 'other',
+            email        = 'other@example.com',
+            phone_number = '01033334444',
+            password     = '',
+            membership   = membership,
+        )
+
+    def line(self, product, quantity=1):
+        return {
+            'product_id' : product.id,
+            'size_id'    : self.size.id,
+            'color_id'   : self.color.id,
+            'image_id'   : self.image.id,
+            'quantity'   : quantity,
+        }
+
+    def open_carts(self, user):
+        return {cart.product_id : cart for cart in Cart.objects.filter(user=user, is_open=True)}
+
+
+class ApplyCartLinesTest(CartFixtureMixin, TestCase):
+    def test_adds_merge_into_one_line_per_product(self):
+        apply_cart_lines(self.user, add=[self.line(self.products[0], 2), self.line(self.products[0], 3)])
+        apply_cart_lines(self.user, add=[self.line(self.products[0])])
+
+        carts = self.open_carts(self.user)
+
+        self.assertEqual(len(carts), 1)
+        self.assertEqual(carts[self.products[0].id].quantity, 6)
+
+    def test_mixed_add_update_and_remove(self):
+        apply_cart_lines(self.user, add=[self.line(product) for product in self.products[:3]])
+        carts = self.open_carts(self.user)
+
+        apply_cart_lines(
+            self.user,
+            add    = [self.line(self.products[0], 2), self.line(self.products[3], 4)],
+            update = [
+                {'cart_id' : carts[self.products[1].id].id, 'quantity' : 7},
+                {'cart_id' : carts[self.products[2].id].id, 'quantity' : 0},
+            ],
+        )
+        carts = self.open_carts(self.user)
+
+        self.assertEqual({product_id : cart.quantity for product_id, cart in carts.items()}, {
+            self.products[0].id : 3,
+            self.products[1].id : 7,
+            self.products[3].id : 4,
+        })
+
+        apply_cart_lines(self.user, remove=[carts[self.products[0].id].id, carts[self.products[3].id].id])
+
+        self.assertEqual(list(self.open_carts(self.user)), [self.products[1].id])
+
+    def test_update_and_add_on_the_same_line(self):
+        apply_cart_lines(self.user, add=[self.line(self.products[0])])
+        cart = self.open_carts(self.user)[self.products[0].id]
+
+        apply_cart_lines(self.user, add=[self.line(self.products[0], 2)], update=[{'cart_id' : cart.id, 'quantity' : 5}])
+
+        cart.refresh_from_db()
+        self.assertEqual(cart.quantity, 7)
+
+    def test_other_users_lines_are_rejected_and_nothing_changes(self):
+        apply_cart_lines(self.other, add=[self.line(self.products[0])])
+        apply_cart_lines(self.user, add=[self.line(self.products[1])])
+        foreign = self.open_carts(self.other)[self.products[0].id]
+
+        for lines in (
+            {'update' : [{'cart_id' : foreign.id, 'quantity' : 9}]},
+            {'remove' : [foreign.id]},
+        ):
+            with self.assertRaises(Cart.DoesNotExist):
+                apply_cart_lines(self.user, add=[self.line(self.products[2])], **lines)
+
+        foreign.refresh_from_db()
+
+        self.assertEqual(foreign.quantity, 1)
+        self.assertTrue(foreign.is_open)
+        self.assertEqual(list(self.open_carts(self.user)), [self.products[1].id])
+
+    def test_closed_lines_cannot_be_updated(self):
+        apply_cart_lines(self.user, add=[self.line(self.products[0])])
+        cart = self.open_carts(self.user)[self.products[0].id]
+        Cart.objects.filter(id=cart.id).update(is_open=None)
+
+        with self.assertRaises(Cart.DoesNotExist):
+            apply_cart_lines(self.user, update=[{'cart_id' : cart.id, 'quantity' : 3}])
+
+    def test_rejects_unknown_references_and_bad_quantities(self):
+        with self.assertRaises(Size.DoesNotExist):
+            apply_cart_lines(self.user, add=[{**self.line(self.products[0]), 'size_id' : 0}])
+
+        with self.assertRaises(ValueError):
+            apply_cart_lines(self.user, add=[self.line(self.products[0], 0)])
+
+        with self.settings(CART_BULK_MAX_LINES=2):
+            with self.assertRaises(TooManyLines):
+                apply_cart_lines(self.user, add=[self.line(product) for product in self.products[:3]])
+
+        self.assertFalse(Cart.objects.exists())
+
+    def test_query_count_does_not_grow_with_lines(self):
+        for lines in (self.products[:3], self.products[3:12]):
+            apply_cart_lines(self.user, add=[self.line(product) for product in lines])
+            carts = self.open_carts(self.user)
+
+            with self.assertNumQueries(10):
+                apply_cart_lines(
+                    self.user,
+                    add    = [self.line(product, 2) for product in lines],
+                    update = [{'cart_id' : carts[product.id].id, 'quantity' : 3} for product in lines[1:]],
+                    remove = [carts[lines[0].id].id],
+                )
+
+            self.assertEqual(sorted(cart.quantity for cart in self.open_carts(self.user).values()), [5] * (len(lines) - 1))
+            Cart.objects.all().delete()
+
+    def test_bulk_patch_endpoint(self):
+        token    = jwt.encode({'user_id' : self.user.id}, settings.SECRET_KEY, algorithm='HS256')
+        response = self.client.patch('/order/cart', {
+            'add' : [self.line(self.products[0], 2), self.line(self.products[1])],
+        }, content_type='application/json', HTTP_AUTHORIZATION=token)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(line['count'] for line in response.json()['CART_LIST']), [1, 2])
+
+        foreign  = Cart.objects.create(
+            user      = self.other,
+            product   = self.products[2],
+            size      = self.size,
+            color     = self.color,
+            thumbnail = self.image,
+            quantity  = 1,
+        )
+        response = self.client.patch('/order/cart', {
+            'remove' : [foreign.id],
+        }, content_type='application/json', HTTP_AUTHORIZATION=token)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Cart.objects.filter(id=foreign.id, is_open=True).exists())
+
+
+class CheckoutTest(CartFixtureMixin, TestCase):
+    def setUp(self):
+        self.coupon      = Coupon.objects.create(name='welcome', discount_rate=20)
+        self.user_coupon = UserCoupon.objects.create(user=self.user, coupon=self.coupon)
+
+    def fill_cart(self, products, quantity=2):
+        apply_cart_lines(self.user, add=[self.line(product, quantity) for product in products])
+
+    def test_checkout_consumes_open_lines_and_snapshots_prices(self):
+        self.fill_cart(self.products[:3])
+        cart_ids = set(self.open_carts(self.user)[product.id].id for product in self.products[:3])
+
+        order, items = checkout(self.user, self.user_coupon.id)
+
+        self.assertFalse(Cart.objects.filter(user=self.user, is_open=True).exists())
+        self.assertEqual(set(Cart.objects.filter(order=order).values_list('id', flat=True)), cart_ids)
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 3)
+        self.assertEqual([item.unit_price for item in items], [product.effective_price for product in self.products[:3]])
+        self.assertEqual(order.subtotal, sum(product.effective_price * 2 for product in self.products[:3]))
+        self.assertEqual(order.total_price, discounted(discounted(order.subtotal, 10), 20))
+        self.assertEqual((order.coupon_name, order.address), ('welcome', 'Seoul'))
+
+        Product.objects.filter(id=self.products[0].id).update(price=1, effective_price=1)
+        self.assertEqual(OrderItem.objects.get(order=order, product=self.products[0]).unit_price, items[0].unit_price)
+
+        with self.assertRaises(EmptyCart):
+            checkout(self.user)
+
+    def test_failed_checkout_rolls_back_everything(self):
+        self.fill_cart(self.products[:2])
+        used = checkout(self.user, self.user_coupon.id)[0]
+        self.fill_cart(self.products[2:4])
+
+        foreign = UserCoupon.objects.create(user=self.other, coupon=self.coupon)
+
+        for user_coupon_id in (self.user_coupon.id, foreign.id):
+            with self.assertRaises(UserCoupon.DoesNotExist):
+                checkout(self.user, user_coupon_id)
+
+        self.assertEqual(Order.objects.exclude(id=used.id).count(), 0)
+        self.assertEqual(OrderItem.objects.exclude(order=used).count(), 0)
+        self.assertEqual(set(self.open_carts(self.user)), {product.id for product in self.products[2:4]})
+
+    def test_failure_after_the_order_insert_rolls_back(self):
+        self.fill_cart(self.products[:1])
+
+        with mock.patch('order.utils.OrderItem.objects.bulk_create', side_effect=RuntimeError('disk full')):
+            with self.assertRaises(RuntimeError):
+                checkout(self.user)
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(len(self.open_carts(self.user)), 1)
+
+    def test_query_count_does_not_grow_with_lines(self):
+        for products in (self.products[:1], self.products[1:12]):
+            self.fill_cart(products)
+
+            with self.assertNumQueries(9):
+                order, items = checkout(self.user)
+
+            self.assertEqual(len(items), len(products))
+
+    def test_payment_endpoint(self):
+        token = jwt.encode({'user_id' : self.user.id}, settings.SECRET_KEY, algorithm='HS256')
+
+        response = self.client.post('/order/payment', {}, content_type='application/json', HTTP_AUTHORIZATION=token)
+        self.assertEqual(response.status_code, 400)
+
+        self.fill_cart(self.products[:2])
+        response = self.client.post('/order/payment', {
+            'user_coupon_id' : self.user_coupon.id,
+            'address'        : 'Busan',
+        }, content_type='application/json', HTTP_AUTHORIZATION=token)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['ORDER']['address'], 'Busan')
+        self.assertEqual(len(response.json()['ORDER']['items']), 2)
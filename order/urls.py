@@ -1,8 +1,9 @@
+from django.conf import settings
 from django.urls import path
 
-from .views      import CartView, PaymentView
+from .views      import CartView, AsyncCartView, PaymentView
 
 urlpatterns = [
-    path('/cart', CartView.as_view()),
+    path('/cart', (AsyncCartView if settings.ASYNC_CATALOG_VIEWS else CartView).as_view()),
     path('/payment', PaymentView.as_view())
 ]
@@ -0,0 +1,160 @@
+from decimal import Decimal
+
+from django.conf      import settings
+from django.db        import transaction
+from django.db.models import F, Q
+
+from .models         import Cart, Order, OrderItem, OrderStatus
+from product.models  import Product, Color, Size, Image
+from product.pricing import discounted
+from user.models     import Coupon, Membership, UserCoupon
+
+REFERENCES = (
+    ('product_id', Product),
+    ('size_id', Size),
+    ('color_id', Color),
+    ('image_id', Image),
+)
+
+
+class TooManyLines(Exception):
+    pass
+
+
+class EmptyCart(Exception):
+    pass
+
+
+def check_references(lines):
+    for field, model in REFERENCES:
+        ids = {int(line[field]) for line in lines}
+
+        if ids and model.objects.filter(id__in=ids).count() != len(ids):
+            raise model.DoesNotExist
+
+
+def apply_cart_lines(user, add=(), update=(), remove=()):
+    if len(add) + len(update) + len(remove) > settings.CART_BULK_MAX_LINES:
+        raise TooManyLines
+
+    add_quantities = {}
+    thumbnails     = {}
+
+    for line in add:
+        key      = (int(line['product_id']), int(line['size_id']), int(line['color_id']))
+        quantity = int(line.get('quantity', 1))
+
+        if quantity < 1:
+            raise ValueError(quantity)
+
+        add_quantities[key] = add_quantities.get(key, 0) + quantity
+        thumbnails.setdefault(key, int(line['image_id']))
+
+    quantities = {int(line['cart_id']) : int(line['quantity']) for line in update}
+    remove_ids = {int(cart_id) for cart_id in remove} | {
+        cart_id for cart_id, quantity in quantities.items() if quantity <= 0
+    }
+    update_ids = set(quantities) - remove_ids
+
+    check_references(add)
+
+    with transaction.atomic():
+        if add_quantities:
+            Cart.objects.bulk_create([
+                Cart(
+                    user         = user,
+                    product_id   = product_id,
+                    size_id      = size_id,
+                    color_id     = color_id,
+                    thumbnail_id = thumbnails[product_id, size_id, color_id],
+                    quantity     = 0,
+                ) for product_id, size_id, color_id in add_quantities
+            ], ignore_conflicts=True)
+
+        changed = []
+
+        if add_quantities or update_ids:
+            lines = Q(id__in=update_ids) | Q(product_id__in={key[0] for key in add_quantities})
+
+            for cart in Cart.objects.select_for_update().filter(lines, user=user, is_open=True):
+                key   = (cart.product_id, cart.size_id, cart.color_id)
+                added = add_quantities.get(key, 0)
+
+                if cart.id in update_ids:
+                    cart.quantity = quantities[cart.id] + added
+                    update_ids.discard(cart.id)
+
+                elif added:
+                    cart.quantity = F('quantity') + added
+
+                else:
+                    continue
+
+                changed.append(cart)
+
+        if update_ids:
+            raise Cart.DoesNotExist
+
+        if changed:
+            Cart.objects.bulk_update(changed, ['quantity'])
+
+        if remove_ids:
+            _, removed = Cart.objects.filter(user=user, is_open=True, id__in=remove_ids).delete()
+
+            if removed.get(Cart._meta.label, 0) != len(remove_ids):
+                raise Cart.DoesNotExist
+
+
+def checkout(user, user_coupon_id=None, address=None):
+    with transaction.atomic():
+        cart_ids = list(Cart.objects.select_for_update().filter(user=user, is_open=True).values_list('id', flat=True))
+
+        if not cart_ids:
+            raise EmptyCart
+
+        coupon      = None
+        user_coupon = None
+
+        if user_coupon_id is not None:
+            user_coupon = UserCoupon.objects.select_for_update().get(id=user_coupon_id, user=user)
+
+            if Order.objects.filter(user_coupon=user_coupon).exists():
+                raise UserCoupon.DoesNotExist
+
+            coupon = Coupon.objects.get(id=user_coupon.coupon_id)
+
+        membership = Membership.objects.get(user=user)
+        carts      = Cart.objects.filter(id__in=cart_ids).select_related('product', 'size', 'color').order_by('id')
+        items      = [OrderItem(
+            product       = cart.product,
+            product_name  = cart.product.name,
+            size_name     = cart.size.name,
+            color_name    = cart.color.name,
+            quantity      = cart.quantity,
+            price         = cart.product.price,
+            discount_rate = cart.product.discount_rate,
+            unit_price    = cart.product.effective_price,
+        ) for cart in carts]
+
+        subtotal     = sum((item.unit_price * item.quantity for item in items), Decimal(0))
+        total_price  = discounted(discounted(subtotal, membership.discount_rate), coupon.discount_rate if coupon else 0)
+        status, _    = OrderStatus.objects.get_or_create(status=settings.ORDER_CHECKOUT_STATUS)
+        order        = Order.objects.create(
+            user                     = user,
+            order_status             = status,
+            address                  = address or user.address,
+            user_coupon              = user_coupon,
+            coupon_name              = coupon.name if coupon else None,
+            coupon_discount_rate     = coupon.discount_rate if coupon else 0,
+            membership_discount_rate = membership.discount_rate or 0,
+            subtotal                 = subtotal,
+            total_price              = total_price,
+        )
+
+        for item in items:
+            item.order = order
+
+        OrderItem.objects.bulk_create(items)
+        Cart.objects.filter(id__in=cart_ids).update(order=order, is_open=None)
+
+    return order, items
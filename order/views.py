@@ -4,18 +4,24 @@ from django.views     import View
 from django.http      import JsonResponse
 
 from .models                import Cart
+from .utils                 import TooManyLines, EmptyCart, apply_cart_lines, checkout
+from core.db                import database_pool
+from core.views             import AsyncView
 from product.models         import Product, Color, Size, Image
 from user.models            import User, UserCoupon, Coupon
-from user.utils             import check_user
+from user.utils             import check_user, invalidate_user
 from django.core.exceptions import ObjectDoesNotExist
 
 
 class CartView(View):
     @check_user
     def get(self, request):
-        carts = request.user.carts.select_related("product", "size", "color", "thumbnail")
+        return JsonResponse({'CART_LIST' : self.cart_list(request.user)},status=200)
 
-        cart_list = [{
+    def cart_list(self, user):
+        carts = user.carts.filter(is_open=True).select_related("product", "size", "color", "thumbnail").order_by('id')
+
+        return [{
             "name"          : cart.product.name,
             "price"         : cart.product.price,
             "discount_rate" : cart.product.discount_rate,
@@ -25,24 +31,50 @@ class CartView(View):
             "count"         : cart.quantity,
         }for cart in carts]
 
-        return JsonResponse({'CART_LIST' : cart_list},status=200)
-
     @check_user
     def post(self, request):
         try:
-            data    = json.loads(request.body)
-            cart, _ = Cart.objects.get_or_create(
-                user         = request.user,
-                product_id   = data['product_id'],
-                size_id      = data['size_id'],
-                color_id     = data['color_id'],
-                thumbnail_id = data['image_id'],
+            data = json.loads(request.body)
+            apply_cart_lines(request.user, add=[data])
+
+            return JsonResponse({"MESSAGE" : "Create Cart"}, status=201)
+
+        except Size.DoesNotExist:
+            return JsonResponse({'MESSAGE' : "Size does not exist"}, status=400)
+
+        except Color.DoesNotExist:
+            return JsonResponse({'MESSAGE' : "Color does not exist"}, status=400)
+
+        except Image.DoesNotExist:
+            return JsonResponse({'MESSAGE' : "Image does not exist"}, status=400)
+
+        except Product.DoesNotExist:
+            return JsonResponse({'MESSAGE' : "Product does not exist"}, status=400)
+
+        except (ValueError, TypeError):
+            return JsonResponse({'MESSAGE' : "INVALID_QUANTITY"}, status=400)
+
+        except KeyError:
+            return JsonResponse({"MESSAGE" : "KEY_ERROR"}, status=400)
+
+    @check_user
+    def patch(self, request):
+        try:
+            data = json.loads(request.body)
+            apply_cart_lines(
+                request.user,
+                add    = data.get('add', []),
+                update = data.get('update', []),
+                remove = data.get('remove', []),
             )
 
-            cart.quantity +=1
-            cart.save()
+            return JsonResponse({'CART_LIST' : self.cart_list(request.user)}, status=200)
 
-            return JsonResponse({"MESSAGE" : "Create Cart"}, status=201)
+        except TooManyLines:
+            return JsonResponse({'MESSAGE' : "Too many cart lines"}, status=400)
+
+        except Cart.DoesNotExist:
+            return JsonResponse({'MESSAGE' : "Cart does not exist"}, status=400)
 
         except Size.DoesNotExist:
             return JsonResponse({'MESSAGE' : "Size does not exist"}, status=400)
@@ -56,22 +88,26 @@ class CartView(View):
         except Product.DoesNotExist:
             return JsonResponse({'MESSAGE' : "Product does not exist"}, status=400)
 
+        except (ValueError, TypeError):
+            return JsonResponse({'MESSAGE' : "INVALID_QUANTITY"}, status=400)
+
         except KeyError:
             return JsonResponse({"MESSAGE" : "KEY_ERROR"}, status=400)
 
     @check_user
     def put(self, request):
         try:
-            data       = json.loads(request.body)
-            cart       = Cart.objects.get(user = request.user, id = data['cart_id'])
-            cart.count = data['count']
-            cart.save()
+            data = json.loads(request.body)
+            apply_cart_lines(request.user, update=[{'cart_id' : data['cart_id'], 'quantity' : data['count']}])
 
             return JsonResponse({'MESSAGE' : '카트의 수량을 수정했습니다.'}, status=200)
 
         except Cart.DoesNotExist:
             return JsonResponse({'MESSAGE' : "Cart does not exist"}, status=400)
 
+        except (ValueError, TypeError):
+            return JsonResponse({'MESSAGE' : "INVALID_QUANTITY"}, status=400)
+
         except KeyError:
             return JsonResponse({"MESSAGE" : "KEY_ERROR"}, status=400)
 
@@ -79,7 +115,7 @@ class CartView(View):
     def delete(self, request):
         try:
             data = json.loads(request.body)
-            Cart.objects.get(user = request.user, id = data['cart_id']).delete()
+            apply_cart_lines(request.user, remove=[data['cart_id']])
             return JsonResponse({"MESSAGE" : "Delete cart"}, status=200)
 
         except Cart.DoesNotExist:
@@ -89,7 +125,44 @@ class CartView(View):
             return JsonResponse({"MESSAGE" : "KEY_ERROR"}, status=400)
 
 
+class AsyncCartView(AsyncView, CartView):
+    @check_user
+    async def get(self, request):
+        return JsonResponse({'CART_LIST' : await database_pool.run(self.cart_list, request.user)},status=200)
+
+
 class PaymentView(View):
+    @check_user
+    def post(self, request):
+        try:
+            data         = json.loads(request.body) if request.body else {}
+            order, items = checkout(request.user, data.get('user_coupon_id'), data.get('address'))
+
+            return JsonResponse({'MESSAGE' : 'SUCCESS', 'ORDER' : {
+                'order_id'                 : order.id,
+                'address'                  : order.address,
+                'coupon'                   : order.coupon_name,
+                'coupon_discount_rate'     : order.coupon_discount_rate,
+                'membership_discount_rate' : order.membership_discount_rate,
+                'subtotal'                 : order.subtotal,
+                'total_price'              : order.total_price,
+                'items'                    : [{
+                    'product'       : item.product_name,
+                    'size'          : item.size_name,
+                    'color'         : item.color_name,
+                    'quantity'      : item.quantity,
+                    'price'         : item.price,
+                    'discount_rate' : item.discount_rate,
+                    'unit_price'    : item.unit_price,
+                } for item in items],
+            }}, status=201)
+
+        except EmptyCart:
+            return JsonResponse({'MESSAGE' : "Cart is empty"}, status=400)
+
+        except (UserCoupon.DoesNotExist, ValueError):
+            return JsonResponse({'MESSAGE' : "Coupon does not exist"}, status=400)
+
     @check_user
     def patch(self, request):
         try:
@@ -100,6 +173,7 @@ class PaymentView(View):
 
             if order_address:
                 User.objects.filter(id=user.id).update(address=order_address)
+                invalidate_user(user.id)
                 return JsonResponse({"message": "SUCCESS"}, status=200)
 
         except KeyError:
@@ -110,8 +184,10 @@ class PaymentView(View):
     def get(self, request):
         try:
             user         = request.user
-            carts        = Cart.objects.filter(user=user).select_related('product', 'size', 'color')
-            user_coupons = UserCoupon.objects.filter(user=user).select_related('coupon')
+            carts        = Cart.objects.filter(user=user, is_open=True).select_related(
+                'product', 'size', 'color', 'thumbnail'
+            )
+            user_coupons = UserCoupon.objects.filter(user=user, order__isnull=True).select_related('coupon')
 
             carts_list = [{
                 "product"       : cart.product.name,
@@ -124,9 +200,10 @@ class PaymentView(View):
             } for cart in carts]
 
             coupons_list = [{
+                "user_coupon_id"       : user_coupon.id,
                 "coupon"               : user_coupon.coupon.name,
                 "coupon_discount_rate" : user_coupon.coupon.discount_rate
-            } for coupon in user_coupons]
+            } for user_coupon in user_coupons]
 
             membership = {
                 "grade"         : user.membership.grade,
@@ -0,0 +1,132 @@
+import csv
+
+from collections import defaultdict
+
+from django.conf import settings
+
+from .importer      import CSV_COLOR_SEPARATOR, CSV_LIST_SEPARATOR
+from .models        import Product, ProductColorImage, ProductSize, ProductHashtag
+from .schemas       import EXPORT_PRODUCT
+from core.renderers import render
+
+CSV_COLUMNS = (
+    'code', 'name', 'menu', 'main_category', 'sub_category', 'price', 'discount_rate', 'effective_price',
+    'description', 'review_score_avg', 'review_count', 'sizes', 'hashtags', 'colors',
+)
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson' : 'application/x-ndjson',
+    'csv'    : 'text/csv; charset=utf-8',
+}
+
+PRODUCT_FIELDS = (
+    'id', 'code', 'name', 'menu__name', 'sub_category__main_category__name', 'sub_category__name', 'price',
+    'discount_rate', 'effective_price', 'description', 'card__score_avg', 'card__review_count',
+)
+
+
+def grouped(rows):
+    groups = defaultdict(list)
+
+    for product_id, value in rows:
+        groups[product_id].append(value)
+
+    return groups
+
+
+def export_chunk(rows):
+    product_ids = [row[0] for row in rows]
+    sizes       = grouped(ProductSize.objects.filter(product_id__in=product_ids).order_by('id').values_list(
+        'product_id', 'size__name'
+    ))
+    hashtags    = grouped(ProductHashtag.objects.filter(product_id__in=product_ids).order_by('id').values_list(
+        'product_id', 'hashtag__name'
+    ))
+    colors      = defaultdict(dict)
+
+    for product_id, color, image_url in ProductColorImage.objects.filter(product_id__in=product_ids).order_by(
+        'id'
+    ).values_list('product_id', 'color__name', 'image__image_url'):
+        images = colors[product_id].setdefault(color, [])
+
+        if image_url:
+            images.append(image_url)
+
+    for (
+        product_id, code, name, menu, main_category, sub_category, price,
+        discount_rate, effective_price, description, score_avg, review_count,
+    ) in rows:
+        yield {
+            'id'               : product_id,
+            'code'             : code,
+            'name'             : name,
+            'menu'             : menu,
+            'main_category'    : main_category,
+            'sub_category'     : sub_category,
+            'price'            : price,
+            'discount_rate'    : discount_rate,
+            'effective_price'  : effective_price,
+            'description'      : description,
+            'review_score_avg' : score_avg or 0,
+            'review_count'     : review_count or 0,
+            'sizes'            : sizes[product_id],
+            'hashtags'         : hashtags[product_id],
+            'colors'           : [{'name' : color, 'images' : images} for color, images in colors[product_id].items()],
+        }
+
+
+def export_products(products=None, chunk_size=None):
+    products   = (Product.objects.all() if products is None else products).order_by('id').values_list(*PRODUCT_FIELDS)
+    chunk_size = chunk_size or settings.PRODUCT_EXPORT_CHUNK_SIZE
+    last_id    = 0
+
+    while True:
+        rows = list(products.filter(id__gt=last_id)[:chunk_size])
+
+        if not rows:
+            return
+
+        yield from export_chunk(rows)
+        last_id = rows[-1][0]
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def csv_colors(colors):
+    return CSV_LIST_SEPARATOR.join(
+        CSV_LIST_SEPARATOR.join(f'{color["name"]}{CSV_COLOR_SEPARATOR}{image}' for image in color['images'])
+        if color['images'] else color['name']
+        for color in colors
+    )
+
+
+def ndjson_lines(records):
+    for record in records:
+        yield render(EXPORT_PRODUCT, record) + b'\n'
+
+
+def csv_lines(records):
+    writer = csv.writer(Echo())
+
+    yield writer.writerow(CSV_COLUMNS).encode('utf-8')
+
+    for record in records:
+        yield writer.writerow([
+            *(record[column] for column in CSV_COLUMNS[:-3]),
+            CSV_LIST_SEPARATOR.join(record['sizes']),
+            CSV_LIST_SEPARATOR.join(record['hashtags']),
+            csv_colors(record['colors']),
+        ]).encode('utf-8')
+
+
+EXPORT_WRITERS = {
+    'ndjson' : ndjson_lines,
+    'csv'    : csv_lines,
+}
+
+
+def export_lines(format, products=None, chunk_size=None):
+    return EXPORT_WRITERS[format](export_products(products, chunk_size))
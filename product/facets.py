@@ -0,0 +1,218 @@
+import threading
+
+from collections import defaultdict
+
+from django.db        import connections
+from django.db.models import Count
+
+from .models   import Product, ProductColorImage, ProductSize, ProductHashtag
+from .versions import catalog_version, catalog_versions
+
+FACETS = ('menu', 'sub_category', 'colors', 'sizes', 'hashtags')
+
+FACET_FIELDS = {
+    'menu'         : 'menu__name',
+    'sub_category' : 'sub_category__name',
+    'colors'       : 'productcolorimages__color__name',
+    'sizes'        : 'sizes__name',
+    'hashtags'     : 'hashtags__name',
+}
+
+FACET_VERSION = 'facets'
+
+
+def bit_count(bitmap):
+    return bitmap.bit_count() if hasattr(bitmap, 'bit_count') else bin(bitmap).count('1')
+
+
+def bitmap_ids(bitmap, offset=0, limit=None, after=-1):
+    bits = bin(bitmap)[:1:-1]
+    ids  = []
+
+    position = bits.find('1', after + 1)
+    while position != -1 and (limit is None or len(ids) < offset + limit):
+        ids.append(position)
+        position = bits.find('1', position + 1)
+
+    return ids[offset:]
+
+
+def ids_bitmap(product_ids):
+    product_ids = list(product_ids)
+
+    if not product_ids:
+        return 0
+
+    bits = bytearray(max(product_ids) // 8 + 1)
+    for product_id in product_ids:
+        bits[product_id >> 3] |= 1 << (product_id & 7)
+
+    return int.from_bytes(bits, 'little')
+
+
+def product_facets(product_ids=None):
+    products           = Product.objects.all()
+    productcolorimages = ProductColorImage.objects.all()
+    productsizes       = ProductSize.objects.all()
+    producthashtags    = ProductHashtag.objects.all()
+
+    if product_ids is not None:
+        products           = products.filter(id__in=product_ids)
+        productcolorimages = productcolorimages.filter(product_id__in=product_ids)
+        productsizes       = productsizes.filter(product_id__in=product_ids)
+        producthashtags    = producthashtags.filter(product_id__in=product_ids)
+
+    for product_id, menu, sub_category in products.values_list('id', 'menu__name', 'sub_category__name').iterator():
+        yield 'menu', menu, product_id
+        yield 'sub_category', sub_category, product_id
+
+    for product_id, color in productcolorimages.values_list('product_id', 'color__name').iterator():
+        yield 'colors', color, product_id
+
+    for product_id, size in productsizes.values_list('product_id', 'size__name').iterator():
+        yield 'sizes', size, product_id
+
+    for product_id, hashtag in producthashtags.values_list('product_id', 'hashtag__name').iterator():
+        yield 'hashtags', hashtag, product_id
+
+
+def count_facets(products, filters):
+    counts = {}
+
+    for facet, field in FACET_FIELDS.items():
+        others = products
+        for other, lookups in filters.items():
+            if other != facet and lookups:
+                others = others.filter(**lookups)
+
+        counts[facet] = dict(others.filter(**{f'{field}__isnull' : False}).order_by().values_list(field).annotate(
+            count = Count('id', distinct=True)
+        ))
+
+    return counts
+
+
+class FacetIndex:
+    def __init__(self):
+        self.lock     = threading.RLock()
+        self.bitmaps  = None
+        self.products = 0
+        self.version  = None
+        self.building = False
+
+    def build(self):
+        bitmaps  = {facet : defaultdict(int) for facet in FACETS}
+        products = 0
+        version  = catalog_version(FACET_VERSION)
+
+        for facet, value, product_id in product_facets():
+            bitmaps[facet][value] |= 1 << product_id
+
+        for bitmap in bitmaps['menu'].values():
+            products |= bitmap
+
+        with self.lock:
+            self.bitmaps  = bitmaps
+            self.products = products
+            self.version  = version
+
+    def build_in_background(self):
+        try:
+            self.build()
+
+        finally:
+            with self.lock:
+                self.building = False
+
+            connections.close_all()
+
+    def schedule_build(self):
+        with self.lock:
+            if self.building:
+                return
+
+            self.building = True
+
+        threading.Thread(target=self.build_in_background, name='facet-index', daemon=True).start()
+
+    def current(self):
+        version = catalog_versions.get(FACET_VERSION)
+
+        with self.lock:
+            if self.bitmaps is not None and self.version == version:
+                return True
+
+        self.schedule_build()
+        return False
+
+    def refresh(self, product_ids):
+        version = catalog_versions.bump(FACET_VERSION)
+
+        with self.lock:
+            if self.bitmaps is None:
+                return
+
+            if self.version is None or version != self.version + 1:
+                self.bitmaps = None
+                return
+
+            mask = ids_bitmap(product_ids)
+
+            for values in self.bitmaps.values():
+                for value in list(values):
+                    values[value] &= ~mask
+
+            self.products &= ~mask
+
+            for facet, value, product_id in product_facets(product_ids):
+                self.bitmaps[facet][value] |= 1 << product_id
+                if facet == 'menu':
+                    self.products |= 1 << product_id
+
+            self.version = version
+
+    def invalidate(self):
+        catalog_versions.bump(FACET_VERSION)
+
+        with self.lock:
+            self.bitmaps = None
+
+    def match(self, facet, values):
+        bitmap = 0
+        for value in values:
+            bitmap |= self.bitmaps[facet].get(value, 0)
+
+        return bitmap
+
+    def search(self, selected, restrict=None):
+        if not self.current():
+            return None
+
+        with self.lock:
+            if self.bitmaps is None:
+                return None
+
+            matches = {facet : self.match(facet, values) for facet, values in selected.items() if values}
+            base    = self.products if restrict is None else self.products & restrict
+
+            result = base
+            for bitmap in matches.values():
+                result &= bitmap
+
+            counts = {}
+            for facet in FACETS:
+                others = base
+                for other, bitmap in matches.items():
+                    if other != facet:
+                        others &= bitmap
+
+                counts[facet] = {
+                    value : bit_count(bitmap & others)
+                    for value, bitmap in self.bitmaps[facet].items()
+                    if bitmap & others
+                }
+
+        return result, counts
+
+
+facet_index = FacetIndex()
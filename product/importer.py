@@ -0,0 +1,322 @@
+import csv
+import io
+import itertools
+import json
+import os
+import time
+
+from collections import OrderedDict
+from decimal     import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .facets     import facet_index
+from .models     import (
+    Menu, MainCategory, SubCategory, Product, Color, Size, Hashtag, Image,
+    ProductColorImage, ProductSize, ProductHashtag,
+)
+from .pricing    import discounted
+from .search     import index_products
+from .synthetic  import bulk_insert, next_id
+from .utils      import rebuild_product_cards
+
+CSV_LIST_SEPARATOR  = '|'
+CSV_COLOR_SEPARATOR = '='
+
+
+class CatalogError(ValueError):
+    def __init__(self, row_number, message):
+        super().__init__(f'row {row_number}: {message}')
+
+
+def catalog_format(path):
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def split_list(value):
+    return [item.strip() for item in (value or '').split(CSV_LIST_SEPARATOR) if item.strip()]
+
+
+def csv_colors(value):
+    colors = []
+
+    for item in split_list(value):
+        name, _, image_url = item.partition(CSV_COLOR_SEPARATOR)
+        colors.append({'name' : name.strip(), 'images' : [image_url.strip()] if image_url.strip() else []})
+
+    return colors
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        yield {
+            **row,
+            'sizes'    : split_list(row.get('sizes')),
+            'hashtags' : split_list(row.get('hashtags')),
+            'colors'   : csv_colors(row.get('colors')),
+        }
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_catalog(path, format=None, skip=0):
+    reader = read_csv if (format or catalog_format(path)) == 'csv' else read_jsonl
+
+    with io.open(path, encoding='utf-8', newline='') as stream:
+        yield from itertools.islice(reader(stream), skip, None)
+
+
+def catalog_row(row_number, row):
+    missing = [field for field in ('code', 'name', 'menu', 'sub_category', 'price') if not row.get(field)]
+
+    if missing:
+        raise CatalogError(row_number, f'missing {", ".join(missing)}')
+
+    try:
+        price         = Decimal(str(row['price']))
+        discount_rate = int(row.get('discount_rate') or 0)
+
+    except (InvalidOperation, ValueError):
+        raise CatalogError(row_number, 'price and discount_rate must be numbers')
+
+    colors = OrderedDict()
+
+    for color in row.get('colors') or []:
+        if isinstance(color, str):
+            color = {'name' : color}
+
+        if not color.get('name'):
+            raise CatalogError(row_number, 'color without a name')
+
+        colors.setdefault(color['name'], []).extend(color.get('images') or [])
+
+    return {
+        'code'          : str(row['code']),
+        'name'          : row['name'],
+        'menu'          : row['menu'],
+        'main_category' : row.get('main_category') or '',
+        'sub_category'  : row['sub_category'],
+        'price'         : price,
+        'discount_rate' : discount_rate,
+        'description'   : row.get('description') or None,
+        'sizes'         : list(dict.fromkeys(row.get('sizes') or [])),
+        'hashtags'      : list(dict.fromkeys(row.get('hashtags') or [])),
+        'colors'        : colors,
+    }
+
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, source):
+        if not self.path or not os.path.exists(self.path):
+            return 0
+
+        with open(self.path) as checkpoint:
+            state = json.load(checkpoint)
+
+        return state['rows'] if state.get('source') == os.path.abspath(source) else 0
+
+    def save(self, source, rows):
+        if not self.path:
+            return
+
+        temporary = self.path + '.tmp'
+
+        with open(temporary, 'w') as checkpoint:
+            json.dump({'source' : os.path.abspath(source), 'rows' : rows}, checkpoint)
+
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ImageCache:
+    def __init__(self, size):
+        self.size = size
+        self.ids  = OrderedDict()
+
+    def get(self, image_url):
+        image_id = self.ids.get(image_url)
+
+        if image_id is not None:
+            self.ids.move_to_end(image_url)
+
+        return image_id
+
+    def add(self, image_url, image_id):
+        self.ids[image_url] = image_id
+
+        if len(self.ids) > self.size:
+            self.ids.popitem(last=False)
+
+    def warm(self, image_urls):
+        missing = {image_url for image_url in image_urls if image_url not in self.ids}
+
+        if not missing:
+            return
+
+        images = Image.objects.filter(image_url__in=missing).order_by('-id').values_list('image_url', 'id')
+
+        for image_url, image_id in images:
+            self.add(image_url, image_id)
+
+
+class CatalogImporter:
+    def __init__(self, chunk_size=2000, image_cache_size=100000, log=None):
+        self.chunk_size = chunk_size
+        self.images     = ImageCache(image_cache_size)
+        self.log        = log or (lambda message: None)
+        self.colors     = {name : id for id, name in Color.objects.values_list('id', 'name')}
+        self.sizes      = {name : id for id, name in Size.objects.values_list('id', 'name')}
+        self.hashtags   = {name : id for id, name in Hashtag.objects.values_list('id', 'name')}
+        self.menus      = {name : id for id, name in Menu.objects.values_list('id', 'name')}
+        self.main_categories = {
+            (menu_id, name) : id for id, menu_id, name in MainCategory.objects.values_list('id', 'menu_id', 'name')
+        }
+        self.sub_categories  = {
+            (menu_id, name) : id for id, menu_id, name in SubCategory.objects.values_list('id', 'menu_id', 'name')
+        }
+
+    def reference(self, ids, model, name):
+        if name not in ids:
+            ids[name] = model.objects.create(name=name).id
+
+        return ids[name]
+
+    def sub_category(self, row_number, row):
+        menu_id = self.reference(self.menus, Menu, row['menu'])
+        key     = (menu_id, row['sub_category'])
+
+        if key not in self.sub_categories:
+            if not row['main_category']:
+                raise CatalogError(row_number, f'unknown sub_category {row["sub_category"]!r} without a main_category')
+
+            main_key = (menu_id, row['main_category'])
+
+            if main_key not in self.main_categories:
+                self.main_categories[main_key] = MainCategory.objects.create(name=row['main_category'], menu_id=menu_id).id
+
+            self.sub_categories[key] = SubCategory.objects.create(
+                name             = row['sub_category'],
+                main_category_id = self.main_categories[main_key],
+                menu_id          = menu_id,
+            ).id
+
+        return menu_id, self.sub_categories[key]
+
+    def import_chunk(self, rows):
+        existing = set(Product.objects.filter(code__in=[row['code'] for _, row in rows]).values_list('code', flat=True))
+        rows     = [(row_number, row) for row_number, row in rows if row['code'] not in existing]
+
+        if not rows:
+            return []
+
+        self.images.warm(
+            image_url for _, row in rows for image_urls in row['colors'].values() for image_url in image_urls
+        )
+
+        product_id = next_id(Product)
+        image_id   = next_id(Image)
+
+        product_rows, image_rows, colorimage_rows, size_rows, hashtag_rows = [], [], [], [], []
+        chunk_images = {}
+
+        for row_number, row in rows:
+            existing.add(row['code'])
+            menu_id, sub_category_id = self.sub_category(row_number, row)
+
+            product_rows.append(Product(
+                id              = product_id,
+                name            = row['name'],
+                sub_category_id = sub_category_id,
+                menu_id         = menu_id,
+                code            = row['code'],
+                price           = row['price'],
+                description     = row['description'],
+                discount_rate   = row['discount_rate'],
+                effective_price = discounted(row['price'], row['discount_rate']),
+            ))
+
+            for color_name, image_urls in row['colors'].items():
+                color_id = self.reference(self.colors, Color, color_name)
+
+                if not image_urls:
+                    colorimage_rows.append(ProductColorImage(product_id=product_id, color_id=color_id))
+
+                for image_url in image_urls:
+                    if image_url not in chunk_images:
+                        chunk_images[image_url] = self.images.get(image_url)
+
+                        if chunk_images[image_url] is None:
+                            chunk_images[image_url] = image_id
+                            image_rows.append(Image(id=image_id, image_url=image_url))
+                            image_id += 1
+
+                    colorimage_rows.append(ProductColorImage(
+                        product_id = product_id,
+                        color_id   = color_id,
+                        image_id   = chunk_images[image_url],
+                    ))
+
+            size_rows    += [ProductSize(product_id=product_id, size_id=self.reference(self.sizes, Size, name))
+                for name in row['sizes']]
+            hashtag_rows += [ProductHashtag(product_id=product_id, hashtag_id=self.reference(self.hashtags, Hashtag, name))
+                for name in row['hashtags']]
+
+            product_id += 1
+
+        bulk_insert(Product, product_rows, self.chunk_size)
+        bulk_insert(Image, image_rows, self.chunk_size)
+        bulk_insert(ProductColorImage, colorimage_rows, self.chunk_size)
+        bulk_insert(ProductSize, size_rows, self.chunk_size)
+        bulk_insert(ProductHashtag, hashtag_rows, self.chunk_size)
+
+        for image_url, image_id in chunk_images.items():
+            self.images.add(image_url, image_id)
+
+        return [product.id for product in product_rows]
+
+    def run(self, path, format=None, checkpoint=None):
+        checkpoint = checkpoint or Checkpoint(None)
+        done       = checkpoint.load(path)
+        rows       = enumerate(read_catalog(path, format, skip=done), start=done + 1)
+        started    = time.perf_counter()
+        stats      = {'rows' : 0, 'imported' : 0, 'skipped' : 0, 'resumed_at' : done}
+
+        if done:
+            self.log(f'Resuming after row {done}')
+
+        while True:
+            chunk = [(row_number, catalog_row(row_number, row)) for row_number, row in itertools.islice(rows, self.chunk_size)]
+
+            if not chunk:
+                break
+
+            with transaction.atomic():
+                product_ids = self.import_chunk(chunk)
+
+            rebuild_product_cards(product_ids)
+            index_products(product_ids)
+
+            done              += len(chunk)
+            stats['rows']     += len(chunk)
+            stats['imported'] += len(product_ids)
+            stats['skipped']  += len(chunk) - len(product_ids)
+            checkpoint.save(path, done)
+
+            elapsed = time.perf_counter() - started
+            self.log(f'{done} rows, {stats["imported"]} imported, {stats["rows"] / elapsed:.0f} rows/s')
+
+        facet_index.invalidate()
+        checkpoint.clear()
+
+        stats['seconds'] = time.perf_counter() - started
+        return stats
@@ -0,0 +1,52 @@
+import time
+import tracemalloc
+
+from django.db                   import connection
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils           import CaptureQueriesContext
+
+from product.export import EXPORT_WRITERS, export_lines
+from product.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Measure catalog export throughput, query count and peak memory per format and chunk size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[250, 1000, 5000])
+        parser.add_argument('--formats', choices=list(EXPORT_WRITERS), nargs='+', default=list(EXPORT_WRITERS))
+        parser.add_argument('--limit', type=int, help='export only the first N products')
+
+    def handle(self, *args, **options):
+        products = Product.objects.all()
+
+        if options['limit']:
+            products = Product.objects.filter(id__lte=products.order_by('id').values_list('id', flat=True)[
+                options['limit'] - 1
+            ])
+
+        if not products.exists():
+            raise CommandError('Seed a dataset first, for example with seed_dataset')
+
+        for format in options['formats']:
+            for chunk_size in options['chunk_sizes']:
+                rows, size = 0, 0
+                started    = time.perf_counter()
+
+                with CaptureQueriesContext(connection) as queries:
+                    for line in export_lines(format, products, chunk_size):
+                        rows += 1
+                        size += len(line)
+
+                seconds = time.perf_counter() - started
+
+                tracemalloc.start()
+                for line in export_lines(format, products, chunk_size):
+                    pass
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                self.stdout.write(
+                    f'{format:<7} chunk {chunk_size:>5}  {rows:>8} lines  {rows / seconds:9.0f} lines/s  '
+                    f'{size / seconds / 2 ** 20:6.1f} MB/s  {len(queries):>5} queries  peak {peak / 2 ** 20:6.1f} MB'
+                )
@@ -0,0 +1,75 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from product.facets    import facet_index, bitmap_ids
+from product.models    import Product, Color, Size, Hashtag, SubCategory
+from product.synthetic import seed_products
+
+
+class Command(BaseCommand):
+    help = 'Compare the in-memory facet index with the ORM join path for listing filters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='insert this many synthetic products first')
+        parser.add_argument('--queries', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            seed_products(options['seed'])
+            self.stdout.write(f'Seeded {options["seed"]} synthetic products')
+
+        generator     = random.Random(0)
+        colors        = list(Color.objects.values_list('name', flat=True))
+        sizes         = list(Size.objects.values_list('name', flat=True))
+        hashtags      = list(Hashtag.objects.values_list('name', flat=True))
+        subcategories = list(SubCategory.objects.values_list('name', flat=True))
+
+        selections = [{
+            'sub_category' : [generator.choice(subcategories)] if generator.random() < 0.5 else [],
+            'colors'       : generator.sample(colors, min(len(colors), generator.randint(1, 3))),
+            'sizes'        : generator.sample(sizes, min(len(sizes), generator.randint(0, 2))),
+            'hashtags'     : generator.sample(hashtags, min(len(hashtags), generator.randint(0, 1))),
+        } for _ in range(options['queries'])]
+
+        started = time.perf_counter()
+        facet_index.build()
+        self.stdout.write(f'Index build: {(time.perf_counter() - started) * 1000:.1f} ms '
+                          f'over {Product.objects.count()} products')
+
+        orm_timings, index_timings = [], []
+        for selection in selections:
+            filter_set = {}
+            if selection['sub_category']:
+                filter_set['sub_category__name'] = selection['sub_category'][0]
+            if selection['colors']:
+                filter_set['productcolorimages__color__name__in'] = selection['colors']
+            if selection['sizes']:
+                filter_set['sizes__name__in'] = selection['sizes']
+            if selection['hashtags']:
+                filter_set['hashtags__name__in'] = selection['hashtags']
+
+            started  = time.perf_counter()
+            products = Product.objects.filter(**filter_set).distinct().order_by('id')
+            orm_page = list(products.values_list('id', flat=True)[:16])
+            products.count()
+            orm_timings.append(time.perf_counter() - started)
+
+            started        = time.perf_counter()
+            product_ids, _ = facet_index.search(selection)
+            index_page     = list(Product.objects.filter(id__in=bitmap_ids(product_ids)).order_by('id').values_list(
+                'id', flat=True
+            )[:16])
+            index_timings.append(time.perf_counter() - started)
+
+            if orm_page != index_page:
+                self.stderr.write(f'Result mismatch for {selection}')
+
+        for label, timings in (('orm', orm_timings), ('facet index', index_timings)):
+            timings = sorted(timings)
+            self.stdout.write(
+                f'{label:>12}: p50 {statistics.median(timings) * 1000:.1f} ms, '
+                f'p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.1f} ms'
+            )
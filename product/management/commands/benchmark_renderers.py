@@ -0,0 +1,74 @@
+import json
+import timeit
+
+from django.core.management.base  import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.renderers  import orjson, render
+from product.models  import Product
+from product.schemas import PRODUCT_LIST, PRODUCT_DETAIL
+from product.utils   import product_detail_info, product_detail_querysets
+
+
+def listing_dict(products):
+    return {
+        'PRODUCT_COUNT' : len(products),
+        'PRODUCTS_LIST' : [{
+            'id'               : product.id,
+            'name'             : product.name,
+            'price'            : product.price,
+            'discount_rate'    : product.discount_rate,
+            'effective_price'  : product.effective_price,
+            'review_score_avg' : product.card.score_avg,
+            'thumbnail'        : product.card.thumbnail_url,
+            'color_count'      : product.card.color_count,
+        } for product in products],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare JsonResponse encoding with the schema renderers on listing and detail payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-count', type=int, default=16)
+        parser.add_argument('--number', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        products = list(Product.objects.select_related('card').order_by('id')[:options['page_count']])
+
+        if not products:
+            raise CommandError('Seed a dataset first, for example with seed_dataset')
+
+        rows   = {name : list(rows) for name, rows in product_detail_querysets(products[0].id).items()}
+        detail = {'product' : product_detail_info(rows.pop('product')[0], **rows)}
+        cases  = {
+            'listing' : (PRODUCT_LIST, {'PRODUCT_COUNT' : len(products), 'PRODUCTS_LIST' : products},
+                         lambda: listing_dict(products)),
+            'detail'  : (PRODUCT_DETAIL, detail, lambda: detail),
+        }
+
+        for name, (document, data, legacy) in cases.items():
+            expected = json.dumps(legacy(), cls=DjangoJSONEncoder).encode('utf-8')
+
+            if render(document, data) != expected:
+                raise CommandError(f'{name}: schema output differs from DjangoJSONEncoder')
+
+            timings = {
+                'DjangoJSONEncoder' : lambda: json.dumps(legacy(), cls=DjangoJSONEncoder).encode('utf-8'),
+                'schema json'       : lambda: render(document, data),
+            }
+
+            if orjson is not None:
+                if json.loads(render(document, data, backend='orjson')) != json.loads(expected):
+                    raise CommandError(f'{name}: orjson output decodes differently')
+
+                timings['schema orjson'] = lambda: render(document, data, backend='orjson')
+
+            baseline = None
+
+            for label, func in timings.items():
+                seconds  = min(timeit.repeat(func, number=options['number'], repeat=options['repeat']))
+                micros   = seconds / options['number'] * 1e6
+                baseline = baseline or micros
+                self.stdout.write(f'{name:<8} {label:<18} {micros:9.1f} us  {baseline / micros:5.2f}x  {len(func())} bytes')
@@ -0,0 +1,47 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from product.models    import Product
+from product.search    import search_products
+from product.synthetic import WORDS, seed_products
+
+
+class Command(BaseCommand):
+    help = 'Compare n-gram search index latency with the name__icontains scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('words', nargs='*')
+        parser.add_argument('--seed', type=int, default=0, help='insert this many synthetic products first')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            seed_products(options['seed'])
+            self.stdout.write(f'Seeded {options["seed"]} synthetic products')
+
+        words = options['words'] or WORDS + ['폴로셔츠', '클래식 니트', 'polo shirt']
+
+        def icontains(word):
+            products = Product.objects.filter(name__icontains=word).order_by('id')
+            return products.count(), list(products.values_list('id', flat=True)[:16])
+
+        def ngram(word):
+            product_ids = search_products(word)
+            return len(product_ids), product_ids[:16]
+
+        for label, run in (('icontains', icontains), ('ngram index', ngram)):
+            timings = []
+            for _ in range(options['repeat']):
+                for word in words:
+                    started = time.perf_counter()
+                    run(word)
+                    timings.append(time.perf_counter() - started)
+
+            timings.sort()
+            self.stdout.write(
+                f'{label:>12}: p50 {statistics.median(timings) * 1000:.1f} ms, '
+                f'p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.1f} ms, '
+                f'max {timings[-1] * 1000:.1f} ms'
+            )
@@ -0,0 +1,31 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from product.export import EXPORT_WRITERS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Stream the full product catalog with colors, images, sizes, hashtags and ratings as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_WRITERS), default='ndjson')
+        parser.add_argument('--output', help='defaults to stdout')
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        output  = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        written = 0
+
+        try:
+            for line in export_lines(options['format'], chunk_size=options['chunk_size']):
+                output.write(line)
+                written += len(line)
+
+        finally:
+            if options['output']:
+                output.close()
+
+        self.stderr.write(f'Exported {written} bytes in {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from product.importer import CatalogImporter, Checkpoint
+
+
+class Command(BaseCommand):
+    help = 'Stream a CSV or JSONL catalog file into the product tables in resumable chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--image-cache-size', type=int, default=100000, help='image URLs remembered for dedupe')
+        parser.add_argument('--checkpoint', help='defaults to <path>.checkpoint')
+        parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+
+    def handle(self, *args, **options):
+        checkpoint = Checkpoint(options['checkpoint'] or options['path'] + '.checkpoint')
+
+        if options['restart']:
+            checkpoint.clear()
+
+        importer = CatalogImporter(
+            chunk_size       = options['chunk_size'],
+            image_cache_size = options['image_cache_size'],
+            log              = self.stdout.write,
+        )
+
+        try:
+            stats = importer.run(options['path'], options['format'], checkpoint)
+
+        except (ValueError, OSError) as error:
+            raise CommandError(f'{error}. Fix the input and rerun to resume from {checkpoint.path}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {stats["imported"]} products from {stats["rows"]} rows '
+            f'({stats["skipped"]} existing codes skipped) in {stats["seconds"]:.1f}s, '
+            f'{stats["rows"] / max(stats["seconds"], 1e-9):.0f} rows/s'
+        ))
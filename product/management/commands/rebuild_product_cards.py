@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from product.utils import rebuild_product_cards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized product card table used by the product listing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_ids', nargs='*', type=int)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        product_ids = options['product_ids'] or None
+        count       = rebuild_product_cards(product_ids, chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} product cards'))
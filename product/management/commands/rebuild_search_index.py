@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from product.models import Product
+from product.search import index_products
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the n-gram search index over product names, descriptions and hashtags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_ids', nargs='*', type=int)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        product_ids = options['product_ids'] or list(Product.objects.order_by('id').values_list('id', flat=True))
+
+        index_products(product_ids, chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {len(product_ids)} products'))
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from product.models import Product
+from product.utils  import reprice_products
+
+
+class Command(BaseCommand):
+    help = 'Set a discount rate for many products at once, or recompute effective prices, in chunked UPDATEs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_ids', nargs='*', type=int)
+        parser.add_argument('--discount-rate', type=int, help='leave out to only recompute effective prices')
+        parser.add_argument('--menu')
+        parser.add_argument('--sub-category')
+        parser.add_argument('--hashtag')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        discount_rate = options['discount_rate']
+
+        if discount_rate is not None and not 0 <= discount_rate <= 100:
+            raise CommandError('--discount-rate must be between 0 and 100')
+
+        products = Product.objects.all()
+
+        if options['product_ids']:
+            products = products.filter(id__in=options['product_ids'])
+
+        if options['menu']:
+            products = products.filter(menu__name=options['menu'])
+
+        if options['sub_category']:
+            products = products.filter(sub_category__name=options['sub_category'])
+
+        if options['hashtag']:
+            products = products.filter(hashtags__name=options['hashtag'])
+
+        started = time.perf_counter()
+        count   = reprice_products(products, discount_rate, chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Repriced {count} products in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} products/s)'
+        ))
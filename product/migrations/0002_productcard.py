@@ -0,0 +1,58 @@
+# Generated by Django 3.1.5 on 2026-10-17 22:26
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Min
+import django.db.models.deletion
+
+
+def build_product_cards(apps, schema_editor):
+    Product           = apps.get_model('product', 'Product')
+    ProductCard       = apps.get_model('product', 'ProductCard')
+    ProductColorImage = apps.get_model('product', 'ProductColorImage')
+    Review            = apps.get_model('product', 'Review')
+
+    review_stats = {
+        stat['product_id'] : stat
+        for stat in Review.objects.values('product_id').annotate(score_avg=Avg('score'), review_count=Count('id'))
+    }
+    color_counts = dict(ProductColorImage.objects.values('product_id').annotate(
+        color_count=Count('color_id', distinct=True)
+    ).values_list('product_id', 'color_count'))
+    first_images = ProductColorImage.objects.filter(image__isnull=False).values('product_id').annotate(
+        first_id=Min('id')
+    ).values_list('first_id', flat=True)
+    thumbnails   = dict(ProductColorImage.objects.filter(id__in=list(first_images)).values_list(
+        'product_id', 'image__image_url'
+    ))
+
+    ProductCard.objects.bulk_create([ProductCard(
+        product_id    = product_id,
+        score_avg     = review_stats.get(product_id, {}).get('score_avg') or 0,
+        review_count  = review_stats.get(product_id, {}).get('review_count', 0),
+        color_count   = color_counts.get(product_id, 0),
+        thumbnail_url = thumbnails.get(product_id),
+    ) for product_id in Product.objects.values_list('id', flat=True)], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductCard',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='product.product')),
+                ('score_avg', models.FloatField(db_index=True, default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('color_count', models.IntegerField(default=0)),
+                ('thumbnail_url', models.URLField(max_length=2048, null=True)),
+            ],
+            options={
+                'db_table': 'product_cards',
+            },
+        ),
+        migrations.RunPython(build_product_cards, migrations.RunPython.noop),
+    ]
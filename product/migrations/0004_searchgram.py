@@ -0,0 +1,49 @@
+# Generated by Django 3.1.5 on 2026-10-17 22:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from product.search import product_grams
+
+
+def build_search_index(apps, schema_editor):
+    Product        = apps.get_model('product', 'Product')
+    ProductHashtag = apps.get_model('product', 'ProductHashtag')
+    SearchGram     = apps.get_model('product', 'SearchGram')
+
+    hashtags = {}
+    for product_id, hashtag in ProductHashtag.objects.values_list('product_id', 'hashtag__name'):
+        hashtags.setdefault(product_id, []).append(hashtag)
+
+    SearchGram.objects.bulk_create([
+        SearchGram(product_id=product_id, gram=gram, weight=weight)
+        for product_id, name, description in Product.objects.values_list('id', 'name', 'description')
+        for gram, weight in product_grams(name, description, hashtags.get(product_id, [])).items()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0003_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchGram',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=2)),
+                ('weight', models.IntegerField(default=1)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_grams', to='product.product')),
+            ],
+            options={
+                'db_table': 'product_search_grams',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchgram',
+            index=models.Index(fields=['gram', 'product', 'weight'], name='search_grams_gram_idx'),
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
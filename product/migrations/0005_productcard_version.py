@@ -0,0 +1,18 @@
+# Generated by Django 3.1.5 on 2026-10-17 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0004_searchgram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productcard',
+            name='version',
+            field=models.IntegerField(default=1),
+        ),
+    ]
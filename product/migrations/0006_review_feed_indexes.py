@@ -0,0 +1,40 @@
+# Generated by Django 3.1.5 on 2026-10-17 22:36
+
+from django.db import migrations, models
+
+
+def fill_has_photo(apps, schema_editor):
+    Review = apps.get_model('product', 'Review')
+    Review.objects.filter(image_url__isnull=False).exclude(image_url='').update(has_photo=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0005_productcard_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='has_photo',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(fill_has_photo, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'created_at', 'id'], name='reviews_product_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'score', 'id'], name='reviews_product_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'has_photo', 'created_at', 'id'], name='reviews_photo_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'has_photo', 'score', 'id'], name='reviews_photo_score_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.1.5 on 2026-10-17 22:51
+
+from django.db import migrations, models
+
+from product.pricing import effective_price_expression
+
+
+def fill_effective_price(apps, schema_editor):
+    Product = apps.get_model('product', 'Product')
+    Product.objects.update(effective_price=effective_price_expression())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0006_review_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20),
+        ),
+        migrations.RunPython(fill_effective_price, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['effective_price', 'id'], name='products_effective_price_idx'),
+        ),
+    ]
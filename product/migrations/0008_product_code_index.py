@@ -0,0 +1,17 @@
+# Generated by Django 3.1.5 on 2026-10-17 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0007_product_effective_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['code'], name='products_code_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.5 on 2026-10-17 23:15
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_reply_count(apps, schema_editor):
+    Review = apps.get_model('product', 'Review')
+    Reply  = apps.get_model('product', 'Reply')
+
+    reply_counts = Reply.objects.filter(review_id=OuterRef('id')).order_by().values('review_id').annotate(
+        count=Count('id')
+    ).values('count')
+    Review.objects.update(reply_count=Coalesce(Subquery(reply_counts, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0008_product_code_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='reply_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_reply_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.1.5 on 2026-10-17 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0009_review_reply_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=45, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'catalog_versions',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.1.5 on 2026-10-17 23:46
+
+from django.db import migrations
+
+from product.pricing import effective_price_expression
+
+
+def refill_effective_price(apps, schema_editor):
+    Product = apps.get_model('product', 'Product')
+    Product.objects.update(effective_price=effective_price_expression())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0010_catalog_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(refill_effective_price, migrations.RunPython.noop),
+    ]
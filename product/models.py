@@ -1,6 +1,8 @@
 from django.db              import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .pricing import discounted
+
 
 class Menu(models.Model):
     name = models.CharField(max_length=45)
@@ -27,19 +29,54 @@ class SubCategory(models.Model):
 
 
 class Product(models.Model):
-    name          = models.CharField(max_length=45)
-    sub_category  = models.ForeignKey('SubCategory', related_name='products', on_delete=models.CASCADE)
-    menu          = models.ForeignKey('Menu', on_delete=models.CASCADE)
-    code          = models.CharField(max_length=45)
-    price         = models.DecimalField(max_digits = 20, decimal_places = 2)
-    description   = models.TextField(null=True)
-    discount_rate = models.IntegerField(default=0)
-    hashtags      = models.ManyToManyField('Hashtag', through ='ProductHashtag')
-    sizes         = models.ManyToManyField('Size', through ='ProductSize')
-    colors        = models.ManyToManyField('Color', through ='ProductColorImage')
+    name            = models.CharField(max_length=45)
+    sub_category    = models.ForeignKey('SubCategory', related_name='products', on_delete=models.CASCADE)
+    menu            = models.ForeignKey('Menu', on_delete=models.CASCADE)
+    code            = models.CharField(max_length=45)
+    price           = models.DecimalField(max_digits = 20, decimal_places = 2)
+    description     = models.TextField(null=True)
+    discount_rate   = models.IntegerField(default=0)
+    effective_price = models.DecimalField(max_digits = 20, decimal_places = 2, default=0)
+    hashtags        = models.ManyToManyField('Hashtag', through ='ProductHashtag')
+    sizes           = models.ManyToManyField('Size', through ='ProductSize')
+    colors          = models.ManyToManyField('Color', through ='ProductColorImage')
 
     class Meta:
         db_table = "products"
+        indexes  = [
+            models.Index(fields=['price', 'id'], name='products_price_id_idx'),
+            models.Index(fields=['effective_price', 'id'], name='products_effective_price_idx'),
+            models.Index(fields=['name', 'id'], name='products_name_id_idx'),
+            models.Index(fields=['code'], name='products_code_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.effective_price = discounted(self.price, self.discount_rate)
+        super().save(*args, **kwargs)
+
+
+class ProductCard(models.Model):
+    product       = models.OneToOneField('Product', related_name='card', primary_key=True, on_delete=models.CASCADE)
+    score_avg     = models.FloatField(default=0, db_index=True)
+    review_count  = models.IntegerField(default=0)
+    color_count   = models.IntegerField(default=0)
+    thumbnail_url = models.URLField(max_length=2048, null=True)
+    version       = models.IntegerField(default=1)
+
+    class Meta:
+        db_table = "product_cards"
+
+
+class SearchGram(models.Model):
+    gram    = models.CharField(max_length=2)
+    product = models.ForeignKey('Product', related_name='search_grams', on_delete=models.CASCADE)
+    weight  = models.IntegerField(default=1)
+
+    class Meta:
+        db_table = "product_search_grams"
+        indexes  = [
+            models.Index(fields=['gram', 'product', 'weight'], name='search_grams_gram_idx'),
+        ]
 
 
 class Size(models.Model):
@@ -100,11 +137,23 @@ class Review(models.Model):
     score       = models.IntegerField(validators=[MinValueValidator(0), MaxValueValidator(5)])
     description = models.TextField(null=True)
     image_url   = models.URLField(max_length=2048, null=True)
+    has_photo   = models.BooleanField(default=False)
+    reply_count = models.IntegerField(default=0)
     created_at  = models.DateTimeField(auto_now_add=True)
     updated_at  = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "reviews"
+        indexes  = [
+            models.Index(fields=['product', 'created_at', 'id'], name='reviews_product_created_idx'),
+            models.Index(fields=['product', 'score', 'id'], name='reviews_product_score_idx'),
+            models.Index(fields=['product', 'has_photo', 'created_at', 'id'], name='reviews_photo_created_idx'),
+            models.Index(fields=['product', 'has_photo', 'score', 'id'], name='reviews_photo_score_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.has_photo = bool(self.image_url)
+        super().save(*args, **kwargs)
 
 
 class Reply(models.Model):
@@ -113,4 +162,11 @@ class Reply(models.Model):
     comment = models.CharField(max_length = 500)
 
     class Meta:
-        db_table = 'replies'
\ No newline at end of file
+        db_table = 'replies'
+
+class CatalogVersion(models.Model):
+    name    = models.CharField(max_length=45, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'catalog_versions'
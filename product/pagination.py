@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+
+from datetime import datetime
+from decimal  import Decimal
+
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(payload):
+    data = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+    if not isinstance(payload, dict):
+        raise InvalidCursor(cursor)
+
+    return payload
+
+
+def ordering_value(obj, field):
+    value = obj
+    for attr in field.lstrip('-').split('__'):
+        value = getattr(value, attr)
+
+    if isinstance(value, datetime):
+        return value.isoformat()
+
+    return str(value) if isinstance(value, Decimal) else value
+
+
+def keyset_filter(ordering, values):
+    if not isinstance(values, list) or len(ordering) != len(values):
+        raise InvalidCursor(values)
+
+    if not all(isinstance(value, (str, int, float)) for value in values):
+        raise InvalidCursor(values)
+
+    return keyset_condition(ordering, values)
+
+
+def keyset_condition(ordering, values):
+    condition = Q()
+    for index, field in enumerate(ordering):
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        branch = Q(**{f'{field.lstrip("-")}__{lookup}' : values[index]})
+
+        for previous, value in zip(ordering[:index], values[:index]):
+            branch &= Q(**{previous.lstrip('-') : value})
+
+        condition |= branch
+
+    return condition
+
+
+def page_count_param(request, default, maximum):
+    page_count = int(request.GET.get('page_count', default))
+
+    if page_count < 1:
+        raise ValueError(page_count)
+
+    return min(page_count, maximum)
+
+
+def paginate_keyset(queryset, ordering, values, page_count):
+    queryset = queryset.order_by(*ordering)
+
+    if values is not None:
+        queryset = queryset.filter(keyset_filter(ordering, values))
+
+    items       = list(queryset[:page_count + 1])
+    next_values = None
+
+    if len(items) > page_count:
+        items       = items[:page_count]
+        next_values = [ordering_value(items[-1], field) for field in ordering]
+
+    return items, next_values
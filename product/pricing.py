@@ -0,0 +1,32 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import DecimalField, F, Func
+
+CENT = Decimal('0.01')
+
+
+def discounted(amount, rate):
+    return (Decimal(amount) * (100 - (rate or 0)) / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class DiscountedPrice(Func):
+    template        = 'ROUND(%(price)s * (100 - %(rate)s) / 100, 2)'
+    sqlite_template = 'CAST((CAST(ROUND(%(price)s * 100) AS INTEGER) * (100 - %(rate)s) + 50) / 100 AS REAL) / 100'
+    output_field    = DecimalField(max_digits=20, decimal_places=2)
+
+    def as_sql(self, compiler, connection, template=None, **extra_context):
+        price_sql, price_params = compiler.compile(self.source_expressions[0])
+        rate_sql, rate_params   = compiler.compile(self.source_expressions[1])
+        sql                     = (template or self.template) % {'price' : price_sql, 'rate' : rate_sql}
+
+        return sql, [*price_params, *rate_params]
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sqlite(compiler, connection, template=self.sqlite_template, **extra_context)
+
+
+def effective_price_expression(price=None, discount_rate=None):
+    price         = F('price') if price is None else price
+    discount_rate = F('discount_rate') if discount_rate is None else discount_rate
+
+    return DiscountedPrice(price, discount_rate)
@@ -0,0 +1,58 @@
+import threading
+
+from .models   import Menu, MainCategory, SubCategory, Color, Size, Hashtag
+from .versions import catalog_versions
+
+REFERENCES = {
+    'menu'          : Menu,
+    'main_category' : MainCategory,
+    'sub_category'  : SubCategory,
+    'color'         : Color,
+    'size'          : Size,
+    'hashtag'       : Hashtag,
+}
+
+REFERENCES_VERSION = 'references'
+
+
+class ReferenceNames:
+    def __init__(self):
+        self.lock    = threading.RLock()
+        self.names   = None
+        self.version = None
+
+    def load(self):
+        version = catalog_versions.get(REFERENCES_VERSION)
+        names   = {reference : {} for reference in REFERENCES}
+
+        for reference, model in REFERENCES.items():
+            for reference_id, name in model.objects.values_list('id', 'name'):
+                names[reference].setdefault(name, []).append(reference_id)
+
+        with self.lock:
+            self.names   = names
+            self.version = version
+
+    def ensure_loaded(self):
+        with self.lock:
+            if self.names is None or self.version != catalog_versions.get(REFERENCES_VERSION):
+                self.load()
+
+    def invalidate(self):
+        catalog_versions.bump(REFERENCES_VERSION)
+
+        with self.lock:
+            self.names = None
+
+    def ids(self, reference, names):
+        if isinstance(names, str):
+            names = [names]
+
+        with self.lock:
+            self.ensure_loaded()
+            table = self.names[reference]
+
+            return sorted({reference_id for name in names for reference_id in table.get(name, ())})
+
+
+reference_names = ReferenceNames()
@@ -0,0 +1,124 @@
+from core.renderers import Document, Schema, array, datetime, decimal, generic, integer, nullable, number, string
+
+PRODUCT_ITEM = Schema({
+    'id'               : integer,
+    'name'             : string,
+    'price'            : decimal,
+    'discount_rate'    : integer,
+    'effective_price'  : decimal,
+    'review_score_avg' : ('card.score_avg', number),
+    'thumbnail'        : ('card.thumbnail_url', nullable(string)),
+    'color_count'      : ('card.color_count', integer),
+})
+
+PRODUCT_LIST = Document({
+    'PRODUCT_COUNT' : nullable(integer),
+    'PRODUCTS_LIST' : array(PRODUCT_ITEM),
+    'NEXT_CURSOR'   : nullable(string),
+    'FACETS'        : generic,
+})
+
+CATEGORY_ITEM = Schema({
+    'product_id'       : ('id', integer),
+    'product_name'     : ('name', string),
+    'price'            : decimal,
+    'discount_rate'    : integer,
+    'effective_price'  : decimal,
+    'review_score_avg' : ('card.score_avg', number),
+    'thumbnail'        : ('card.thumbnail_url', nullable(string)),
+    'color_count'      : ('card.color_count', integer),
+})
+
+PRODUCT_CATEGORY = Document({
+    'SUB_CATEGORY_LIST' : array(Schema({
+        'subcategory_name' : string,
+        'subcategory_item' : array(CATEGORY_ITEM),
+    }, mapping=True)),
+})
+
+REVIEW = Schema({
+    'review'      : integer,
+    'user_name'   : string,
+    'image_url'   : nullable(string),
+    'score'       : integer,
+    'description' : nullable(string),
+    'created_at'  : datetime,
+    'reply_count' : integer,
+}, mapping=True)
+
+REVIEW_LIST = Document({
+    'REVIEW_LIST' : array(REVIEW),
+    'NEXT_CURSOR' : nullable(string),
+})
+
+REPLY = Schema({
+    'reply_id'  : integer,
+    'user_name' : string,
+    'comment'   : string,
+}, mapping=True)
+
+REPLY_LIST = Document({
+    'REPLY_LIST'  : array(REPLY),
+    'NEXT_CURSOR' : nullable(string),
+})
+
+REVIEW_REPLIES = Document({
+    'REVIEW_REPLIES' : array(Schema({
+        'review_id'   : integer,
+        'reply_count' : integer,
+        'REPLY_LIST'  : array(REPLY),
+        'NEXT_CURSOR' : nullable(string),
+    }, mapping=True)),
+})
+
+PRODUCT_DETAIL = Document({
+    'product' : Schema({
+        'id'               : integer,
+        'name'             : string,
+        'code'             : string,
+        'description'      : nullable(string),
+        'price'            : decimal,
+        'discount_rate'    : integer,
+        'effective_price'  : decimal,
+        'review_score_avg' : nullable(number),
+        'hashtags'         : array(Schema({
+            'hashtag_id'   : integer,
+            'hashtag_name' : string,
+        }, mapping=True)),
+        'sizes'            : array(Schema({
+            'size_id'   : integer,
+            'size_name' : string,
+        }, mapping=True)),
+        'colors'           : array(Schema({
+            'color_id'   : integer,
+            'color_name' : string,
+            'img'        : array(Schema({
+                'color_image_id'  : integer,
+                'color_image_url' : string,
+            }, mapping=True)),
+        }, mapping=True)),
+        'review'             : array(REVIEW),
+        'review_next_cursor' : nullable(string),
+    }, mapping=True),
+})
+
+EXPORT_PRODUCT = Schema({
+    'id'               : integer,
+    'code'             : string,
+    'name'             : string,
+    'menu'             : string,
+    'main_category'    : string,
+    'sub_category'     : string,
+    'price'            : decimal,
+    'discount_rate'    : integer,
+    'effective_price'  : decimal,
+    'description'      : nullable(string),
+    'review_score_avg' : number,
+    'review_count'     : integer,
+    'sizes'            : array(string),
+    'hashtags'         : array(string),
+    'colors'           : array(Schema({
+        'name'   : string,
+        'images' : array(string),
+    }, mapping=True)),
+}, mapping=True)
@@ -0,0 +1,95 @@
+import re
+import unicodedata
+
+from collections import Counter
+
+from django.db        import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import Product, ProductHashtag, SearchGram
+
+NAME_WEIGHT        = 5
+HASHTAG_WEIGHT     = 3
+DESCRIPTION_WEIGHT = 1
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(unicodedata.normalize('NFKC', text or '').lower())
+
+
+def bigrams(text, compact=False):
+    tokens = tokenize(text)
+
+    if compact:
+        tokens = [''.join(tokens)]
+
+    for token in tokens:
+        for index in range(len(token) - 1):
+            yield token[index:index + 2]
+
+
+def product_grams(name, description, hashtags):
+    weights = Counter()
+
+    for gram in bigrams(name, compact=True):
+        weights[gram] += NAME_WEIGHT
+
+    for hashtag in hashtags:
+        for gram in bigrams(hashtag, compact=True):
+            weights[gram] += HASHTAG_WEIGHT
+
+    for gram in bigrams(description, compact=True):
+        weights[gram] += DESCRIPTION_WEIGHT
+
+    return weights
+
+
+def index_products(product_ids, chunk_size=500):
+    product_ids = list(product_ids)
+
+    for start in range(0, len(product_ids), chunk_size):
+        chunk    = product_ids[start:start + chunk_size]
+        hashtags = {}
+
+        for product_id, hashtag in ProductHashtag.objects.filter(product_id__in=chunk).values_list(
+            'product_id', 'hashtag__name'
+        ):
+            hashtags.setdefault(product_id, []).append(hashtag)
+
+        grams = [
+            SearchGram(product_id=product_id, gram=gram, weight=weight)
+            for product_id, name, description in Product.objects.filter(id__in=chunk).values_list(
+                'id', 'name', 'description'
+            )
+            for gram, weight in product_grams(name, description, hashtags.get(product_id, [])).items()
+        ]
+
+        with transaction.atomic():
+            SearchGram.objects.filter(product_id__in=chunk).delete()
+            SearchGram.objects.bulk_create(grams, batch_size=2000)
+
+
+def ranked_matches(word):
+    grams = set(bigrams(word))
+
+    if not grams:
+        word = word.strip()
+
+        return Product.objects.filter(
+            Q(name__icontains=word) | Q(description__icontains=word) | Q(hashtags__name__icontains=word)
+        ).distinct().order_by('id').values_list('id', flat=True)
+
+    return SearchGram.objects.filter(gram__in=grams).values('product_id').annotate(
+        matched = Count('gram'),
+        score   = Sum('weight'),
+    ).filter(matched=len(grams)).order_by('-score', 'product_id').values_list('product_id', flat=True)
+
+
+def search_products(word, limit=None):
+    return list(ranked_matches(word)[:limit])
+
+
+def matching_products(word):
+    return ranked_matches(word).order_by()
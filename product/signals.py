@@ -0,0 +1,127 @@
+from django.db                import transaction
+from django.db.models         import F
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch          import receiver
+
+from .models import (
+    Product, ProductCard, ProductColorImage, ProductSize, ProductHashtag, Image, Review, Reply,
+    Menu, MainCategory, SubCategory, Color, Size, Hashtag,
+)
+from .facets     import facet_index
+from .references import reference_names
+from .search     import index_products
+from .utils      import update_product_card, bump_product_versions, invalidate_catalog
+from core.cache  import response_cache
+
+
+@receiver(post_save, sender=Product)
+def create_product_card(sender, instance, created, **kwargs):
+    if created:
+        ProductCard.objects.get_or_create(product=instance)
+        invalidate_catalog([instance.id])
+    else:
+        bump_product_versions([instance.id])
+
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_delete, sender=Product)
+def invalidate_previous_catalog(sender, instance, **kwargs):
+    if instance.id is not None:
+        invalidate_catalog([instance.id])
+
+
+@receiver([post_save, post_delete], sender=ProductSize)
+@receiver([post_save, post_delete], sender=ProductHashtag)
+def bump_detail_version(sender, instance, **kwargs):
+    bump_product_versions([instance.product_id])
+
+
+@receiver(post_save, sender=Hashtag)
+@receiver(post_save, sender=Size)
+@receiver(post_save, sender=Color)
+def bump_reference_versions(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    if sender is Color:
+        product_ids = ProductColorImage.objects.filter(color=instance).values_list('product_id', flat=True)
+    elif sender is Size:
+        product_ids = ProductSize.objects.filter(size=instance).values_list('product_id', flat=True)
+    else:
+        product_ids = ProductHashtag.objects.filter(hashtag=instance).values_list('product_id', flat=True)
+
+    bump_product_versions(product_ids)
+
+
+@receiver([post_save, post_delete], sender=Review)
+def refresh_card_reviews(sender, instance, **kwargs):
+    update_product_card(instance.product_id, colors=False)
+
+
+@receiver([post_save, post_delete], sender=Reply)
+def count_review_replies(sender, instance, signal, created=False, **kwargs):
+    if signal is post_save and not created:
+        return
+
+    reviews = Review.objects.filter(id=instance.review_id)
+    reviews.update(reply_count=F('reply_count') + (1 if created else -1))
+    bump_product_versions(reviews.values_list('product_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=ProductColorImage)
+def refresh_card_colors(sender, instance, **kwargs):
+    update_product_card(instance.product_id, reviews=False)
+
+
+@receiver(post_save, sender=Image)
+def refresh_card_thumbnails(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    product_ids = ProductColorImage.objects.filter(image=instance).values_list('product_id', flat=True).distinct()
+
+    for product_id in product_ids:
+        update_product_card(product_id, reviews=False)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductColorImage)
+@receiver([post_save, post_delete], sender=ProductSize)
+@receiver([post_save, post_delete], sender=ProductHashtag)
+def refresh_product_facets(sender, instance, **kwargs):
+    product_id = instance.id if sender is Product else instance.product_id
+    transaction.on_commit(lambda: facet_index.refresh([product_id]))
+
+
+@receiver([post_save, post_delete], sender=Menu)
+@receiver([post_save, post_delete], sender=SubCategory)
+@receiver([post_save, post_delete], sender=Color)
+@receiver([post_save, post_delete], sender=Size)
+@receiver([post_save, post_delete], sender=Hashtag)
+def invalidate_facets(sender, instance, **kwargs):
+    transaction.on_commit(facet_index.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Menu)
+@receiver([post_save, post_delete], sender=MainCategory)
+@receiver([post_save, post_delete], sender=SubCategory)
+@receiver([post_save, post_delete], sender=Color)
+@receiver([post_save, post_delete], sender=Size)
+@receiver([post_save, post_delete], sender=Hashtag)
+def invalidate_reference_names(sender, instance, **kwargs):
+    transaction.on_commit(reference_names.invalidate)
+    transaction.on_commit(lambda: response_cache.invalidate(['catalog']))
+
+
+@receiver(post_save, sender=Product)
+@receiver([post_save, post_delete], sender=ProductHashtag)
+def reindex_product_search(sender, instance, **kwargs):
+    product_id = instance.id if sender is Product else instance.product_id
+    transaction.on_commit(lambda: index_products([product_id]))
+
+
+@receiver(post_save, sender=Hashtag)
+def reindex_hashtag_search(sender, instance, created, **kwargs):
+    if not created:
+        product_ids = list(ProductHashtag.objects.filter(hashtag=instance).values_list('product_id', flat=True).distinct())
+        transaction.on_commit(lambda: index_products(product_ids))
@@ -0,0 +1,90 @@
+import random
+
+from django.db import transaction
+
+from .models import (
+    Menu, MainCategory, SubCategory, Product, Color, Size, Hashtag, Image,
+    ProductColorImage, ProductSize, ProductHashtag,
+)
+from .pricing import discounted
+from .search  import index_products
+from .utils   import rebuild_product_cards
+
+MENUS      = ['남성', '여성', '키즈', '액세서리']
+CATEGORIES = ['의류', '신발', '가방']
+WORDS      = ['폴로', '셔츠', '티셔츠', '니트', '스웨터', '재킷', '팬츠', '스니커즈', '캐주얼', '클래식', 'polo', 'shirt', 'pique']
+
+
+def bulk_insert(model, rows, chunk_size):
+    for start in range(0, len(rows), chunk_size):
+        model.objects.bulk_create(rows[start:start + chunk_size])
+
+
+def next_id(model):
+    return (model.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+
+
+def seed_products(products=100000, colors=40, sizes=12, hashtags=200, sub_categories=8, chunk_size=2000, seed=0):
+    generator = random.Random(seed)
+
+    with transaction.atomic():
+        menus          = [Menu.objects.create(name=name) for name in MENUS]
+        main_category  = {menu.id : MainCategory.objects.create(name=generator.choice(CATEGORIES), menu=menu) for menu in menus}
+        sub_categories = [
+            SubCategory.objects.create(name=f'sub-{menu.id}-{index}', main_category=main_category[menu.id], menu=menu)
+            for menu in menus for index in range(sub_categories)
+        ]
+        color_ids   = [Color.objects.create(name=f'color-{index}').id for index in range(colors)]
+        size_ids    = [Size.objects.create(name=f'size-{index}').id for index in range(sizes)]
+        hashtag_ids = [Hashtag.objects.create(name=f'{generator.choice(WORDS)}{index}').id for index in range(hashtags)]
+
+    first_id       = next_id(Product)
+    first_image_id = next_id(Image)
+
+    for start in range(0, products, chunk_size):
+        count = min(chunk_size, products - start)
+
+        with transaction.atomic():
+            product_rows = []
+            for product_id in range(first_id + start, first_id + start + count):
+                sub_category  = generator.choice(sub_categories)
+                price         = generator.randrange(29000, 399000, 1000)
+                discount_rate = generator.choice([0, 0, 0, 10, 20, 30])
+                product_rows.append(Product(
+                    id              = product_id,
+                    name            = ' '.join(generator.sample(WORDS, 2)) + f' {product_id}',
+                    sub_category    = sub_category,
+                    menu_id         = sub_category.menu_id,
+                    code            = f'SYN{product_id:07d}',
+                    price           = price,
+                    description     = ' '.join(generator.choices(WORDS, k=12)),
+                    discount_rate   = discount_rate,
+                    effective_price = discounted(price, discount_rate),
+                ))
+            Product.objects.bulk_create(product_rows)
+
+            image_rows, colorimage_rows, size_rows, hashtag_rows = [], [], [], []
+            for product in product_rows:
+                for color_id in generator.sample(color_ids, generator.randint(1, 4)):
+                    image = Image(
+                        id        = first_image_id,
+                        image_url = f'https://images.example.com/{product.code}/{color_id}.jpg',
+                    )
+                    first_image_id += 1
+                    image_rows.append(image)
+                    colorimage_rows.append(ProductColorImage(product_id=product.id, color_id=color_id, image_id=image.id))
+
+                size_rows    += [ProductSize(product_id=product.id, size_id=size_id)
+                    for size_id in generator.sample(size_ids, generator.randint(1, 5))]
+                hashtag_rows += [ProductHashtag(product_id=product.id, hashtag_id=hashtag_id)
+                    for hashtag_id in generator.sample(hashtag_ids, generator.randint(0, 3))]
+
+            bulk_insert(Image, image_rows, chunk_size)
+            bulk_insert(ProductColorImage, colorimage_rows, chunk_size)
+            bulk_insert(ProductSize, size_rows, chunk_size)
+            bulk_insert(ProductHashtag, hashtag_rows, chunk_size)
+
+        rebuild_product_cards([product.id for product in product_rows])
+        index_products([product.id for product in product_rows])
+
+    return products
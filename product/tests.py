@@ -1 +1,663 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+
+from decimal       import Decimal
+from unittest.mock import patch
+
+import jwt
+
+from django.conf       import settings
+from django.core.cache import cache
+from django.db         import connection
+from django.http       import JsonResponse
+from django.test       import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .facets     import facet_index
+from .importer   import CatalogError, CatalogImporter, Checkpoint
+from .models     import (
+    Menu, MainCategory, SubCategory, Product, ProductCard, ProductColorImage, ProductSize, ProductHashtag, Color,
+    Size, Hashtag, Image, Review, Reply,
+)
+from .pricing    import discounted
+from .search     import index_products, search_products
+from .utils      import REVIEW_ORDERS, reprice_products, rebuild_product_cards
+from .views      import PRODUCT_ORDERS
+from user.models import User, Membership
+
+
+class CatalogFixtureMixin:
+    @classmethod
+    def create_products(cls, prices, menu_name='men', **fields):
+        menu          = Menu.objects.create(name=menu_name)
+        main_category = MainCategory.objects.create(name='tops', menu=menu)
+        sub_category  = SubCategory.objects.create(name='shirts', main_category=main_category, menu=menu)
+
+        return [Product.objects.create(
+            name         = f'product {index}',
+            sub_category = sub_category,
+            menu         = menu,
+            code         = f'P{index}',
+            price        = price,
+            **fields,
+        ) for index, price in enumerate(prices)]
+
+    @classmethod
+    def create_user(cls, name='reviewer'):
+        membership, _ = Membership.objects.get_or_create(id=1, defaults={'grade' : 'basic', 'discount_rate' : 0})
+
+        return User.objects.create(
+            name         = name,
+            email        = f'{name}@example.com',
+            phone_number = '01012345678',
+            password     = '',
+            membership   = membership,
+        )
+
+
+class RepricingTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.prices = [Decimal('10001.00'), Decimal('39900.00'), Decimal('15.55'), Decimal('12345.67'), Decimal('999.99')]
+        cls.create_products(cls.prices)
+
+    def test_bulk_repricing_matches_discounted(self):
+        for rate in (0, 7, 15, 33, 100):
+            self.assertEqual(reprice_products(Product.objects.all(), rate, chunk_size=2), len(self.prices))
+            self.assertEqual(
+                sorted(Product.objects.values_list('effective_price', flat=True)),
+                sorted(discounted(price, rate) for price in self.prices),
+            )
+
+    def test_price_range_filters_on_effective_price(self):
+        reprice_products(Product.objects.all(), 10)
+
+        response = self.client.get('/product', {'min_price' : '899.99', 'max_price' : '11111.10'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['PRODUCT_COUNT'], 3)
+
+
+class ExportTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_products([10000] * 3)
+
+    def test_streams_ndjson_under_wsgi(self):
+        response = self.client.get('/product/export', {'format' : 'ndjson'})
+        lines    = b''.join(response.streaming_content).splitlines()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([json.loads(line)['code'] for line in lines], ['P0', 'P1', 'P2'])
+
+    async def test_refuses_to_stream_under_asgi(self):
+        response = await AsyncClient().get('/product/export', {'format' : 'ndjson'})
+
+        self.assertEqual(response.status_code, 501)
+        self.assertFalse(response.streaming)
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class ProductCardVersionTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = cls.create_products([10000])[0]
+        cls.user    = cls.create_user()
+
+    def detail(self, **headers):
+        return self.client.get(f'/product/{self.product.id}', **headers)
+
+    def test_rebuild_keeps_bumping_the_version(self):
+        first = self.detail()['ETag']
+
+        Review.objects.create(user=self.user, product=self.product, score=4)
+        second = self.detail()['ETag']
+
+        rebuild_product_cards([self.product.id])
+        response = self.detail(HTTP_IF_NONE_MATCH=first)
+
+        self.assertEqual(len({first, second, response['ETag']}), 3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['product']['review_score_avg'], 4.0)
+        self.assertEqual(len(response.json()['product']['review']), 1)
+        self.assertEqual(self.detail(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    @override_settings(COMPRESSION_MIN_SIZE=0)
+    def test_compressed_detail_revalidates_with_its_weak_etag(self):
+        response = self.detail(HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], 'W/' + self.detail()['ETag'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['product']['id'], self.product.id)
+
+        revalidated = self.detail(HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(revalidated.status_code, 304)
+
+
+@override_settings(PRODUCT_FACET_INDEX=False)
+class ResponseCacheInvalidationTest(CatalogFixtureMixin, TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.product = self.create_products([10000])[0]
+        self.user    = self.create_user()
+
+    def detail(self):
+        return self.client.get(f'/product/{self.product.id}').json()['product']
+
+    def listed(self):
+        return self.client.get('/product').json()['PRODUCTS_LIST'][0]
+
+    def category_item(self):
+        return self.client.get('/product/category/men').json()['SUB_CATEGORY_LIST'][0]['subcategory_item'][0]
+
+    def rename_quietly(self, name):
+        Product.objects.filter(id=self.product.id).update(name=name)
+
+    def test_review_invalidates_detail_and_listing(self):
+        self.assertEqual((self.detail()['review'], self.listed()['review_score_avg']), ([], 0))
+
+        self.rename_quietly('cached')
+        self.assertEqual((self.detail()['name'], self.listed()['name']), ('product 0', 'product 0'))
+
+        Review.objects.create(user=self.user, product=self.product, score=4)
+
+        detail = self.detail()
+        self.assertEqual((detail['name'], len(detail['review']), detail['review_score_avg']), ('cached', 1, 4.0))
+        self.assertEqual((self.listed()['name'], self.listed()['review_score_avg']), ('cached', 4.0))
+
+    def test_reprice_invalidates_listing_and_category(self):
+        self.assertEqual(self.listed()['effective_price'], '10000.00')
+        self.assertEqual(self.category_item()['effective_price'], '10000.00')
+
+        reprice_products(Product.objects.all(), 25)
+
+        self.assertEqual(self.listed()['effective_price'], '7500.00')
+        self.assertEqual(self.category_item()['effective_price'], '7500.00')
+
+    def test_card_change_invalidates_category(self):
+        self.assertEqual((self.category_item()['color_count'], self.category_item()['thumbnail']), (0, None))
+
+        image = Image.objects.create(image_url='https://example.com/navy.jpg')
+        ProductColorImage.objects.create(product=self.product, color=Color.objects.create(name='navy'), image=image)
+
+        self.assertEqual(
+            (self.category_item()['color_count'], self.category_item()['thumbnail']), (1, 'https://example.com/navy.jpg')
+        )
+
+
+class ReviewFeedTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = cls.create_products([10000])[0]
+        user        = cls.create_user()
+
+        for index in range(23):
+            Review.objects.create(
+                user        = user,
+                product     = cls.product,
+                score       = index % 6,
+                description = f'review {index}',
+                image_url   = 'https://example.com/review.jpg' if index % 3 == 0 else None,
+            )
+
+    def reviews(self, **params):
+        return self.client.get(f'/product/{self.product.id}/review', params)
+
+    def walk(self, **params):
+        body = self.reviews(**params).json()
+        seen = [review['review'] for review in body['REVIEW_LIST']]
+
+        while body['NEXT_CURSOR']:
+            body  = self.reviews(cursor=body['NEXT_CURSOR'], **params).json()
+            seen += [review['review'] for review in body['REVIEW_LIST']]
+
+        return seen
+
+    def test_cursor_walk_covers_every_sort_once(self):
+        reviews = Review.objects.filter(product=self.product)
+
+        for sort, ordering in REVIEW_ORDERS.items():
+            for photo, expected in ((False, reviews), (True, reviews.filter(has_photo=True))):
+                self.assertEqual(
+                    self.walk(sort=sort, photo=str(photo).lower(), page_count=4),
+                    list(expected.order_by(*ordering).values_list('id', flat=True)),
+                )
+
+    def test_rejects_invalid_page_counts(self):
+        for page_count in ('0', '-1', 'x', ''):
+            response = self.reviews(page_count=page_count)
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {'MESSAGE' : 'INVALID_PAGE_COUNT'})
+
+    @override_settings(REVIEW_MAX_PAGE_COUNT=5)
+    def test_clamps_large_page_counts(self):
+        body = self.reviews(page_count=10 ** 9).json()
+
+        self.assertEqual(len(body['REVIEW_LIST']), 5)
+        self.assertIsNotNone(body['NEXT_CURSOR'])
+
+
+class ReplyTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = cls.create_products([10000])[0]
+        cls.user    = cls.create_user()
+        cls.reviews = [Review.objects.create(user=cls.user, product=cls.product, score=5) for _ in range(3)]
+
+        for review, count in zip(cls.reviews, (7, 2, 0)):
+            for index in range(count):
+                Reply.objects.create(user=cls.user, review=review, comment=f'reply {index}')
+
+    def replies_url(self, review):
+        return f'/product/{self.product.id}/review/{review.id}/reply'
+
+    def reply_ids(self, review):
+        return list(Reply.objects.filter(review=review).order_by('id').values_list('id', flat=True))
+
+    def test_batch_returns_the_first_replies_with_counts(self):
+        response = self.client.get(f'/product/{self.product.id}/review/replies', {
+            'review_ids' : [review.id for review in self.reviews] + [0],
+            'count'      : 3,
+        })
+        pages    = response.json()['REVIEW_REPLIES']
+
+        self.assertEqual([page['review_id'] for page in pages], [review.id for review in self.reviews])
+        self.assertEqual([page['reply_count'] for page in pages], [7, 2, 0])
+        self.assertEqual([[reply['reply_id'] for reply in page['REPLY_LIST']] for page in pages], [
+            self.reply_ids(self.reviews[0])[:3], self.reply_ids(self.reviews[1]), [],
+        ])
+        self.assertEqual([page['NEXT_CURSOR'] is None for page in pages], [False, True, True])
+
+        rest = self.client.get(self.replies_url(self.reviews[0]), {'cursor' : pages[0]['NEXT_CURSOR']}).json()
+        self.assertEqual([reply['reply_id'] for reply in rest['REPLY_LIST']], self.reply_ids(self.reviews[0])[3:])
+
+    def test_cursor_walk_returns_every_reply_once(self):
+        url  = self.replies_url(self.reviews[0])
+        body = self.client.get(url, {'page_count' : 2}).json()
+        seen = [reply['reply_id'] for reply in body['REPLY_LIST']]
+
+        while body['NEXT_CURSOR']:
+            body  = self.client.get(url, {'page_count' : 2, 'cursor' : body['NEXT_CURSOR']}).json()
+            seen += [reply['reply_id'] for reply in body['REPLY_LIST']]
+
+        self.assertEqual(seen, self.reply_ids(self.reviews[0]))
+
+        cursor  = self.client.get(url, {'page_count' : 2}).json()['NEXT_CURSOR']
+        foreign = self.client.get(self.replies_url(self.reviews[1]), {'cursor' : cursor})
+        self.assertEqual(foreign.json(), {'MESSAGE' : 'INVALID_CURSOR'})
+
+    def test_rejects_invalid_and_clamps_large_page_counts(self):
+        for page_count in ('0', '-1', 'x'):
+            response = self.client.get(self.replies_url(self.reviews[0]), {'page_count' : page_count})
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {'MESSAGE' : 'INVALID_PAGE_COUNT'})
+
+        with self.settings(REPLY_MAX_PAGE_COUNT=4):
+            body = self.client.get(self.replies_url(self.reviews[0]), {'page_count' : 10 ** 9}).json()
+
+        self.assertEqual(len(body['REPLY_LIST']), 4)
+        self.assertIsNotNone(body['NEXT_CURSOR'])
+
+    def test_reply_count_follows_creates_and_deletes(self):
+        token  = jwt.encode({'user_id' : self.user.id}, settings.SECRET_KEY, algorithm='HS256')
+        review = self.reviews[1]
+        reply  = Reply.objects.filter(review=review).first()
+
+        response = self.client.delete(f'{self.replies_url(review)}/{reply.id}', HTTP_AUTHORIZATION=token)
+        self.assertEqual(response.status_code, 200)
+
+        review.refresh_from_db()
+        self.assertEqual(review.reply_count, 1)
+
+        Reply.objects.create(user=self.user, review=review, comment='again')
+        Reply.objects.filter(review=review).first().delete()
+
+        review.refresh_from_db()
+        self.assertEqual(review.reply_count, Reply.objects.filter(review=review).count())
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0, CATALOG_VERSION_CHECK_INTERVAL=0)
+class ListingPaginationTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = cls.create_products([10000 + index % 5 * 1000 for index in range(23)])
+        navy         = Color.objects.create(name='navy')
+
+        for index, product in enumerate(cls.products):
+            Product.objects.filter(id=product.id).update(name=f'{("polo", "knit", "polo shirt")[index % 3]} {index % 4}')
+            ProductCard.objects.filter(product=product).update(score_avg=index % 4)
+
+            if index % 2:
+                ProductColorImage.objects.create(product=product, color=navy)
+
+        index_products([product.id for product in cls.products])
+
+    def setUp(self):
+        facet_index.build()
+
+    def expected(self, order, word=None, colors=None):
+        if order == 'relevance':
+            return search_products(word)
+
+        products = Product.objects.all()
+
+        if colors:
+            products = products.filter(productcolorimages__color__name__in=colors).distinct()
+
+        if word:
+            products = products.filter(name__icontains=word)
+
+        return list(products.order_by(*PRODUCT_ORDERS[order]).values_list('id', flat=True))
+
+    def walk_pages(self, **params):
+        seen, page = [], 1
+
+        while True:
+            body = self.client.get('/product', {**params, 'page' : page, 'page_count' : 4}).json()
+
+            if not body['PRODUCTS_LIST']:
+                return seen, body['PRODUCT_COUNT']
+
+            seen += [product['id'] for product in body['PRODUCTS_LIST']]
+            page += 1
+
+    def walk_cursor(self, **params):
+        body = self.client.get('/product', {**params, 'cursor' : '', 'page_count' : 4}).json()
+        seen = [product['id'] for product in body['PRODUCTS_LIST']]
+
+        while body['NEXT_CURSOR']:
+            body  = self.client.get('/product', {**params, 'cursor' : body['NEXT_CURSOR'], 'page_count' : 4}).json()
+            seen += [product['id'] for product in body['PRODUCTS_LIST']]
+
+        return seen, body['PRODUCT_COUNT']
+
+    def test_every_order_walks_to_the_last_page_without_gaps(self):
+        cases = [({'order' : order}, self.expected(order)) for order in PRODUCT_ORDERS]
+        cases += [
+            ({'order' : 'price', 'colors' : 'navy'}, self.expected('price', colors=['navy'])),
+            ({'order' : 'id', 'colors' : 'navy'}, self.expected('id', colors=['navy'])),
+            ({'word' : 'polo'}, self.expected('relevance', 'polo')),
+            ({'word' : 'polo', 'order' : '-price'}, self.expected('-price', 'polo')),
+        ]
+
+        for facet_index_enabled in (False, True):
+            for params, expected in cases:
+                with self.subTest(facet_index=facet_index_enabled, **params):
+                    with self.settings(PRODUCT_FACET_INDEX=facet_index_enabled):
+                        self.assertEqual(self.walk_pages(**params), (expected, len(expected)))
+                        self.assertEqual(self.walk_cursor(**params), (expected, len(expected)))
+
+    def test_rejects_invalid_pages(self):
+        for params in ({'page_count' : '0'}, {'page_count' : '-4'}, {'page_count' : 'x'}, {'page' : '0'}, {'page' : 'x'}):
+            for cursor in ({}, {'cursor' : ''}):
+                response = self.client.get('/product', {**params, **cursor})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'MESSAGE' : 'INVALID_PAGE'})
+
+    @override_settings(PRODUCT_MAX_PAGE_COUNT=5)
+    def test_clamps_large_page_counts(self):
+        body = self.client.get('/product', {'page_count' : 10 ** 9, 'cursor' : ''}).json()
+
+        self.assertEqual(len(body['PRODUCTS_LIST']), 5)
+        self.assertIsNotNone(body['NEXT_CURSOR'])
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0, CATALOG_VERSION_CHECK_INTERVAL=0)
+class FacetIndexPriceTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = cls.create_products([10000 + index * 1000 for index in range(12)])
+        colors       = [Color.objects.create(name=name) for name in ('navy', 'white', 'black')]
+        sizes        = [Size.objects.create(name=name) for name in ('S', 'M')]
+
+        for index, product in enumerate(cls.products):
+            ProductColorImage.objects.create(product=product, color=colors[index % 3])
+            ProductSize.objects.create(product=product, size=sizes[index % 2])
+
+            if index % 4 == 0:
+                ProductColorImage.objects.create(product=product, color=colors[(index + 1) % 3])
+
+    def setUp(self):
+        facet_index.build()
+
+    def test_price_ranges_keep_the_index_in_step_with_the_orm(self):
+        cases = [
+            {'min_price' : 13000, 'max_price' : 18000},
+            {'min_price' : 15000},
+            {'max_price' : 14000},
+            {'min_price' : 12000, 'max_price' : 20000, 'colors' : 'navy'},
+            {'min_price' : 12000, 'colors' : ['navy', 'white'], 'sizes' : 'M'},
+            {'max_price' : 100},
+        ]
+
+        for params in cases:
+            with self.subTest(**params):
+                indexed = self.client.get('/product', params).json()
+
+                with patch.object(facet_index, 'search', return_value=None):
+                    counted = self.client.get('/product', params).json()
+
+                self.assertEqual(indexed['FACETS'], counted['FACETS'])
+                self.assertEqual(indexed['PRODUCT_COUNT'], counted['PRODUCT_COUNT'])
+                self.assertEqual(
+                    [product['id'] for product in indexed['PRODUCTS_LIST']],
+                    [product['id'] for product in counted['PRODUCTS_LIST']],
+                )
+
+    def test_price_ranges_use_the_index(self):
+        with patch('product.views.count_facets') as count_facets:
+            body = self.client.get('/product', {'min_price' : 13000, 'max_price' : 15000}).json()
+
+        count_facets.assert_not_called()
+        self.assertEqual(body['PRODUCT_COUNT'], 3)
+
+
+class CatalogImportTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path       = os.path.join(directory.name, 'catalog.jsonl')
+        self.checkpoint = Checkpoint(self.path + '.checkpoint')
+
+    def row(self, code, *image_urls, **fields):
+        return {
+            'code'          : code,
+            'name'          : f'product {code}',
+            'menu'          : 'men',
+            'main_category' : 'tops',
+            'sub_category'  : 'shirts',
+            'price'         : 10000,
+            'colors'        : [{'name' : 'navy', 'images' : list(image_urls)}],
+            **fields,
+        }
+
+    def write(self, rows):
+        with open(self.path, 'w') as catalog:
+            catalog.writelines(json.dumps(row) + '\n' for row in rows)
+
+    def test_resume_reuses_existing_images(self):
+        rows = [
+            self.row('A1', 'a.jpg', 'b.jpg'),
+            self.row('A2', 'b.jpg'),
+            self.row('A3', 'a.jpg', price='free'),
+            self.row('A4', 'b.jpg', 'c.jpg'),
+        ]
+        self.write(rows)
+
+        with self.assertRaises(CatalogError):
+            CatalogImporter(chunk_size=2).run(self.path, checkpoint=self.checkpoint)
+
+        self.assertEqual(Image.objects.count(), 2)
+
+        rows[2]['price'] = 12000
+        self.write(rows)
+
+        stats = CatalogImporter(chunk_size=2).run(self.path, checkpoint=self.checkpoint)
+
+        self.assertEqual((stats['resumed_at'], stats['imported']), (2, 2))
+        self.assertEqual(sorted(Image.objects.values_list('image_url', flat=True)), ['a.jpg', 'b.jpg', 'c.jpg'])
+        self.assertEqual(
+            ProductColorImage.objects.filter(image__image_url='a.jpg').values('image_id').distinct().count(), 1
+        )
+
+    def test_rerun_adds_no_images(self):
+        self.write([self.row('A1', 'a.jpg'), self.row('A2', 'a.jpg', 'b.jpg')])
+        CatalogImporter().run(self.path)
+
+        self.write([self.row('B1', 'a.jpg'), self.row('B2', 'b.jpg')])
+
+        CatalogImporter().run(self.path)
+
+        self.assertEqual(Image.objects.count(), 2)
+        self.assertEqual(Product.objects.count(), 4)
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0, PRODUCT_FACET_INDEX=False)
+class ProductCardSyncTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = cls.create_products([10000])[0]
+        cls.user    = cls.create_user()
+        cls.navy    = Color.objects.create(name='navy')
+        cls.white   = Color.objects.create(name='white')
+
+    def card(self):
+        return ProductCard.objects.values('score_avg', 'review_count', 'color_count', 'thumbnail_url').get(
+            product=self.product
+        )
+
+    def listed(self):
+        return self.client.get('/product').json()['PRODUCTS_LIST'][0]
+
+    def assertRebuildAgrees(self):
+        card = self.card()
+        rebuild_product_cards([self.product.id])
+        self.assertEqual(self.card(), card)
+
+    def test_reviews_update_the_card(self):
+        self.assertEqual(self.card(), {'score_avg' : 0, 'review_count' : 0, 'color_count' : 0, 'thumbnail_url' : None})
+
+        first = Review.objects.create(user=self.user, product=self.product, score=5)
+        Review.objects.create(user=self.user, product=self.product, score=2)
+        self.assertEqual((self.card()['score_avg'], self.card()['review_count']), (3.5, 2))
+
+        first.delete()
+        self.assertEqual((self.card()['score_avg'], self.card()['review_count']), (2, 1))
+        self.assertEqual(self.listed()['review_score_avg'], 2)
+        self.assertRebuildAgrees()
+
+    def test_color_images_update_the_card(self):
+        front = Image.objects.create(image_url='https://images.example/front.jpg')
+        back  = Image.objects.create(image_url='https://images.example/back.jpg')
+
+        ProductColorImage.objects.create(product=self.product, color=self.navy)
+        first = ProductColorImage.objects.create(product=self.product, color=self.navy, image=front)
+        ProductColorImage.objects.create(product=self.product, color=self.white, image=back)
+        self.assertEqual((self.card()['color_count'], self.card()['thumbnail_url']), (2, front.image_url))
+
+        front.image_url = 'https://images.example/front-2.jpg'
+        front.save()
+        self.assertEqual(self.listed()['thumbnail'], front.image_url)
+
+        first.delete()
+        self.assertEqual((self.card()['color_count'], self.card()['thumbnail_url']), (2, back.image_url))
+        self.assertEqual((self.listed()['color_count'], self.listed()['thumbnail']), (2, back.image_url))
+        self.assertRebuildAgrees()
+
+    def test_listing_reads_only_the_card(self):
+        Review.objects.create(user=self.user, product=self.product, score=4)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/product')
+
+        for query in queries.captured_queries:
+            self.assertNotIn('"reviews"', query['sql'])
+            self.assertNotIn('"products_colors_images"', query['sql'])
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0, PRODUCT_FACET_INDEX=False)
+class ProductSearchTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        products = cls.create_products([10000] * 6)
+        summer   = Hashtag.objects.create(name='여름신상')
+        fields   = [
+            ('린넨 셔츠', None),
+            ('오버핏 셔츠', '린넨 혼방'),
+            ('린넨 팬츠', None),
+            ('Oxford Shirt', '옥스포드 셔츠'),
+            ('데님 팬츠', None),
+            ('반팔 티셔츠', 'cotton shirt'),
+        ]
+
+        for product, (name, description) in zip(products, fields):
+            Product.objects.filter(id=product.id).update(name=name, description=description)
+
+        ProductHashtag.objects.create(product=products[4], hashtag=summer)
+        index_products([product.id for product in products])
+
+    def icontains(self, word):
+        matches = []
+
+        for product in Product.objects.prefetch_related('hashtags').order_by('id'):
+            fields = [product.name, product.description or ''] + [hashtag.name for hashtag in product.hashtags.all()]
+
+            if all(any(token in field.lower() for field in fields) for token in word.lower().split()):
+                matches.append(product.id)
+
+        return matches
+
+    def test_matches_icontains(self):
+        for word in ('셔츠', '린넨', '팬츠', '린넨 셔츠', 'shirt', 'SHIRT', '옥스포드', '여름', '티셔츠', '재킷', '셔'):
+            with self.subTest(word=word):
+                self.assertEqual(sorted(search_products(word)), self.icontains(word))
+
+    def test_ranks_name_matches_first(self):
+        names = dict(Product.objects.values_list('id', 'name'))
+
+        self.assertEqual([names[product_id] for product_id in search_products('린넨')], ['린넨 셔츠', '린넨 팬츠', '오버핏 셔츠'])
+
+    def test_listing_filters_by_word(self):
+        body = self.client.get('/product', {'word' : '셔츠', 'order' : 'id', 'page_count' : 10}).json()
+
+        self.assertEqual([product['id'] for product in body['PRODUCTS_LIST']], self.icontains('셔츠'))
+        self.assertEqual(body['PRODUCT_COUNT'], 4)
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0, PRODUCT_FACET_INDEX=False, JSON_RENDERER_BACKEND='json')
+class ListingRendererTest(CatalogFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        products = cls.create_products([Decimal('10000.50'), 12000, 9900], discount_rate=10)
+        image    = Image.objects.create(image_url='https://images.example/셔츠.jpg')
+
+        Product.objects.filter(id=products[1].id).update(name='린넨 "셔츠"')
+        ProductColorImage.objects.create(product=products[0], color=Color.objects.create(name='navy'), image=image)
+        Review.objects.create(user=cls.create_user(), product=products[0], score=3)
+
+    def test_listing_matches_json_response(self):
+        response = self.client.get('/product', {'cursor' : ''})
+        products = Product.objects.select_related('card').order_by('id')
+        expected = JsonResponse({
+            'PRODUCT_COUNT' : 3,
+            'PRODUCTS_LIST' : [{
+                'id'               : product.id,
+                'name'             : product.name,
+                'price'            : product.price,
+                'discount_rate'    : product.discount_rate,
+                'effective_price'  : product.effective_price,
+                'review_score_avg' : product.card.score_avg,
+                'thumbnail'        : product.card.thumbnail_url,
+                'color_count'      : product.card.color_count,
+            } for product in products],
+            'NEXT_CURSOR'   : None,
+        })
+
+        self.assertEqual(response.content, expected.content)
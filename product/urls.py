@@ -1,13 +1,23 @@
+from django.conf import settings
 from django.urls import path
 
-from .views      import ProductListView, ProductDetailView, ReviewView, ReplyView
+from .views      import (
+    ProductListView, ProductCategoryView, ProductDetailView, ProductExportView, ReviewView,
+    ReviewRepliesView, ReplyView,
+    AsyncProductListView, AsyncProductDetailView,
+)
 
+ListView   = AsyncProductListView if settings.ASYNC_CATALOG_VIEWS else ProductListView
+DetailView = AsyncProductDetailView if settings.ASYNC_CATALOG_VIEWS else ProductDetailView
 
 urlpatterns = [
     path('/<int:product_id>/review/<int:review_id>/reply/<int:reply_id>', ReplyView.as_view()),
     path('/<int:product_id>/review/<int:review_id>/reply', ReplyView.as_view()),
+    path('/<int:product_id>/review/replies', ReviewRepliesView.as_view()),
     path('/<int:product_id>/review/<int:review_id>', ReviewView.as_view()),
     path('/<int:product_id>/review', ReviewView.as_view()),
-    path('/<int:product_id>', ProductDetailView.as_view()),
-    path('', ProductListView.as_view()),
+    path('/<int:product_id>', DetailView.as_view()),
+    path('/category/<str:menu>', ProductCategoryView.as_view()),
+    path('/export', ProductExportView.as_view()),
+    path('', ListView.as_view()),
 ]
@@ -0,0 +1,308 @@
+import hashlib
+
+from django.conf                  import settings
+from django.core.cache            import cache
+from django.core.exceptions       import EmptyResultSet
+from django.db                    import connections, transaction
+from django.db.models             import Count, Avg, Min, F, OuterRef, QuerySet, Subquery, Window, IntegerField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions   import Coalesce, RowNumber
+
+from .models     import Product, ProductCard, ProductColorImage, Review, Reply, Hashtag, Size
+from .pagination import keyset_condition, encode_cursor
+from .pricing    import effective_price_expression
+from core.cache  import response_cache
+
+REVIEW_ORDERS = {
+    'newest'     : ('-created_at', '-id'),
+    'score_high' : ('-score', '-id'),
+    'score_low'  : ('score', 'id'),
+}
+
+REPLY_ORDER = ('id',)
+
+
+def update_product_card(product_id, reviews=True, colors=True):
+    card_values = {'version' : F('version') + 1}
+
+    if reviews:
+        review_stats = Review.objects.filter(product_id=product_id).aggregate(
+            score_avg    = Avg('score'),
+            review_count = Count('id'),
+        )
+        card_values['score_avg']    = review_stats['score_avg'] or 0
+        card_values['review_count'] = review_stats['review_count']
+
+    if colors:
+        productcolorimages = ProductColorImage.objects.filter(product_id=product_id)
+
+        card_values['color_count']   = productcolorimages.values('color_id').distinct().count()
+        card_values['thumbnail_url'] = productcolorimages.filter(image__isnull=False).order_by('id').values_list(
+            'image__image_url', flat=True
+        ).first()
+
+    ProductCard.objects.filter(product_id=product_id).update(**card_values)
+    invalidate_catalog([product_id])
+
+
+def bump_product_versions(product_ids):
+    product_ids = list(product_ids)
+
+    ProductCard.objects.filter(product_id__in=product_ids).update(version=F('version') + 1)
+    invalidate_catalog(product_ids)
+
+
+def catalog_tags(product_ids):
+    tags = {'products'} | {f'product:{product_id}' for product_id in product_ids}
+
+    for menu_id, sub_category_id in Product.objects.filter(id__in=product_ids).values_list(
+        'menu_id', 'sub_category_id'
+    ).distinct():
+        tags.update([f'menu:{menu_id}', f'sub_category:{sub_category_id}'])
+
+    return tags
+
+
+def invalidate_catalog(product_ids):
+    tags = catalog_tags(product_ids)
+    transaction.on_commit(lambda: response_cache.invalidate(tags))
+
+
+def reprice_products(products, discount_rate=None, chunk_size=5000):
+    values = {'effective_price' : effective_price_expression(
+        discount_rate = None if discount_rate is None else Value(discount_rate)
+    )}
+
+    if discount_rate is not None:
+        values['discount_rate'] = discount_rate
+
+    product_ids = products.order_by('id').values_list('id', flat=True)
+    last_id     = 0
+    updated     = 0
+
+    while True:
+        chunk = list(product_ids.filter(id__gt=last_id)[:chunk_size])
+
+        if not chunk:
+            return updated
+
+        with transaction.atomic():
+            updated += Product.objects.filter(id__in=chunk).update(**values)
+            bump_product_versions(chunk)
+
+        last_id = chunk[-1]
+
+
+def product_version(product_id):
+    return ProductCard.objects.filter(product_id=product_id).values_list('version', flat=True).first()
+
+
+def product_detail_querysets(product_id):
+    return {
+        'product'            : Product.objects.select_related('card').filter(id=product_id),
+        'hashtags'           : Hashtag.objects.filter(producthashtag__product_id=product_id).order_by('producthashtag__id'),
+        'sizes'              : Size.objects.filter(productsize__product_id=product_id).order_by('productsize__id'),
+        'productcolorimages' : ProductColorImage.objects.filter(product_id=product_id).select_related(
+            'color', 'image'
+        ).order_by('id'),
+        'reviews'            : Review.objects.filter(product_id=product_id).select_related('user').order_by(
+            *REVIEW_ORDERS['newest']
+        )[:settings.REVIEW_PAGE_COUNT + 1],
+    }
+
+
+def review_info(review):
+    return {
+        "review"      : review.id,
+        'user_name'   : review.user.name,
+        'image_url'   : review.image_url,
+        'score'       : review.score,
+        'description' : review.description,
+        'created_at'  : review.created_at,
+        'reply_count' : review.reply_count,
+    }
+
+
+def review_cursor(sort, photo, values):
+    return encode_cursor({'sort' : sort, 'photo' : photo, 'values' : values}) if values else None
+
+
+def reply_info(reply):
+    return {
+        'reply_id'  : reply.id,
+        'user_name' : reply.user.name,
+        'comment'   : reply.comment,
+    }
+
+
+def reply_cursor(review_id, values):
+    return encode_cursor({'review' : review_id, 'values' : values}) if values else None
+
+
+def first_replies(review_ids, count):
+    replies = top_n_per_group(
+        Reply.objects.filter(review_id__in=review_ids), 'review_id', REPLY_ORDER, count + 1
+    ).select_related('user').order_by('review_id', *REPLY_ORDER)
+
+    grouped = {review_id : [] for review_id in review_ids}
+    for reply in replies:
+        grouped[reply.review_id].append(reply)
+
+    pages = {}
+    for review_id, items in grouped.items():
+        next_values = None
+
+        if len(items) > count:
+            items       = items[:count]
+            next_values = [items[-1].id]
+
+        pages[review_id] = (items, reply_cursor(review_id, next_values))
+
+    return pages
+
+
+def product_detail_info(product, hashtags, sizes, productcolorimages, reviews):
+    next_values = None
+
+    if len(reviews) > settings.REVIEW_PAGE_COUNT:
+        reviews     = reviews[:settings.REVIEW_PAGE_COUNT]
+        next_values = [reviews[-1].created_at.isoformat(), reviews[-1].id]
+
+    colors = {}
+    for color_image in productcolorimages:
+        color = colors.setdefault(color_image.color_id, {
+            'color_id'   : color_image.color_id,
+            'color_name' : color_image.color.name,
+            'img'        : [],
+        })
+
+        if color_image.image:
+            color['img'].append({
+                'color_image_id'  : color_image.image.id,
+                'color_image_url' : color_image.image.image_url
+            })
+
+    return {
+        "id"               : product.id,
+        "name"             : product.name,
+        "code"             : product.code,
+        "description"      : product.description,
+        "price"            : product.price,
+        "discount_rate"    : product.discount_rate,
+        "effective_price"  : product.effective_price,
+        "review_score_avg" : product.card.score_avg if product.card.review_count else None,
+
+        "hashtags" : [{
+            "hashtag_id"   : hashtag.id,
+            "hashtag_name" : hashtag.name
+        } for hashtag in hashtags],
+
+        "sizes" : [{
+            "size_id"   : size.id,
+            "size_name" : size.name
+        } for size in sizes],
+
+        "colors" : list(colors.values()),
+
+        "review"             : [review_info(review) for review in reviews],
+        "review_next_cursor" : review_cursor('newest', False, next_values),
+    }
+
+
+def rebuild_product_cards(product_ids=None, chunk_size=1000):
+    products = Product.objects.order_by('id')
+
+    if product_ids is not None:
+        products = products.filter(id__in=product_ids)
+
+    product_ids = list(products.values_list('id', flat=True))
+
+    for start in range(0, len(product_ids), chunk_size):
+        chunk = product_ids[start:start + chunk_size]
+
+        review_stats = {
+            stat['product_id'] : stat for stat in Review.objects.filter(product_id__in=chunk
+            ).values('product_id').annotate(score_avg=Avg('score'), review_count=Count('id'))
+        }
+        color_counts = dict(ProductColorImage.objects.filter(product_id__in=chunk
+        ).values('product_id').annotate(color_count=Count('color_id', distinct=True)).values_list('product_id', 'color_count'))
+
+        first_images = ProductColorImage.objects.filter(product_id__in=chunk, image__isnull=False
+        ).values('product_id').annotate(first_id=Min('id')).values_list('first_id', flat=True)
+        thumbnails   = dict(ProductColorImage.objects.filter(id__in=list(first_images)
+        ).values_list('product_id', 'image__image_url'))
+
+        with transaction.atomic():
+            versions = dict(ProductCard.objects.select_for_update().filter(product_id__in=chunk).values_list(
+                'product_id', 'version'
+            ))
+            cards    = [ProductCard(
+                product_id    = product_id,
+                score_avg     = review_stats.get(product_id, {}).get('score_avg') or 0,
+                review_count  = review_stats.get(product_id, {}).get('review_count', 0),
+                color_count   = color_counts.get(product_id, 0),
+                thumbnail_url = thumbnails.get(product_id),
+                version       = versions.get(product_id, 0) + 1,
+            ) for product_id in chunk]
+
+            ProductCard.objects.filter(product_id__in=chunk).delete()
+            ProductCard.objects.bulk_create(cards)
+            invalidate_catalog(chunk)
+
+    return len(product_ids)
+
+
+def count_key_value(value):
+    if isinstance(value, QuerySet):
+        return str(value.query)
+
+    return sorted(value) if isinstance(value, (list, tuple)) else value
+
+
+def product_count_key(filter_set):
+    normalized = sorted((key, count_key_value(value)) for key, value in filter_set.items())
+    return 'product-count:' + hashlib.md5(repr(normalized).encode('utf-8')).hexdigest()
+
+
+def count_products(products, filter_set, exact=False):
+    cache_key = product_count_key(filter_set)
+    count     = None if exact else cache.get(cache_key)
+
+    if count is None:
+        count = products.count()
+        cache.set(cache_key, count, settings.PRODUCT_COUNT_CACHE_TIMEOUT)
+
+    return count
+
+
+def top_n_per_group(queryset, group_field, ordering, n):
+    model = queryset.model
+
+    if connections[queryset.db].features.supports_over_clause:
+        ranked = queryset.annotate(group_rank=Window(
+            expression   = RowNumber(),
+            partition_by = [F(group_field)],
+            order_by     = [F(field[1:]).desc() if field.startswith('-') else F(field).asc() for field in ordering],
+        )).values('pk', 'group_rank')
+
+        try:
+            sql, params = ranked.query.sql_with_params()
+
+        except EmptyResultSet:
+            return queryset.none()
+
+        pk_column = model._meta.pk.column
+
+        return model.objects.filter(pk__in=RawSQL(
+            f'SELECT ranked.{pk_column} FROM ({sql}) ranked WHERE ranked.group_rank <= %s', (*params, n)
+        ))
+
+    reversed_ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+    ranked_ahead      = queryset.filter(
+        keyset_condition(reversed_ordering, [OuterRef(field.lstrip('-')) for field in ordering]),
+        **{group_field : OuterRef(group_field)},
+    ).order_by().values(group_field).annotate(ahead=Count('pk')).values('ahead')
+
+    return queryset.annotate(
+        group_rank=Coalesce(Subquery(ranked_ahead, output_field=IntegerField()), 0)
+    ).filter(group_rank__lt=n)
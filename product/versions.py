@@ -0,0 +1,44 @@
+import threading
+import time
+
+from django.conf      import settings
+from django.db        import transaction
+from django.db.models import F
+
+from .models import CatalogVersion
+
+
+def catalog_version(name):
+    return CatalogVersion.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+
+class CatalogVersions:
+    def __init__(self):
+        self.lock       = threading.Lock()
+        self.versions   = {}
+        self.checked_at = None
+
+    def get(self, name):
+        with self.lock:
+            now = time.monotonic()
+
+            if self.checked_at is None or now - self.checked_at >= settings.CATALOG_VERSION_CHECK_INTERVAL:
+                self.versions   = dict(CatalogVersion.objects.values_list('name', 'version'))
+                self.checked_at = now
+
+            return self.versions.get(name, 0)
+
+    def bump(self, name):
+        CatalogVersion.objects.get_or_create(name=name)
+
+        with transaction.atomic():
+            CatalogVersion.objects.filter(name=name).update(version=F('version') + 1)
+            version = catalog_version(name)
+
+        with self.lock:
+            self.versions[name] = version
+
+        return version
+
+
+catalog_versions = CatalogVersions()
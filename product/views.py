@@ -1,146 +1,465 @@
 import json
 
-from django.views     import View
-from django.http      import JsonResponse
-from django.db.models import Count, Avg
+from decimal import Decimal, InvalidOperation
+
+from django.conf            import settings
+from django.views           import View
+from django.http            import JsonResponse, StreamingHttpResponse
+from django.core.cache      import cache
+from django.core.exceptions import ValidationError
+from django.core.handlers   import asgi
+from django.utils.cache     import get_conditional_response
+
+from .models                import Product, Review, Reply, SubCategory
+from .export                import EXPORT_CONTENT_TYPES, export_lines
+from .facets                import facet_index, bit_count, bitmap_ids, ids_bitmap, count_facets
+from .pagination            import InvalidCursor, encode_cursor, decode_cursor, page_count_param, paginate_keyset
+from .references            import reference_names
+from .schemas               import (
+    PRODUCT_LIST, PRODUCT_CATEGORY, PRODUCT_DETAIL, REVIEW_LIST, REPLY_LIST, REVIEW_REPLIES,
+)
+from .search                import search_products, matching_products
+from .utils                 import (
+    REVIEW_ORDERS, REPLY_ORDER, count_products, top_n_per_group, product_version, product_detail_querysets,
+    product_detail_info, review_info, review_cursor, reply_info, reply_cursor, first_replies,
+)
+from core.cache             import cache_anonymous_response
+from core.db                import database_pool
+from core.renderers         import SchemaJsonResponse
+from core.views             import AsyncView
+from user.utils             import check_user
+
+PRODUCT_ORDERS = {
+    'id'         : ('id',),
+    'price'      : ('effective_price', 'id'),
+    '-price'     : ('-effective_price', '-id'),
+    'name'       : ('name', 'id'),
+    'score'      : ('-card__score_avg', '-id'),
+    'score_avg'  : ('card__score_avg', 'id'),
+    '-score_avg' : ('-card__score_avg', '-id'),
+}
 
-from .models          import Product, Review, Reply, ProductColorImage, SubCategory
-from user.utils       import check_user
 
 class ProductListView(View):
+    def response_tags(self, request):
+        menu         = request.GET.get('menu', None)
+        sub_category = request.GET.get('sub_category', None)
+
+        if menu:
+            return ['catalog'] + [f'menu:{menu_id}' for menu_id in reference_names.ids('menu', menu)]
+
+        if sub_category:
+            return ['catalog'] + [
+                f'sub_category:{sub_category_id}' for sub_category_id in reference_names.ids('sub_category', sub_category)
+            ]
+
+        return ['catalog', 'products']
+
+    @cache_anonymous_response('product-list')
     def get(self, request):
+        try:
+            listing          = self.filter_listing(request)
+            items, next_page = self.load_page(listing)
+
+        except (InvalidCursor, ValidationError):
+            return JsonResponse({'MESSAGE' : 'INVALID_CURSOR'}, status=400)
+
+        except InvalidOperation:
+            return JsonResponse({'MESSAGE' : 'INVALID_PRICE'}, status=400)
+
+        except ValueError:
+            return JsonResponse({'MESSAGE' : 'INVALID_PAGE'}, status=400)
+
+        return self.render_listing(listing, items, next_page, self.count_listing(listing))
+
+    def filter_listing(self, request):
         page         = int(request.GET.get('page', 1))
-        page_count   = int(request.GET.get('page_count',16))
+        page_count   = page_count_param(request, settings.PRODUCT_PAGE_COUNT, settings.PRODUCT_MAX_PAGE_COUNT)
         menu         = request.GET.get('menu', None)
         sub_category = request.GET.get('sub_category', None)
         colors       = request.GET.getlist('colors', None)
         sizes        = request.GET.getlist('sizes', None)
         hashtags     = request.GET.getlist('hashtags', None)
-        order        = request.GET.get('order', 'id') # price, -price, score_avg, name, ?
         word         = request.GET.get('word', None)
+        min_price    = request.GET.get('min_price', None)
+        max_price    = request.GET.get('max_price', None)
+        order        = request.GET.get('order', 'relevance' if word else 'id') # id, price, -price, name, score, relevance
+        cursor       = request.GET.get('cursor', None)
+
+        if page < 1:
+            raise ValueError(page)
+
+        if order not in PRODUCT_ORDERS and not (word and order == 'relevance'):
+            order = 'id'
+
+        payload = decode_cursor(cursor) if cursor else {}
+
+        if payload and order != 'relevance' and payload.get('order') != order:
+            raise InvalidCursor(cursor)
+
+        use_index     = settings.PRODUCT_FACET_INDEX
+        ranked_ids    = search_products(word) if word and (order == 'relevance' or use_index) else None
+        facet_filters = {
+            'menu'         : {'menu_id__in' : reference_names.ids('menu', menu)} if menu else {},
+            'sub_category' : {
+                'sub_category_id__in' : reference_names.ids('sub_category', sub_category)
+            } if sub_category else {},
+            'colors'       : {
+                'productcolorimages__color_id__in' : reference_names.ids('color', colors)
+            } if colors else {},
+            'sizes'        : {'sizes__id__in' : reference_names.ids('size', sizes)} if sizes else {},
+            'hashtags'     : {'hashtags__id__in' : reference_names.ids('hashtag', hashtags)} if hashtags else {},
+        }
+        price_filters = {}
+
+        if min_price and max_price:
+            price_filters['effective_price__range'] = (Decimal(min_price), Decimal(max_price))
+
+        elif min_price:
+            price_filters['effective_price__gte'] = Decimal(min_price)
+
+        elif max_price:
+            price_filters['effective_price__lte'] = Decimal(max_price)
+
+        base_filters = {'id__in' : matching_products(word)} if word else {}
+        base_filters.update(price_filters)
+
+        filter_set = dict(base_filters)
+        for lookups in facet_filters.values():
+            filter_set.update(lookups)
+
+        product_count = None
+        facet_counts  = None
+        product_ids   = None
+        found         = None
+
+        if use_index:
+            restrict = ids_bitmap(ranked_ids) if word else None
+
+            if price_filters:
+                price_ids = ids_bitmap(Product.objects.filter(**price_filters).values_list('id', flat=True))
+                restrict  = price_ids if restrict is None else restrict & price_ids
+
+            found = facet_index.search({
+                'menu'         : [menu] if menu else [],
+                'sub_category' : [sub_category] if sub_category else [],
+                'colors'       : colors,
+                'sizes'        : sizes,
+                'hashtags'     : hashtags,
+            }, restrict=restrict)
+
+        if found is not None:
+            product_ids, facet_counts = found
+            product_count             = bit_count(product_ids)
+
+            if order == 'relevance':
+                ranked_ids = [product_id for product_id in ranked_ids if product_ids >> product_id & 1]
+
+        if found is not None and order in ('id', 'relevance'):
+            products = Product.objects.all()
+
+        else:
+            product_ids = None
+            products    = Product.objects.filter(**filter_set)
+
+            if colors or sizes or hashtags:
+                products = products.distinct()
+
+            if settings.PRODUCT_FACET_INDEX and found is None:
+                facet_counts = count_facets(Product.objects.filter(**base_filters), facet_filters)
+
+            if order == 'relevance':
+                matched_ids = set(products.values_list('id', flat=True))
+                ranked_ids  = [product_id for product_id in ranked_ids if product_id in matched_ids]
+
+        products = products.select_related('card')
+
+        if order == 'relevance':
+            product_count = len(ranked_ids)
+        else:
+            products = products.order_by(*PRODUCT_ORDERS[order])
+
+        return {
+            'page'          : page,
+            'page_count'    : page_count,
+            'order'         : order,
+            'cursor'        : cursor,
+            'payload'       : payload,
+            'products'      : products,
+            'ranked_ids'    : ranked_ids,
+            'product_ids'   : product_ids,
+            'filter_set'    : filter_set,
+            'product_count' : product_count,
+            'facet_counts'  : facet_counts,
+        }
+
+    def load_page(self, listing):
+        page_count = listing['page_count']
+        cursor     = listing['cursor']
+        payload    = listing['payload']
+
+        if listing['order'] == 'relevance':
+            try:
+                offset = int(payload.get('offset', 0)) if cursor is not None else (listing['page'] - 1) * page_count
+
+            except (ValueError, TypeError):
+                raise InvalidCursor(cursor)
+
+            ranked_ids = listing['ranked_ids']
+            page_ids   = ranked_ids[offset:offset + page_count]
+            in_bulk    = listing['products'].in_bulk(page_ids)
+            items      = [in_bulk[product_id] for product_id in page_ids if product_id in in_bulk]
+
+            if cursor is not None and offset + page_count < len(ranked_ids):
+                return items, {'order' : listing['order'], 'offset' : offset + page_count}
+
+            return items, None
 
-        filter_set = {}
+        if listing['product_ids'] is not None:
+            return self.load_bitmap_page(listing)
+
+        if cursor is not None:
+            items, next_values = paginate_keyset(
+                listing['products'], PRODUCT_ORDERS[listing['order']], payload.get('values'), page_count
+            )
+            return items, {'order' : listing['order'], 'values' : next_values} if next_values else None
 
-        if menu:
-            filter_set['menu__name'] = menu
+        end_page   = listing['page'] * page_count
+        start_page = end_page - page_count
+        return list(listing['products'][start_page:end_page]), None
 
-        if sub_category:
-            filter_set['sub_category__name'] = sub_category
+    def load_bitmap_page(self, listing):
+        page_count = listing['page_count']
 
-        if colors:
-            filter_set['productcolorimages__color__name__in'] = colors
+        if listing['cursor'] is None:
+            page_ids = bitmap_ids(listing['product_ids'], (listing['page'] - 1) * page_count, page_count)
+            in_bulk  = listing['products'].in_bulk(page_ids)
+            return [in_bulk[product_id] for product_id in page_ids if product_id in in_bulk], None
 
-        if word:
-            filter_set['name__icontains'] = word
+        values = listing['payload'].get('values')
 
-        if sizes:
-            filter_set['sizes__name__in'] = sizes
+        if values is not None and not (isinstance(values, list) and len(values) == 1 and isinstance(values[0], int)):
+            raise InvalidCursor(listing['cursor'])
 
-        if hashtags:
-            filter_set['hashtags__name__in'] = hashtags
+        page_ids = bitmap_ids(listing['product_ids'], limit=page_count + 1, after=values[0] if values else -1)
+        in_bulk  = listing['products'].in_bulk(page_ids[:page_count])
+        items    = [in_bulk[product_id] for product_id in page_ids[:page_count] if product_id in in_bulk]
 
-        products = Product.objects.filter(**filter_set
-        ).prefetch_related('productcolorimages__image', 'reviews'
-        ).annotate(score_avg = Avg('reviews__score'), color_count=Count('colors', distinct=True)
-        ).order_by(order)
+        if len(page_ids) > page_count:
+            return items, {'order' : listing['order'], 'values' : [page_ids[page_count - 1]]}
 
-        end_page   = page * page_count
-        start_page = end_page - page_count
+        return items, None
 
-        product_list = [{
-            'id'               : product.id,
-            'name'             : product.name,
-            'price'            : product.price,
-            'discount_rate'    : product.discount_rate,
-            'review_score_avg' : product.score_avg or 0,
-            'thumbnail'        : product.productcolorimages.all()[0].image.image_url,
-            'color_count'      : product.color_count,
-        } for product in products[start_page:end_page]]
-
-        return JsonResponse({
-            'PRODUCT_COUNT' : products.count(),
-            'PRODUCTS_LIST' : product_list},
-            status=200
+    def count_listing(self, listing):
+        if listing['product_count'] is not None:
+            return listing['product_count']
+
+        if listing['payload'].get('count') is not None:
+            return listing['payload']['count']
+
+        return count_products(
+            listing['products'], listing['filter_set'], exact=listing['cursor'] is not None or listing['page'] == 1
         )
 
+    def render_listing(self, listing, items, next_page, product_count):
+        result = {
+            'PRODUCT_COUNT' : product_count,
+            'PRODUCTS_LIST' : items,
+        }
+
+        if listing['cursor'] is not None:
+            if next_page and 'values' in next_page:
+                next_page['count'] = product_count
+
+            result['NEXT_CURSOR'] = encode_cursor(next_page) if next_page else None
+
+        if listing['facet_counts'] is not None:
+            result['FACETS'] = listing['facet_counts']
+
+        return SchemaJsonResponse(PRODUCT_LIST, result, status=200)
+
+
+class AsyncProductListView(AsyncView, ProductListView):
+    @cache_anonymous_response('product-list')
+    async def get(self, request):
+        try:
+            listing                           = await database_pool.run(self.filter_listing, request)
+            (items, next_page), product_count = await database_pool.gather(
+                (self.load_page, listing),
+                (self.count_listing, listing),
+            )
+
+        except (InvalidCursor, ValidationError):
+            return JsonResponse({'MESSAGE' : 'INVALID_CURSOR'}, status=400)
+
+        except InvalidOperation:
+            return JsonResponse({'MESSAGE' : 'INVALID_PRICE'}, status=400)
+
+        except ValueError:
+            return JsonResponse({'MESSAGE' : 'INVALID_PAGE'}, status=400)
+
+        return self.render_listing(listing, items, next_page, product_count)
+
 
 class ProductCategoryView(View):
+    def response_tags(self, request, menu):
+        return ['catalog'] + [f'menu:{menu_id}' for menu_id in reference_names.ids('menu', menu)]
+
+    @cache_anonymous_response('product-category')
     def get(self, request, menu):
-        subcategories = SubCategory.objects.filter(menu__name=menu).prefetch_related('products')
+        try:
+            top_n = min(int(request.GET.get('count', settings.PRODUCT_CATEGORY_TOP_N)), settings.PRODUCT_CATEGORY_MAX_TOP_N)
+
+        except ValueError:
+            return JsonResponse({'MESSAGE' : 'INVALID_COUNT'}, status=400)
+
+        if top_n < 1:
+            return JsonResponse({'MESSAGE' : 'INVALID_COUNT'}, status=400)
+
+        order = request.GET.get('order', settings.PRODUCT_CATEGORY_ORDER)
+
+        if order not in PRODUCT_ORDERS:
+            order = 'id'
+
+        subcategories = list(SubCategory.objects.filter(menu_id__in=reference_names.ids('menu', menu)).order_by('id'))
+        products      = top_n_per_group(
+            Product.objects.filter(sub_category_id__in=[subcategory.id for subcategory in subcategories]),
+            'sub_category_id', PRODUCT_ORDERS[order], top_n,
+        ).select_related('card').order_by('sub_category_id', *PRODUCT_ORDERS[order])
+
+        subcategory_products = {}
+        for product in products:
+            subcategory_products.setdefault(product.sub_category_id, []).append(product)
 
         subcategory_items = [{
             'subcategory_name' : subcategory.name,
-            'subcategory_item' : [{
-                'product_id'       : product.id,
-                'product_name'     : product.name,
-                'price'            : product.price,
-                'discount_rate'    : product.discount_rate,
-                'review_score_avg' : product.score_avg or 0,
-                'thumbnail'        : product.productcolorimages.all()[0].image.image_url,
-                'color_count'      : product.color_count,
-            } for product in subcategory.products.prefetch_related(
-                'productcolorimages__image', 'reviews'
-            ).annotate(score_avg = Avg('reviews__score'), color_count=Count('colors', distinct=True))][:4]
+            'subcategory_item' : subcategory_products.get(subcategory.id, []),
         } for subcategory in subcategories]
 
-        return JsonResponse({
+        return SchemaJsonResponse(PRODUCT_CATEGORY, {
             'SUB_CATEGORY_LIST' : subcategory_items},
             status=200
         )
 
 
 class ProductDetailView(View):
+    def response_tags(self, request, product_id):
+        return ['catalog', f'product:{product_id}']
+
+    @cache_anonymous_response('product-detail')
     def get(self, request, product_id):
-        try:
-            product            = Product.objects.annotate(score_avg = Avg('reviews__score')).get(id=product_id)
-            productcolorimages = ProductColorImage.objects.filter(product=product)
-
-            product_info = {
-                "id"               : product.id,
-                "name"             : product.name,
-                "code"             : product.code,
-                "description"      : product.description,
-                "price"            : product.price,
-                "discount_rate"    : product.discount_rate,
-                "review_score_avg" : product.score_avg,
-
-                "hashtags" : [{
-                    "hashtag_id"   : hashtag.id,
-                    "hashtag_name" : hashtag.name
-                } for hashtag in product.hashtags.all()],
-
-                "sizes" : [{
-                    "size_id" : size.id, 
-                    "size_name" : size.name
-                } for size in product.sizes.all()],
-
-                "colors" : [{
-                    'color_id'   : color_values['color_id'],
-                    'color_name' : color_values['color__name'],
-                    'img' : [{
-                        'color_image_id'  : color_image.image.id,
-                        'color_image_url' : color_image.image.image_url
-                    }
-                    for color_image in productcolorimages.filter(color_id=color_values['color_id']).select_related('image')
-                ]} for color_values in productcolorimages.values('color_id', 'color__name').distinct()],
-
-                "review" : [{
-                    "review"      : review.id,
-                    'user_name'   : review.user.name,
-                    'image_url'   : review.image_url,
-                    'score'       : review.score,
-                    'description' : review.description,
-                    'created_at'  : review.created_at,
-                } for review in product.reviews.select_related('user')],
-            }
-
-            return JsonResponse({'product' : product_info},status = 200)
-
-        except Product.DoesNotExist:
+        version, response = self.cached_detail(request, product_id)
+
+        if response is None:
+            querysets = product_detail_querysets(product_id)
+            response  = self.detail_response(product_id, version, {
+                name : list(rows) for name, rows in querysets.items()
+            })
+
+        return response
+
+    def cached_detail(self, request, product_id):
+        version = product_version(product_id)
+
+        if version is None:
+            return version, JsonResponse({'MESSAGE' : "Product does not exist"}, status=400)
+
+        etag         = f'"{product_id}-{version}"'
+        not_modified = get_conditional_response(request, etag=etag)
+
+        if not_modified:
+            return version, not_modified
+
+        product_info = cache.get(f'product-detail:{product_id}:{version}')
+
+        if product_info is None:
+            return version, None
+
+        return version, self.etag_response(product_info, etag)
+
+    def detail_response(self, product_id, version, rows):
+        products = rows.pop('product')
+
+        if not products:
             return JsonResponse({'MESSAGE' : "Product does not exist"}, status=400)
 
+        product_info = product_detail_info(products[0], **rows)
+        cache.set(f'product-detail:{product_id}:{version}', product_info, settings.PRODUCT_DETAIL_CACHE_TIMEOUT)
+
+        return self.etag_response(product_info, f'"{product_id}-{version}"')
+
+    def etag_response(self, product_info, etag):
+        response         = SchemaJsonResponse(PRODUCT_DETAIL, {'product' : product_info}, status=200)
+        response['ETag'] = etag
+        return response
+
+
+class AsyncProductDetailView(AsyncView, ProductDetailView):
+    @cache_anonymous_response('product-detail')
+    async def get(self, request, product_id):
+        version, response = await database_pool.run(self.cached_detail, request, product_id)
+
+        if response is None:
+            querysets = product_detail_querysets(product_id)
+            rows      = await database_pool.gather(*((list, rows) for rows in querysets.values()))
+            response  = await database_pool.run(self.detail_response, product_id, version, dict(zip(querysets, rows)))
+
+        return response
+
+
+class ProductExportView(View):
+    def get(self, request):
+        format = request.GET.get('format', 'ndjson')
+
+        if format not in EXPORT_CONTENT_TYPES:
+            return JsonResponse({'MESSAGE' : 'INVALID_FORMAT'}, status=400)
+
+        if isinstance(request, asgi.ASGIRequest):
+            return JsonResponse({'MESSAGE' : 'EXPORT_NOT_SUPPORTED_ON_ASGI'}, status=501)
+
+        response = StreamingHttpResponse(export_lines(format), content_type=EXPORT_CONTENT_TYPES[format])
+        response['Content-Disposition'] = f'attachment; filename="products.{format}"'
+
+        return response
+
 
 class ReviewView(View):
+    def get(self, request, product_id):
+        sort   = request.GET.get('sort', 'newest') # newest, score_high, score_low
+        photo  = request.GET.get('photo', 'false').lower() in ('1', 'true')
+        cursor = request.GET.get('cursor', None)
+
+        try:
+            page_count = page_count_param(request, settings.REVIEW_PAGE_COUNT, settings.REVIEW_MAX_PAGE_COUNT)
+
+        except ValueError:
+            return JsonResponse({'MESSAGE' : 'INVALID_PAGE_COUNT'}, status=400)
+
+        if sort not in REVIEW_ORDERS:
+            sort = 'newest'
+
+        reviews = Review.objects.filter(product_id=product_id).select_related('user')
+
+        if photo:
+            reviews = reviews.filter(has_photo=True)
+
+        try:
+            payload = decode_cursor(cursor) if cursor else {}
+
+            if payload and (payload.get('sort') != sort or payload.get('photo') != photo):
+                raise InvalidCursor(cursor)
+
+            items, next_values = paginate_keyset(reviews, REVIEW_ORDERS[sort], payload.get('values'), page_count)
+
+        except (InvalidCursor, ValidationError):
+            return JsonResponse({'MESSAGE' : 'INVALID_CURSOR'}, status=400)
+
+        return SchemaJsonResponse(REVIEW_LIST, {
+            'REVIEW_LIST' : [review_info(review) for review in items],
+            'NEXT_CURSOR' : review_cursor(sort, photo, next_values)},
+            status=200
+        )
+
     @check_user
     def post(self, request, product_id):
         try:
@@ -184,16 +503,65 @@ class ReviewView(View):
             return JsonResponse({'MESSAGE':"Review does not exist"}, status=400)
 
 
+class ReviewRepliesView(View):
+    def get(self, request, product_id):
+        try:
+            review_ids = list(dict.fromkeys(int(review_id) for review_id in request.GET.getlist('review_ids')))
+            count      = min(int(request.GET.get('count', settings.REPLY_PREVIEW_COUNT)), settings.REPLY_PAGE_COUNT)
+
+        except ValueError:
+            return JsonResponse({'MESSAGE' : 'INVALID_REVIEW_IDS'}, status=400)
+
+        if not review_ids or len(review_ids) > settings.REPLY_BATCH_MAX_REVIEWS or count < 1:
+            return JsonResponse({'MESSAGE' : 'INVALID_REVIEW_IDS'}, status=400)
+
+        reply_counts = dict(Review.objects.filter(product_id=product_id, id__in=review_ids).values_list(
+            'id', 'reply_count'
+        ))
+        review_ids   = [review_id for review_id in review_ids if review_id in reply_counts]
+        pages        = first_replies(review_ids, count) if review_ids else {}
+
+        return SchemaJsonResponse(REVIEW_REPLIES, {
+            'REVIEW_REPLIES' : [{
+                'review_id'   : review_id,
+                'reply_count' : reply_counts[review_id],
+                'REPLY_LIST'  : [reply_info(reply) for reply in pages[review_id][0]],
+                'NEXT_CURSOR' : pages[review_id][1],
+            } for review_id in review_ids]},
+            status=200
+        )
+
+
 class ReplyView(View):
-    def get(self, request, product_id, review_id, reply_id):
-        replies = Reply.objects.filter(review_id = review_id).select_related('user')
+    def get(self, request, product_id, review_id, reply_id=None):
+        cursor  = request.GET.get('cursor', None)
+        replies = Reply.objects.filter(review_id=review_id, review__product_id=product_id).select_related('user')
+
+        try:
+            page_count = page_count_param(request, settings.REPLY_PAGE_COUNT, settings.REPLY_MAX_PAGE_COUNT)
+
+        except ValueError:
+            return JsonResponse({'MESSAGE' : 'INVALID_PAGE_COUNT'}, status=400)
+
+        if reply_id is not None:
+            replies = replies.filter(id=reply_id)
 
-        reply_list = [{
-            'user_name' : reply.user.name,
-            'comment'   : reply.comment,
-        }for reply in replies]
+        try:
+            payload = decode_cursor(cursor) if cursor else {}
+
+            if payload and payload.get('review') != review_id:
+                raise InvalidCursor(cursor)
+
+            items, next_values = paginate_keyset(replies, REPLY_ORDER, payload.get('values'), page_count)
 
-        return JsonResponse({'REPLY_LIST': reply_list}, status=200)
+        except (InvalidCursor, ValidationError):
+            return JsonResponse({'MESSAGE' : 'INVALID_CURSOR'}, status=400)
+
+        return SchemaJsonResponse(REPLY_LIST, {
+            'REPLY_LIST'  : [reply_info(reply) for reply in items],
+            'NEXT_CURSOR' : reply_cursor(review_id, next_values)},
+            status=200
+        )
 
     @check_user
     def post(self, request, product_id, review_id):
@@ -0,0 +1,94 @@
+import multiprocessing
+import threading
+
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import bcrypt
+
+from django.conf import settings
+
+
+class HasherBusy(Exception):
+    pass
+
+
+def hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def check_password(password, hashed):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def hash_rounds(hashed):
+    try:
+        return int(hashed.split('$')[2])
+
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    def __init__(self):
+        self.lock     = threading.Lock()
+        self.slots    = None
+        self.executor = None
+
+    def get_slots(self):
+        with self.lock:
+            if self.slots is None:
+                self.slots = threading.BoundedSemaphore(
+                    max(settings.PASSWORD_HASHER_WORKERS, 1) + settings.PASSWORD_HASHER_MAX_QUEUE
+                )
+
+            return self.slots
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers = settings.PASSWORD_HASHER_WORKERS,
+                    mp_context  = multiprocessing.get_context(settings.PASSWORD_HASHER_START_METHOD),
+                )
+
+            return self.executor
+
+    def run(self, func, *args):
+        slots = self.get_slots()
+
+        if not slots.acquire(blocking=False):
+            raise HasherBusy
+
+        if not settings.PASSWORD_HASHER_WORKERS:
+            try:
+                return func(*args)
+
+            finally:
+                slots.release()
+
+        try:
+            future = self.get_executor().submit(func, *args)
+
+        except Exception:
+            slots.release()
+            raise
+
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=settings.PASSWORD_HASHER_TIMEOUT)
+
+        except TimeoutError:
+            raise HasherBusy
+
+    def hash(self, password):
+        return self.run(hash_password, password, settings.PASSWORD_HASHER_ROUNDS)
+
+    def check(self, password, hashed):
+        return self.run(check_password, password, hashed)
+
+    def needs_rehash(self, hashed):
+        return hash_rounds(hashed) != settings.PASSWORD_HASHER_ROUNDS
+
+
+password_hasher = PasswordHasher()
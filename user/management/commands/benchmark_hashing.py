@@ -0,0 +1,60 @@
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf                 import settings
+from django.core.management.base import BaseCommand
+from django.test.utils           import override_settings
+
+from user.hashers import PasswordHasher, HasherBusy, hash_password
+
+
+class Command(BaseCommand):
+    help = 'Measure bcrypt logins per second through the password hashing pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200)
+        parser.add_argument('--clients', type=int, default=32)
+        parser.add_argument('--workers', type=int, default=settings.PASSWORD_HASHER_WORKERS)
+        parser.add_argument('--rounds', type=int, default=settings.PASSWORD_HASHER_ROUNDS)
+
+    def handle(self, *args, **options):
+        password = 'benchmark1234!'
+        hashed   = hash_password(password, options['rounds'])
+        workers  = options['workers']
+
+        with override_settings(
+            PASSWORD_HASHER_WORKERS   = workers,
+            PASSWORD_HASHER_MAX_QUEUE = options['clients'],
+            PASSWORD_HASHER_ROUNDS    = options['rounds'],
+        ):
+            hasher = PasswordHasher()
+            hasher.check(password, hashed)
+
+            def login(_):
+                try:
+                    return hasher.check(password, hashed)
+
+                except HasherBusy:
+                    return None
+
+            started = time.perf_counter()
+
+            with ThreadPoolExecutor(max_workers=options['clients']) as clients:
+                results = list(clients.map(login, range(options['logins'])))
+
+            elapsed = time.perf_counter() - started
+
+            if hasher.executor:
+                hasher.executor.shutdown()
+
+        rejected  = results.count(None)
+        completed = options['logins'] - rejected
+        cores     = min(max(workers, 1), os.cpu_count() or 1)
+
+        self.stdout.write(
+            f'rounds={options["rounds"]} workers={workers} clients={options["clients"]}: '
+            f'{completed / elapsed:.1f} logins/s, {completed / elapsed / cores:.1f} logins/s/core, '
+            f'{rejected} rejected as busy'
+        )
@@ -0,0 +1,38 @@
+import time
+
+from django.conf                 import settings
+from django.core.mail            import get_connection
+from django.core.management.base import BaseCommand
+
+from user.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Drain the email outbox in batches over a single SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument('--max-attempts', type=int, default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+        parser.add_argument('--loop', action='store_true', help='keep polling for new emails')
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent, total_failed = 0, 0
+
+            with get_connection() as connection:
+                while True:
+                    sent, failed  = send_batch(connection, options['batch_size'], options['max_attempts'])
+                    total_sent   += sent
+                    total_failed += failed
+
+                    if sent + failed < options['batch_size']:
+                        break
+
+            if total_sent or total_failed:
+                self.stdout.write(f'Sent {total_sent} emails, {total_failed} failed')
+
+            if not options['loop']:
+                break
+
+            time.sleep(options['interval'])
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db    import models
+from django.utils import timezone
 
 
 class User(models.Model):
@@ -52,3 +53,25 @@ class Membership(models.Model):
 
     class Meta:
         db_table = 'memberships'
+
+
+class OutboxEmail(models.Model):
+    PENDING = 'pending'
+    SENT    = 'sent'
+    DEAD    = 'dead'
+
+    subject         = models.CharField(max_length=800)
+    body            = models.TextField()
+    to              = models.CharField(max_length=800)
+    status          = models.CharField(max_length=20, default=PENDING)
+    attempts        = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error      = models.TextField(null=True, blank=True)
+    created_at      = models.DateTimeField(auto_now_add=True)
+    sent_at         = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        indexes  = [
+            models.Index(fields=['status', 'next_attempt_at', 'id'], name='email_outbox_due_idx'),
+        ]
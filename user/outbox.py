@@ -0,0 +1,79 @@
+import datetime
+
+from django.conf      import settings
+from django.core.mail import EmailMessage
+from django.db        import transaction
+from django.db.models import F
+from django.utils     import timezone
+
+from .models import OutboxEmail
+
+
+def enqueue_email(subject, body, to):
+    return OutboxEmail.objects.create(subject=subject, body=body, to=','.join(to))
+
+
+def claim_batch(batch_size):
+    now = timezone.now()
+
+    with transaction.atomic():
+        claimed = list(OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+            status               = OutboxEmail.PENDING,
+            next_attempt_at__lte = now,
+        ).order_by('next_attempt_at', 'id')[:batch_size])
+
+        OutboxEmail.objects.filter(id__in=[email.id for email in claimed]).update(
+            attempts        = F('attempts') + 1,
+            next_attempt_at = now + datetime.timedelta(seconds=settings.EMAIL_OUTBOX_LEASE),
+        )
+
+    for email in claimed:
+        email.attempts += 1
+
+    return claimed
+
+
+def mark_failed(email, error, now, max_attempts):
+    email.last_error = repr(error)
+
+    if email.attempts >= max_attempts:
+        email.status = OutboxEmail.DEAD
+    else:
+        backoff               = settings.EMAIL_OUTBOX_BACKOFF * 2 ** (email.attempts - 1)
+        email.next_attempt_at = now + datetime.timedelta(seconds=backoff)
+
+    return email
+
+
+def send_batch(connection, batch_size=None, max_attempts=None):
+    batch_size   = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    claimed      = claim_batch(batch_size)
+    now          = timezone.now()
+    sent, failed = [], []
+
+    try:
+        if claimed:
+            connection.open()
+
+    except Exception as error:
+        failed, claimed = [mark_failed(email, error, now, max_attempts) for email in claimed], []
+
+    for email in claimed:
+        message = EmailMessage(email.subject, email.body, to=email.to.split(','), connection=connection)
+
+        try:
+            connection.send_messages([message])
+            sent.append(email.id)
+
+        except Exception as error:
+            failed.append(mark_failed(email, error, now, max_attempts))
+            connection.close()
+
+    if sent:
+        OutboxEmail.objects.filter(id__in=sent).update(status=OutboxEmail.SENT, sent_at=now, last_error=None)
+
+    if failed:
+        OutboxEmail.objects.bulk_update(failed, ['status', 'next_attempt_at', 'last_error'])
+
+    return len(sent), len(failed)
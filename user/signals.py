@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch          import receiver
+
+from .models import User, Membership, Shop
+from .utils  import invalidate_user, invalidate_users
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Membership)
+@receiver([post_save, post_delete], sender=Shop)
+def invalidate_cached_users(sender, instance, **kwargs):
+    invalidate_users()
@@ -1,3 +1,203 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import smtplib
 
-# Create your tests here.
+import jwt
+
+from unittest import mock
+
+from django.conf                    import settings
+from django.core                    import mail
+from django.core.cache              import cache
+from django.core.mail               import get_connection
+from django.core.mail.backends      import locmem
+from django.core.management         import call_command
+from django.test                    import TestCase, override_settings
+from django.utils                   import timezone
+
+from .models import User, Membership, Coupon, OutboxEmail
+from .outbox import enqueue_email, send_batch
+from .utils  import USER_GENERATION_KEY, authenticate, token_cache, user_cache
+
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class FailingBackend(locmem.EmailBackend):
+    def send_messages(self, messages):
+        raise smtplib.SMTPException('mailbox unavailable')
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM_BACKEND)
+class OutboxEnqueueTest(TestCase):
+    def setUp(self):
+        Membership.objects.create(id=1, grade='basic', discount_rate=0)
+        Coupon.objects.create(id=1, name='welcome', discount_rate=10)
+
+        self.user = User.objects.create(
+            name         = 'tester',
+            email        = 'tester@example.com',
+            phone_number = '01012345678',
+            password     = 'hashed',
+        )
+
+    def test_emailauth_enqueues_without_sending(self):
+        response = self.client.post(
+            '/user/emailauth', json.dumps({'email' : self.user.email}), content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+
+        email = OutboxEmail.objects.get()
+
+        self.assertEqual(email.to, self.user.email)
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertIn('/user/emailauth/activate/', email.body)
+
+    def test_emailauth_rolls_back_the_outbox_row_with_the_request(self):
+        def enqueue_then_fail(*args, **kwargs):
+            enqueue_email(*args, **kwargs)
+            raise RuntimeError('request failed after enqueue')
+
+        with mock.patch('user.views.enqueue_email', enqueue_then_fail):
+            with self.assertRaises(RuntimeError):
+                self.client.post(
+                    '/user/emailauth', json.dumps({'email' : self.user.email}), content_type='application/json'
+                )
+
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_signup_enqueues_nothing_until_emailauth(self):
+        response = self.client.post('/user/signup', json.dumps({
+            'name'         : 'new user',
+            'email'        : 'new@example.com',
+            'password'     : 'password1234!',
+            'phone_number' : '01087654321',
+        }), content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(OutboxEmail.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM_BACKEND, EMAIL_OUTBOX_BACKOFF=60, EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+class OutboxSendTest(TestCase):
+    def enqueue(self, count):
+        return [enqueue_email(f'subject {index}', f'body {index}', to=[f'user{index}@example.com']) for index in range(count)]
+
+    def test_send_batch_delivers_over_one_connection(self):
+        self.enqueue(5)
+
+        self.assertEqual(send_batch(get_connection(), batch_size=3), (3, 0))
+        self.assertEqual(send_batch(get_connection(), batch_size=3), (2, 0))
+        self.assertEqual(send_batch(get_connection(), batch_size=3), (0, 0))
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.SENT, sent_at__isnull=False).count(), 5)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'user{index}@example.com' for index in range(5)])
+
+    def test_command_drains_the_outbox(self):
+        self.enqueue(7)
+
+        call_command('send_outbox_emails', batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 7)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.SENT).exists())
+
+    def test_failed_send_backs_off_exponentially(self):
+        email = self.enqueue(1)[0]
+
+        started = timezone.now()
+        self.assertEqual(send_batch(FailingBackend()), (0, 1))
+        email.refresh_from_db()
+
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('mailbox unavailable', email.last_error)
+        self.assertGreaterEqual(email.next_attempt_at, started + datetime.timedelta(seconds=60))
+        self.assertLessEqual(email.next_attempt_at, timezone.now() + datetime.timedelta(seconds=60))
+
+        self.assertEqual(send_batch(FailingBackend()), (0, 0))
+
+        OutboxEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+        started = timezone.now()
+        self.assertEqual(send_batch(FailingBackend()), (0, 1))
+        email.refresh_from_db()
+
+        self.assertEqual(email.attempts, 2)
+        self.assertGreaterEqual(email.next_attempt_at, started + datetime.timedelta(seconds=120))
+
+        OutboxEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_batch(get_connection()), (1, 0))
+        email.refresh_from_db()
+
+        self.assertEqual(email.status, OutboxEmail.SENT)
+        self.assertIsNone(email.last_error)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_dead_letters_after_max_attempts(self):
+        email = self.enqueue(1)[0]
+
+        for attempt in range(settings.EMAIL_OUTBOX_MAX_ATTEMPTS):
+            OutboxEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+            self.assertEqual(send_batch(FailingBackend()), (0, 1))
+
+        email.refresh_from_db()
+
+        self.assertEqual(email.status, OutboxEmail.DEAD)
+        self.assertEqual(email.attempts, settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+
+        OutboxEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_batch(get_connection()), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class AuthenticationCacheTest(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        user_cache.clear()
+
+        Membership.objects.create(id=1, grade='basic', discount_rate=0)
+        self.user  = User.objects.create(
+            name         = 'tester',
+            email        = 'tester@example.com',
+            phone_number = '01012345678',
+            password     = 'hashed',
+            address      = 'Seoul',
+        )
+        self.token = jwt.encode({'user_id' : self.user.id}, settings.SECRET_KEY, algorithm='HS256')
+
+    def test_warm_authentication_runs_no_queries(self):
+        authenticate(self.token)
+
+        with self.assertNumQueries(0):
+            user = authenticate(self.token)
+            self.assertEqual(user.membership.grade, 'basic')
+            self.assertIsNone(user.favorite_shop)
+
+    def test_user_changes_replace_the_snapshot(self):
+        authenticate(self.token)
+
+        self.user.address = 'Busan'
+        self.user.save()
+
+        self.assertEqual(authenticate(self.token).address, 'Busan')
+
+        response = self.client.put(
+            '/user/account', json.dumps({'address' : 'Incheon'}), content_type='application/json',
+            HTTP_AUTHORIZATION=self.token,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(authenticate(self.token).address, 'Incheon')
+
+    def test_generation_bump_from_another_process_is_seen_after_the_check_interval(self):
+        authenticate(self.token)
+        User.objects.filter(id=self.user.id).update(address='Daegu')
+        cache.incr(USER_GENERATION_KEY)
+
+        self.assertEqual(authenticate(self.token).address, 'Seoul')
+
+        with self.settings(AUTH_USER_GENERATION_CHECK_INTERVAL=0):
+            self.assertEqual(authenticate(self.token).address, 'Daegu')
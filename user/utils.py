@@ -1,24 +1,195 @@
+import asyncio
+import functools
+import threading
+import time
+
+from collections import OrderedDict
+
 import jwt
 
-from django.http import JsonResponse
+from django.conf       import settings
+from django.core.cache import cache
+from django.http       import JsonResponse
 
 from ageoste.settings import SECRET_KEY
+from core.cache       import new_version
+from core.db          import database_pool
 from user.models      import User
 
+USER_GENERATION_KEY = 'auth-user-generation'
 
-def check_user(func):
-    def wrapper(self, request, *args, **kwargs):
+
+class TokenCache:
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.lock    = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, token):
+        with self.lock:
+            entry = self.entries.get(token)
+
+            if entry is None:
+                return None
+
+            payload, expires_at = entry
+            if expires_at < time.monotonic() or payload.get('exp', time.time()) < time.time():
+                del self.entries[token]
+                return None
+
+            self.entries.move_to_end(token)
+            return payload
+
+    def set(self, token, payload):
+        timeout = self.timeout
+
+        if 'exp' in payload:
+            timeout = min(timeout, payload['exp'] - time.time())
+
+        if timeout <= 0:
+            return
+
+        with self.lock:
+            self.entries[token] = (payload, time.monotonic() + timeout)
+            self.entries.move_to_end(token)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+
+class UserCache:
+    def __init__(self, maxsize, timeout):
+        self.maxsize    = maxsize
+        self.timeout    = timeout
+        self.lock       = threading.Lock()
+        self.entries    = OrderedDict()
+        self.generation = None
+        self.checked_at = None
+
+    def check_generation(self):
+        now = time.monotonic()
+
+        if self.checked_at is not None and now - self.checked_at < settings.AUTH_USER_GENERATION_CHECK_INTERVAL:
+            return
+
+        generation = cache.get_or_set(USER_GENERATION_KEY, new_version, None)
+
+        with self.lock:
+            if generation != self.generation:
+                self.entries.clear()
+
+            self.generation = generation
+            self.checked_at = now
+
+    def get(self, user_id):
+        self.check_generation()
+
+        with self.lock:
+            entry = self.entries.get(user_id)
+
+            if entry is None:
+                return None
+
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[user_id]
+                return None
+
+            self.entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self.lock:
+            self.entries[user_id] = (user, time.monotonic() + self.timeout)
+            self.entries.move_to_end(user_id)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id=None):
         try:
-            token        = request.headers.get('Authorization')
-            payload      = jwt.decode(token, SECRET_KEY, algorithms='HS256')
-            user         = User.objects.get(id=payload['user_id'])
-            request.user = user
+            cache.incr(USER_GENERATION_KEY)
+
+        except ValueError:
+            cache.add(USER_GENERATION_KEY, new_version(), None)
+
+        with self.lock:
+            if user_id is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.checked_at = None
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TIMEOUT)
+
+
+def invalidate_user(user_id):
+    user_cache.invalidate(user_id)
+
+
+def invalidate_users():
+    user_cache.invalidate()
+
+
+def get_user(user_id):
+    user = user_cache.get(user_id)
+
+    if user is None:
+        user = User.objects.select_related('membership', 'favorite_shop').get(id=user_id)
+        user_cache.set(user_id, user)
 
-        except User.DoesNotExist:
+    return user
+
+
+def authenticate(token):
+    payload = token_cache.get(token)
+
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms='HS256')
+        token_cache.set(token, payload)
+
+    return get_user(payload['user_id'])
+
+
+def check_user(func):
+    def unauthorized(error):
+        if isinstance(error, User.DoesNotExist):
             return JsonResponse({"message": "존재하지 않는 유저입니다."}, status=401)
+        return JsonResponse({"message": "잘못된 token 입니다."}, status=401)
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(self, request, *args, **kwargs):
+            try:
+                request.user = await database_pool.run(authenticate, request.headers.get('Authorization'))
+
+            except (User.DoesNotExist, jwt.DecodeError, jwt.ExpiredSignatureError) as error:
+                return unauthorized(error)
+
+            return await func(self, request, *args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, request, *args, **kwargs):
+        try:
+            request.user = authenticate(request.headers.get('Authorization'))
 
-        except jwt.DecodeError:
-            return JsonResponse({"message": "잘못된 token 입니다."}, status=401)
+        except (User.DoesNotExist, jwt.DecodeError, jwt.ExpiredSignatureError) as error:
+            return unauthorized(error)
 
         return func(self, request, *args, **kwargs)
 
@@ -1,25 +1,31 @@
 import json
 import re
-import bcrypt
 import jwt
 
 from django.http                    import JsonResponse, HttpResponse
 from django.db                      import transaction
 from django.views                   import View
-from django.core.exceptions         import ValidationError, ObjectDoesNotExist
+from django.core.exceptions         import ValidationError, ObjectDoesNotExist, MultipleObjectsReturned
 from django.shortcuts               import redirect
 from django.contrib.sites.shortcuts import get_current_site
 from django.utils.http              import urlsafe_base64_encode, urlsafe_base64_decode
-from django.core.mail               import EmailMessage
 from django.utils.encoding          import force_bytes, force_text
 
 from .models     import User, UserCoupon, Coupon
 from .tokens     import account_activation_token
 from my_settings import SECRET, EMAIL
-from .utils      import check_user, active_message
+from .utils      import check_user, active_message, invalidate_user
+from .hashers    import password_hasher, HasherBusy
+from .outbox     import enqueue_email
 from .validators import validate_email, validate_password, validate_phone_number, validate_birth
 
 
+def server_busy():
+    response                = JsonResponse({"error": "SERVER_BUSY"}, status=503)
+    response['Retry-After'] = 1
+    return response
+
+
 class SignUpView(View):
     @transaction.atomic
     def post(self, request):
@@ -55,8 +61,7 @@ class SignUpView(View):
                 date_of_birth = str(date_of_birth)
                 date_of_birth = f'{date_of_birth[:4]}-{date_of_birth[4:6]}-{date_of_birth[6:]}'
 
-            encoded_pw = password.encode('utf-8')
-            hashed_pw  = bcrypt.hashpw(encoded_pw, bcrypt.gensalt()).decode('utf-8')
+            hashed_pw = password_hasher.hash(password)
 
             user = User(
                 name          = name,
@@ -81,6 +86,9 @@ class SignUpView(View):
         except json.decoder.JSONDecodeError:
             return JsonResponse({"error": "JSON_DECODE_ERROR"}, status=400)
 
+        except HasherBusy:
+            return server_busy()
+
 
 class SignInView(View):
     def post(self, request):
@@ -92,7 +100,15 @@ class SignInView(View):
             user          = User.objects.get(email=email)
             user_password = user.password
 
-            if bcrypt.checkpw(password.encode('utf-8'), user_password.encode('utf-8')):
+            if password_hasher.check(password, user_password):
+                if password_hasher.needs_rehash(user_password):
+                    try:
+                        User.objects.filter(id=user.id).update(password=password_hasher.hash(password))
+                        invalidate_user(user.id)
+
+                    except HasherBusy:
+                        pass
+
                 payload = {"user_id": user.id}
                 token   = jwt.encode(payload, SECRET, algorithm='HS256')
                 return JsonResponse({"token": token, "message": "SUCCESS"}, status=200)
@@ -104,6 +120,9 @@ class SignInView(View):
         except User.DoesNotExist:
             return JsonResponse({"error": "INVALID_EMAIL"}, status=401)
 
+        except HasherBusy:
+            return server_busy()
+
 
 class AccountView(View):
     @check_user
@@ -152,24 +171,32 @@ class AccountView(View):
         if new_pw:
             if not validate_password(new_pw):
                 return JsonResponse({"error": "INVALID_PASSWORD"}, status=400)
-            if bcrypt.checkpw(new_pw.encode('utf-8'), current_pw.encode('utf-8')):
-                return JsonResponse({"error": "EXIST_PASSWORD"}, status=400)
+            try:
+                if password_hasher.check(new_pw, current_pw):
+                    return JsonResponse({"error": "EXIST_PASSWORD"}, status=400)
+
+                hashed_pw = password_hasher.hash(new_pw)
+
+            except HasherBusy:
+                return server_busy()
 
-            encoded_pw = new_pw.encode('utf-8')
-            hashed_pw  = bcrypt.hashpw(encoded_pw, bcrypt.gensalt()).decode('utf-8')
             User.objects.filter(id = user.id).update(password = hashed_pw)
+            invalidate_user(user.id)
             return JsonResponse({"message" : "SUCCESS"}, status=200)
 
         if changed_shop:
             User.objects.filter(id = user.id).update(favorite_shop = changed_shop)
+            invalidate_user(user.id)
             return HttpResponse(status=200)
 
-        if change_address:
+        if changed_address:
             User.objects.filter(id = user.id).update(address = changed_address)
+            invalidate_user(user.id)
             return HttpResponse(status=200)
 
 
 class EmailAuthView(View):
+    @transaction.atomic
     def post(self, request):
         data = json.loads(request.body)
         try:
@@ -186,8 +213,7 @@ class EmailAuthView(View):
 
             mail_title = "이메일 인증을 완료해주세요"
             mail_to    = data['email']
-            email      = EmailMessage(mail_title, message_data, to=[mail_to])
-            email.send()
+            enqueue_email(mail_title, message_data, to=[mail_to])
 
             return JsonResponse({"message": "SUCCESS"}, status=200)
 
@@ -215,6 +241,7 @@ class ActivateView(View):
 
             if account_activation_token.check_token(user, token):
                 User.objects.filter(pk=uid).update(is_active=True, membership_id=2)
+                invalidate_user(user.id)
                 return redirect(EMAIL['REDIRECT_PAGE'])
             return JsonResponse({"error": "AUTH_FAIL"}, status=400)
 
@@ -267,6 +294,6 @@ class CouponView(View):
             "coupon"        : user_coupon.coupon.name,
             "discount_rate" : user_coupon.coupon.discount_rate,
             "description"   : user_coupon.coupon.description
-        } for coupon in coupons]
+        } for user_coupon in user_coupons]
 
         return JsonResponse({"coupons_list": coupons_list}, status=200)